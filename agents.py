@@ -3,7 +3,9 @@
 """
 
 from base_types import *
-import random
+from task_queue import TaskQueue
+from messaging import (Message, INCIDENT_REPORT, EMERGENCY_REPORT, HIERARCHICAL_REPORT, DIRECT_COMMAND,
+                       TASK_ASSIGNMENT, HIERARCHICAL_ASSIGNMENT, DRAINAGE_REQUEST, TRAFFIC_COORDINATION)
 import time
 
 class CommandCenter(BaseAgent):
@@ -28,43 +30,38 @@ class CommandCenter(BaseAgent):
             level = "Ⅳ级"
             
         self.response_level = level
-        print(f"[{current_step}] 市防指发布{level}应急响应")
+        self.events.info("response_level", "[{step}] 市防指发布{response_level}应急响应",
+                         step=current_step, response_level=level)
         return level
         
     def direct_dispatch(self, rescue_team, task: Task, current_step: int):
         """直接调度抢险队"""
         if self.direct_command_enabled:
-            print(f"[{current_step}] 市防指直接调度{rescue_team.type.value}_{rescue_team.id}执行{task.incident_type.value}")
-            rescue_team.receive_message({
-                "type": "direct_command",
-                "task": task,
-                "urgency": "high"
-            })
+            self.events.info("direct_dispatch", "[{step}] 市防指直接调度{team}执行{incident_type}",
+                             step=current_step, team=str(rescue_team), incident_type=task.incident_type.value)
+            rescue_team.receive_message(Message(DIRECT_COMMAND, task=task, priority="high"))
             task.assigned_to = f"{rescue_team.type.value}_{rescue_team.id}"
             task.start_time = current_step
-            task.status = "assigned"
+            task.status = TaskStatus.ASSIGNED
             
     def process_inbox(self, current_step: int):
         """处理收件箱"""
-        processed = 0
-        for msg in self.inbox[:self.info_capacity]:
-            if msg.get("type") in ["emergency_report", "hierarchical_report", "incident_report"]:
+        for _ in range(min(self.info_capacity, len(self.inbox))):
+            msg = self.inbox.popleft()
+            if msg.type in (EMERGENCY_REPORT, HIERARCHICAL_REPORT, INCIDENT_REPORT):
                 # 安全获取事件类型
-                incident_type_str = msg.get("incident_type", "道路积水")
+                incident_type_str = msg.incident_type or "道路积水"
                 incident_type = IncidentType.from_string(incident_type_str)
                 
-                task = Task(
-                    id=len(self.emergency_tasks) + 1,
+                task = self.new_task(
                     incident_type=incident_type,
-                    location=msg.get("location", "未知区域"),
-                    urgency=msg.get("urgency", 0.8),
+                    location=msg.location or "未知区域",
+                    urgency=msg.urgency if msg.urgency is not None else 0.8,
                     create_time=current_step
                 )
                 self.emergency_tasks.append(task)
-                print(f"[{current_step}] 市防指收到报告：{task.incident_type.value}于{task.location}")
-            processed += 1
-            
-        self.inbox = self.inbox[processed:]
+                self.events.info("report_received", "[{step}] 市防指收到报告：{incident_type}于{location}",
+                                 step=current_step, incident_type=task.incident_type.value, location=task.location)
 
 class WaterBureau(BaseAgent):
     """水务局"""
@@ -73,24 +70,28 @@ class WaterBureau(BaseAgent):
         self.pump_capacity = 10000
         self.mobile_pumps = 10
         self.available_pumps = 10
-        self.drainage_tasks: List[Task] = []
+        self.drainage_count = 0  # 已派出的排水任务数（任务本身归档到任务库）
         
     def schedule_drainage(self, water_depth: float, location: str, current_step: int) -> int:
         """调度排水资源"""
         if water_depth > 30 and self.available_pumps > 0:
             pumps_needed = min(3, self.available_pumps)
             self.available_pumps -= pumps_needed
-            print(f"[{current_step}] 水务局向{location}派出{pumps_needed}台移动泵车")
+            self.events.info("drainage", "[{step}] 水务局向{location}派出{pumps}台移动泵车",
+                             step=current_step, location=location, pumps=pumps_needed)
             
-            # 创建排水任务
-            task = Task(
-                id=len(self.drainage_tasks) + 1,
+            # 创建排水任务（泵车即刻出动，直接归档）
+            task = self.new_task(
                 incident_type=IncidentType.ROAD_FLOODING,
                 location=location,
                 urgency=0.7,
-                create_time=current_step
+                create_time=current_step,
+                assigned_to=str(self),
+                start_time=current_step,
+                status=TaskStatus.IN_PROGRESS
             )
-            self.drainage_tasks.append(task)
+            self.drainage_count += 1
+            self.archive_task(task)
             
             # 请求交通协同
             if water_depth > 50:
@@ -101,17 +102,17 @@ class WaterBureau(BaseAgent):
         
     def process_inbox(self, current_step: int):
         """处理收件箱"""
-        for msg in self.inbox:
-            if msg.get("type") == "drainage_request":
-                water_depth = msg.get("water_depth", 0)
-                location = msg.get("location", "未知")
+        while self.inbox:
+            msg = self.inbox.popleft()
+            if msg.type == DRAINAGE_REQUEST:
+                water_depth = msg.water_depth or 0
+                location = msg.location or "未知"
                 self.schedule_drainage(water_depth, location, current_step)
-        self.inbox = []
 
 class TrafficPolice(BaseAgent):
     """交管局"""
-    def __init__(self, agent_id: int, grid_area: str):
-        super().__init__(agent_id, AgentType.TRAFFIC_POLICE)
+    def __init__(self, agent_id: int, grid_area: str, rng=None):
+        super().__init__(agent_id, AgentType.TRAFFIC_POLICE, rng)
         self.grid_area = grid_area
         self.traffic_control_active = False
         self.control_threshold = 50
@@ -125,16 +126,18 @@ class TrafficPolice(BaseAgent):
         if self.standardized_procedure:
             delay = 0
         else:
-            delay = random.randint(1, 3)
+            delay = self.rng.randint(1, 3)
             
         if should_control and not self.traffic_control_active:
             self.traffic_control_active = True
             self.response_delay = delay
             if delay > 0:
-                print(f"[{current_step}] 交管局{self.grid_area}将在{delay}步后对{location}实施交通管制")
+                self.events.info("traffic_control", "[{step}] 交管局{grid_area}将在{delay}步后对{location}实施交通管制",
+                                 step=current_step, grid_area=self.grid_area, delay=delay, location=location)
                 self.busy_until = current_step + delay
             else:
-                print(f"[{current_step}] 交管局{self.grid_area}立即对{location}实施交通管制")
+                self.events.info("traffic_control", "[{step}] 交管局{grid_area}立即对{location}实施交通管制",
+                                 step=current_step, grid_area=self.grid_area, delay=0, location=location)
             return True
             
         return False
@@ -142,42 +145,64 @@ class TrafficPolice(BaseAgent):
     def process_inbox(self, current_step: int):
         """处理收件箱"""
         if current_step >= self.busy_until and self.traffic_control_active:
-            print(f"[{current_step}] 交管局{self.grid_area}完成交通管制设置")
+            self.events.info("traffic_control_done", "[{step}] 交管局{grid_area}完成交通管制设置",
+                             step=current_step, grid_area=self.grid_area)
             self.traffic_control_active = False
             self.update_metrics(task_completed=True)
             
-        for msg in self.inbox:
-            if msg.get("type") == "traffic_coordination":
-                water_depth = msg.get("water_depth", 0)
-                location = msg.get("location", "未知")
+        while self.inbox:
+            msg = self.inbox.popleft()
+            if msg.type == TRAFFIC_COORDINATION:
+                water_depth = msg.water_depth or 0
+                location = msg.location or "未知"
                 self.implement_control(water_depth, location, current_step)
-                
-        self.inbox = []
+        
+    def next_wakeup(self, current_step: int) -> Optional[int]:
+        """管制设置完成的时间步"""
+        if self.traffic_control_active:
+            return max(self.busy_until, current_step + 1)
+        return None
 
 class RescueTeam(BaseAgent):
     """抢险大队"""
-    def __init__(self, agent_id: int, team_type: str, capability: float = 1.0):
-        super().__init__(agent_id, AgentType.RESCUE_TEAM)
+    def __init__(self, agent_id: int, team_type: str, capability: float = 1.0, rng=None):
+        super().__init__(agent_id, AgentType.RESCUE_TEAM, rng)
         self.team_type = team_type
         self.capability = capability
         self.assembly_speed = 0.8
-        self.current_location = (random.uniform(0, 100), random.uniform(0, 100))
+        self.current_location = (self.rng.uniform(0, 100), self.rng.uniform(0, 100))
         self.equipment_type = "综合"
-        self.available = True
+        self.availability_listener = None  # available 变化时回调（空闲队伍索引/池）
+        self.router = None  # 路网行程时间（由模型注入，为 None 时集结时间固定）
+        self._available = True
         self.sanitary_check = False
         
+    @property
+    def available(self) -> bool:
+        return self._available
+        
+    @available.setter
+    def available(self, value: bool):
+        if value != self._available:
+            self._available = value
+            if self.availability_listener is not None:
+                self.availability_listener(self)
+        
     def execute_mission(self, task: Task, current_step: int, scenario_mode: str = "baseline"):
         """执行抢险任务"""
         self.available = False
         
         # 防疫检查延迟
         sanitary_delay = 0
-        if scenario_mode == "baseline" and random.random() < 0.5:
-            sanitary_delay = random.randint(1, 2)
+        if scenario_mode == "baseline" and self.rng.random() < 0.5:
+            sanitary_delay = self.rng.randint(1, 2)
             self.sanitary_check = True
             
-        # 集结时间
+        # 集结时间（启用路网时加上赶赴现场的行程时间，队伍随即位于事件地点）
         assembly_time = int(6 * (1 - self.assembly_speed))
+        if self.router is not None:
+            travel_time, self.current_location = self.router.travel(self.current_location, task.location)
+            assembly_time += travel_time
         
         # 任务执行时间
         execution_time = int(10 * (1 - task.urgency) * (1.5 - self.capability))
@@ -187,12 +212,15 @@ class RescueTeam(BaseAgent):
         self.busy_until = current_step + total_time
         
         if sanitary_delay > 0:
-            print(f"[{current_step}] {self.team_type}抢险队执行防疫检查，延迟{sanitary_delay}步")
+            self.events.info("sanitary_check", "[{step}] {team_type}抢险队执行防疫检查，延迟{delay}步",
+                             step=current_step, team_type=self.team_type, delay=sanitary_delay)
             
-        print(f"[{current_step}] {self.team_type}抢险队开始执行{task.incident_type.value}任务，预计{total_time}步完成")
+        self.events.info("mission_start", "[{step}] {team_type}抢险队开始执行{incident_type}任务，预计{duration}步完成",
+                         step=current_step, team_type=self.team_type,
+                         incident_type=task.incident_type.value, duration=total_time)
         
         task.start_time = current_step
-        task.status = "in_progress"
+        task.status = TaskStatus.IN_PROGRESS
         self.tasks.append(task)
         
     def process_inbox(self, current_step: int):
@@ -200,26 +228,33 @@ class RescueTeam(BaseAgent):
         if current_step >= self.busy_until and self.tasks:
             task = self.tasks[0]
             task.completion_time = current_step
-            task.status = "completed"
+            task.status = TaskStatus.COMPLETED
             response_time = current_step - task.create_time
-            print(f"[{current_step}] {self.team_type}抢险队完成任务，响应时间：{response_time}步")
+            self.events.info("mission_complete", "[{step}] {team_type}抢险队完成任务，响应时间：{response_time}步",
+                             step=current_step, team_type=self.team_type, response_time=response_time)
             self.update_metrics(task_completed=True, response_time=response_time)
             self.available = True
             self.tasks = []
+            self.archive_task(task)
             
-        for msg in self.inbox:
-            if msg.get("type") in ["direct_command", "task_assignment", "hierarchical_assignment"]:
-                task = msg.get("task")
+        while self.inbox:
+            msg = self.inbox.popleft()
+            if msg.type in (DIRECT_COMMAND, TASK_ASSIGNMENT, HIERARCHICAL_ASSIGNMENT):
+                task = msg.task
                 if task and self.available:
-                    scenario_mode = msg.get("scenario_mode", "baseline")
+                    scenario_mode = msg.scenario_mode or "baseline"
                     self.execute_mission(task, current_step, scenario_mode)
-                    
-        self.inbox = []
+        
+    def next_wakeup(self, current_step: int) -> Optional[int]:
+        """当前任务完成的时间步"""
+        if self.tasks:
+            return max(self.busy_until, current_step + 1)
+        return None
 
 class Inspector(BaseAgent):
     """巡查员"""
-    def __init__(self, agent_id: int, patrol_range: str, reporting_path: str = "hierarchical"):
-        super().__init__(agent_id, AgentType.INSPECTOR)
+    def __init__(self, agent_id: int, patrol_range: str, reporting_path: str = "hierarchical", rng=None):
+        super().__init__(agent_id, AgentType.INSPECTOR, rng)
         self.patrol_range = patrol_range
         self.reporting_path = reporting_path
         self.discovery_probability = 0.8
@@ -228,10 +263,10 @@ class Inspector(BaseAgent):
         """巡查并发现事件"""
         discovery_rate = min(0.3 + rainfall_intensity/150, 0.9)
         
-        if random.random() < discovery_rate * self.discovery_probability:
-            incident_type = random.choice(list(IncidentType))
-            location = f"{self.patrol_range}_{random.randint(1, 10)}"
-            water_depth = random.uniform(20, rainfall_intensity)
+        if self.rng.random() < discovery_rate * self.discovery_probability:
+            incident_type = self.rng.choice(list(IncidentType))
+            location = f"{self.patrol_range}_{self.rng.randint(1, 10)}"
+            water_depth = self.rng.uniform(20, rainfall_intensity)
             
             report = {
                 "type": "incident_report",
@@ -242,7 +277,9 @@ class Inspector(BaseAgent):
                 "timestamp": current_step
             }
             
-            print(f"[{current_step}] 巡查员{self.patrol_range}发现{incident_type.value}于{location}，水深{water_depth:.1f}cm")
+            self.events.info("patrol_discovery", "[{step}] 巡查员{patrol_range}发现{incident_type}于{location}，水深{water_depth:.1f}cm",
+                             step=current_step, patrol_range=self.patrol_range,
+                             incident_type=incident_type.value, location=location, water_depth=water_depth)
             return report
             
         return None
@@ -253,69 +290,90 @@ class Inspector(BaseAgent):
 
 class InfoPlatform(BaseAgent):
     """综合信息平台"""
+    # 各类单位可承接的事件类型
+    SUITABLE_INCIDENTS = {
+        AgentType.WATER_BUREAU: (IncidentType.ROAD_FLOODING,),
+        AgentType.RESCUE_TEAM: (IncidentType.EMBANKMENT_DANGER, IncidentType.PEOPLE_TRAPPED),
+        AgentType.TRAFFIC_POLICE: (IncidentType.TRAFFIC_JAM,),
+    }
+    # 至少有一类单位可承接的事件类型（其余类型如社区渍水不进入任务队列）
+    ROUTABLE_INCIDENTS = frozenset().union(*SUITABLE_INCIDENTS.values())
+    
     def __init__(self, agent_id: int, processing_capacity: int = 20):
         super().__init__(agent_id, AgentType.INFO_PLATFORM)
         self.processing_capacity = processing_capacity
         self.intelligent_matching = False
-        self.task_queue: List[Task] = []
+        self.batch_assignment = False  # 智能匹配时按一对一最优指派（需要 NumPy）
+        self.team_pool = None  # 空闲抢险队池（由模型注入，为 None 时按候选顺序分派）
+        self.task_queue = TaskQueue()  # 按紧急度和等待时间排序
+        self.metrics.update(unroutable_reports=0, saturated_reports=0)  # 未入队的报告数
         
-    def integrate_info(self, report: Dict, current_step: int):
+    def integrate_info(self, report: Message, current_step: int):
         """整合信息"""
-        if len(self.task_queue) < self.processing_capacity * 2:
-            # 安全转换事件类型
-            incident_type_str = report.get("incident_type", "道路积水")
-            incident_type = IncidentType.from_string(incident_type_str)
-            
-            task = Task(
-                id=len(self.task_queue) + 1,
+        # 安全转换事件类型
+        incident_type_str = report.incident_type or "道路积水"
+        incident_type = IncidentType.from_string(incident_type_str)
+        if incident_type not in self.ROUTABLE_INCIDENTS:
+            # 没有单位可承接：入队只会每步回到处理窗口前端，挤占窗口和队列容量
+            self.metrics["unroutable_reports"] = self.metrics.get("unroutable_reports", 0) + 1
+            self.events.warning("platform_unroutable", "[{step}] 信息平台无单位可承接{incident_type}，任务不入队",
+                                step=current_step, incident_type=incident_type.value)
+        elif len(self.task_queue) < self.processing_capacity * 2:
+            task = self.new_task(
                 incident_type=incident_type,
-                location=report["location"],
-                urgency=report.get("urgency", 0.5),
+                location=report.location,
+                urgency=report.urgency if report.urgency is not None else 0.5,
                 create_time=current_step
             )
-            self.task_queue.append(task)
+            self.task_queue.push(task)
         else:
-            print(f"[{current_step}] 信息平台容量饱和，任务被丢弃")
+            self.metrics["saturated_reports"] = self.metrics.get("saturated_reports", 0) + 1
+            self.events.warning("platform_saturated", "[{step}] 信息平台容量饱和，任务被丢弃", step=current_step)
             
     def dispatch_tasks(self, agents: List[BaseAgent], current_step: int):
         """分派任务"""
         if not self.task_queue:
             return
             
-        if self.intelligent_matching:
+        if self.intelligent_matching and self.batch_assignment:
+            tasks_to_dispatch = self._batch_dispatch(agents, current_step)
+        elif self.intelligent_matching:
             tasks_to_dispatch = self._intelligent_dispatch(agents, current_step)
         else:
             tasks_to_dispatch = self._basic_dispatch(agents, current_step)
             
         for task, target_agent in tasks_to_dispatch:
-            self.send_message(target_agent, {
-                "type": "task_assignment",
-                "task": task,
-                "timestamp": current_step
-            })
+            self.send_message(target_agent, Message(TASK_ASSIGNMENT, timestamp=current_step, task=task))
             task.assigned_to = f"{target_agent.type.value}_{target_agent.id}"
             task.start_time = current_step
-            task.status = "assigned"
-            print(f"[{current_step}] 信息平台向{target_agent.type.value}_{target_agent.id}分派{task.incident_type.value}任务")
+            task.status = TaskStatus.ASSIGNED
+            self.events.info("platform_dispatch", "[{step}] 信息平台向{target}分派{incident_type}任务",
+                             step=current_step, target=str(target_agent), incident_type=task.incident_type.value)
             
     def _basic_dispatch(self, agents: List[BaseAgent], current_step: int) -> List[Tuple[Task, BaseAgent]]:
-        """基本分派"""
+        """基本分派（按优先级取出处理窗口，未匹配的任务放回队列）"""
         dispatched = []
-        for task in self.task_queue[:self.processing_capacity]:
+        window = self.task_queue.pop_many(self.processing_capacity)
+        for task in window:
+            if self._dispatch_from_pool(task, dispatched):
+                continue
             for agent in agents:
                 if self._is_suitable_agent(agent, task):
                     dispatched.append((task, agent))
                     break
-                    
-        self.task_queue = self.task_queue[len(dispatched):]
+            else:
+                self.task_queue.push(task)
+                
         return dispatched
         
     def _intelligent_dispatch(self, agents: List[BaseAgent], current_step: int) -> List[Tuple[Task, BaseAgent]]:
         """智能分派"""
         dispatched = []
-        tasks_to_remove = []
+        window = self.task_queue.pop_many(self.processing_capacity)
         
-        for task in self.task_queue[:self.processing_capacity]:
+        for task in window:
+            if self._dispatch_from_pool(task, dispatched):
+                continue
             suitable_agents = []
             
             for agent in agents:
@@ -327,23 +385,70 @@ class InfoPlatform(BaseAgent):
                 suitable_agents.sort(key=lambda x: x[0], reverse=True)
                 best_agent = suitable_agents[0][1]
                 dispatched.append((task, best_agent))
-                tasks_to_remove.append(task)
+            else:
+                self.task_queue.push(task)
                 
-        for task in tasks_to_remove:
-            if task in self.task_queue:
-                self.task_queue.remove(task)
+        return dispatched
+        
+    def _batch_dispatch(self, agents: List[BaseAgent], current_step: int) -> List[Tuple[Task, BaseAgent]]:
+        """批量分派：整个处理窗口对全部候选单位打分，按一对一最优指派求解"""
+        import numpy as np
+        from assignment import batch_assign
+        
+        dispatched = []
+        window = self.task_queue.pop_many(self.processing_capacity)
+        if self.team_pool is not None:
+            # 抢险任务按窗口优先级从共用的队伍池取队（取出即离池，其他调度路径不会重复选中），
+            # 其余任务在非抢险单位间批量指派
+            window = [task for task in window if not self._dispatch_from_pool(task, dispatched)]
+            agents = [a for a in agents if a.type != AgentType.RESCUE_TEAM]
+            if not window:
+                return dispatched
+        
+        # 按(事件类型, 单位类型)查表构造可行矩阵
+        incident_index = {t: i for i, t in enumerate(IncidentType)}
+        type_index = {t: i for i, t in enumerate(AgentType)}
+        table = np.zeros((len(incident_index), len(type_index)), dtype=bool)
+        for agent_type, incident_types in self.SUITABLE_INCIDENTS.items():
+            for incident_type in incident_types:
+                table[incident_index[incident_type], type_index[agent_type]] = True
+        
+        task_types = np.array([incident_index[t.incident_type] for t in window], dtype=np.int64)
+        agent_types = np.array([type_index[a.type] for a in agents], dtype=np.int64)
+        feasible = table[task_types[:, None], agent_types[None, :]]
+        
+        pairs = batch_assign(
+            urgency=[t.urgency for t in window],
+            feasible=feasible,
+            capability=[getattr(a, "capability", 0.0) for a in agents],
+            available=[getattr(a, "available", False) for a in agents],
+            exclusive=[hasattr(a, "available") for a in agents],
+        )
+        
+        assigned = set()
+        for t, a in pairs:
+            dispatched.append((window[t], agents[a]))
+            assigned.add(t)
+        for t, task in enumerate(window):
+            if t not in assigned:
+                self.task_queue.push(task)
                 
         return dispatched
         
+    def _dispatch_from_pool(self, task: Task, dispatched: List[Tuple[Task, BaseAgent]]) -> bool:
+        """抢险任务交给队伍池取出的空闲队伍，无空闲队伍时放回队列（返回是否已处理）"""
+        if self.team_pool is None or task.incident_type not in self.SUITABLE_INCIDENTS[AgentType.RESCUE_TEAM]:
+            return False
+        team = self.team_pool.acquire(task.location)
+        if team is not None:
+            dispatched.append((task, team))
+        else:
+            self.task_queue.push(task)
+        return True
+        
     def _is_suitable_agent(self, agent: BaseAgent, task: Task) -> bool:
         """判断智能体是否适合任务"""
-        if agent.type == AgentType.WATER_BUREAU and task.incident_type == IncidentType.ROAD_FLOODING:
-            return True
-        elif agent.type == AgentType.RESCUE_TEAM and task.incident_type in [IncidentType.EMBANKMENT_DANGER, IncidentType.PEOPLE_TRAPPED]:
-            return True
-        elif agent.type == AgentType.TRAFFIC_POLICE and task.incident_type == IncidentType.TRAFFIC_JAM:
-            return True
-        return False
+        return task.incident_type in self.SUITABLE_INCIDENTS.get(agent.type, ())
         
     def _calculate_priority(self, agent: BaseAgent, task: Task) -> float:
         """计算优先级分数"""
@@ -361,10 +466,7 @@ class InfoPlatform(BaseAgent):
         
     def process_inbox(self, current_step: int):
         """处理收件箱"""
-        processed = 0
-        for msg in self.inbox[:self.processing_capacity]:
-            if msg.get("type") == "incident_report":
+        for _ in range(min(self.processing_capacity, len(self.inbox))):
+            msg = self.inbox.popleft()
+            if msg.type == INCIDENT_REPORT:
                 self.integrate_info(msg, current_step)
-            processed += 1
-            
-        self.inbox = self.inbox[processed:]
\ No newline at end of file
@@ -3,57 +3,373 @@
 """
 
 import json
-from typing import Dict, List, Any
+import math
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 import statistics
 
+import numpy as np
+
+from incident_log import iter_incidents
+from stats import StreamingStats
+
+# 单次运行摘要的指标（与 _summarize 的键顺序一致）
+SUMMARY_KEYS = ("事件总数", "解决事件数", "解决率", "平均响应时间", "系统效率",
+                "瓶颈事件次数", "最大任务积压", "平均任务积压")
+
+# 各指标数值越大越好（用于配对比较的"更优"判断）
+HIGHER_IS_BETTER = {"事件总数": True, "解决事件数": True, "解决率": True, "平均响应时间": False,
+                    "系统效率": True, "瓶颈事件次数": False, "最大任务积压": False, "平均任务积压": False}
+
+DEFAULT_BOOTSTRAP = 1000
+_BOOTSTRAP_CHUNK = 256  # 重抽样分块行数，限制临时下标数组的内存
+
+
+@lru_cache(maxsize=256)
+def t_critical(df: int, confidence: float = 0.95) -> float:
+    """t 分布双侧临界值：对 t_p_value 二分求解 p = 1 - confidence"""
+    if df < 1:
+        raise ValueError("自由度至少为 1")
+    if not 0 < confidence < 1:
+        raise ValueError("置信度必须在 0 和 1 之间")
+    alpha = 1 - confidence
+    # 正态分位数是 t 临界值的下界；上界逐次加倍直到包住解
+    low = _normal_quantile(1 - alpha / 2)
+    high = 2 * low
+    while t_p_value(high, df) > alpha:
+        low, high = high, 2 * high
+    for _ in range(200):
+        mid = (low + high) / 2
+        if t_p_value(mid, df) > alpha:
+            low = mid
+        else:
+            high = mid
+        if high - low < 1e-12 * high:
+            break
+    return (low + high) / 2
+
+
+def _normal_quantile(p: float) -> float:
+    """标准正态分位数（Acklam 有理逼近，相对误差约 1e-9）"""
+    a = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+         1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+    b = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+         6.680131188771972e+01, -1.328068155288572e+01)
+    c = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+         -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+    d = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
+    if p < 0.02425:
+        q = math.sqrt(-2 * math.log(p))
+        return (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / \
+               ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1)
+    if p > 1 - 0.02425:
+        return -_normal_quantile(1 - p)
+    q = p - 0.5
+    r = q * q
+    return (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q / \
+           (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1)
+
+
+def _incomplete_beta(x: float, a: float, b: float) -> float:
+    """正则化不完全 beta 函数 I_x(a, b)（连分式展开）"""
+    if x <= 0 or x >= 1:
+        return 0.0 if x <= 0 else 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _incomplete_beta(1 - x, b, a)
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)) / a
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return front * result
+
+
+def t_p_value(t: float, df: int) -> float:
+    """t 统计量的双侧 p 值"""
+    if math.isinf(t):
+        return 0.0
+    return _incomplete_beta(df / (df + t * t), df / 2, 0.5)
+
+
+def percent_change(new, old):
+    """相对变化（与 calculate_improvements 的安全规则一致，支持数组）"""
+    new = np.asarray(new, dtype=np.float64)
+    old = np.asarray(old, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (new - old) / old
+    return np.where(old == 0, np.sign(new), change)
+
+
+def summary_matrix(runs: List[Dict[str, Any]]) -> np.ndarray:
+    """多次运行的指标摘要矩阵 (R, len(SUMMARY_KEYS))，规则与 _summarize 一致"""
+    def column(key):
+        return np.fromiter((m.get(key, 0) for m in runs), dtype=np.float64, count=len(runs))
+    
+    total = column("total_incidents")
+    resolved = column("resolved_incidents")
+    avg_response = column("avg_response_time")
+    efficiency = column("system_efficiency")
+    bottleneck = column("bottleneck_events")
+    
+    backlogs = [m.get("task_backlog") or [0] for m in runs]
+    if len({len(b) for b in backlogs}) == 1:
+        backlog = np.asarray(backlogs, dtype=np.float64)
+        max_backlog, mean_backlog = backlog.max(axis=1), backlog.mean(axis=1)
+    else:
+        max_backlog = np.array([max(b) for b in backlogs], dtype=np.float64)
+        mean_backlog = np.array([statistics.mean(b) for b in backlogs], dtype=np.float64)
+    
+    # 安全计算指标，避免除零
+    denominator = np.maximum(total, 1)
+    avg_response = np.where((avg_response == 0) & (resolved > 0), 1.0, avg_response)
+    efficiency = np.where((efficiency == 0) & (resolved > 0),
+                          resolved / denominator / np.maximum(avg_response, 1), efficiency)
+    
+    return np.column_stack([total, resolved, resolved / denominator, avg_response, efficiency,
+                            bottleneck, max_backlog, mean_backlog])
+
 class ScenarioAnalyzer:
     """情景分析器"""
     
-    def __init__(self):
+    def __init__(self, confidence: float = 0.95, n_bootstrap: int = DEFAULT_BOOTSTRAP, seed: int = 0):
         self.results = {}
+        self.replications: Dict[str, Dict[int, Dict[str, Any]]] = {}
         self.comparison_data = {}
+        self.intervals: Dict[str, Dict[str, Tuple[float, float, float]]] = {}  # 情景 -> 指标 -> (均值, 下限, 上限)
+        if not 0 < confidence < 1:
+            raise ValueError("置信度必须在 0 和 1 之间")
+        self.confidence = confidence
+        self.n_bootstrap = n_bootstrap
+        self.seed = seed
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._bootstrap_cache: Dict[Tuple[int, int], np.ndarray] = {}
+        self._bootstrap_means: Dict[str, np.ndarray] = {}
         
     def add_scenario_result(self, scenario_name: str, metrics: Dict[str, Any]):
         """添加情景结果"""
         self.results[scenario_name] = metrics
         
+    def add_replication_result(self, scenario_name: str, replication: int, metrics: Dict[str, Any]):
+        """添加一次重复实验结果（可按任意顺序到达）"""
+        runs = self.replications.setdefault(scenario_name, {})
+        runs[replication] = metrics
+        self.results[scenario_name] = runs[min(runs)]
+        self._arrays.pop(scenario_name, None)
+        self._bootstrap_means.pop(scenario_name, None)
+        
+    def replication_arrays(self, scenario_name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(重复编号 (R,), 指标摘要矩阵 (R, K))，按重复编号排序，结果缓存到有新结果为止"""
+        cached = self._arrays.get(scenario_name)
+        if cached is None:
+            runs = self.replications.get(scenario_name)
+            if runs:
+                ids = np.array(sorted(runs), dtype=np.int64)
+                matrix = summary_matrix([runs[r] for r in ids.tolist()])
+            else:
+                ids = np.zeros(1, dtype=np.int64)
+                matrix = summary_matrix([self.results[scenario_name]])
+            cached = self._arrays[scenario_name] = (ids, matrix)
+        return cached
+        
+    def _metric(self, scenario_name: str, metric: str) -> Tuple[np.ndarray, np.ndarray]:
+        ids, matrix = self.replication_arrays(scenario_name)
+        return ids, matrix[:, SUMMARY_KEYS.index(metric)]
+        
+    def pooled_response_stats(self, scenario_name: str) -> StreamingStats:
+        """合并一个情景各次重复实验的响应时间累加器"""
+        pooled = StreamingStats()
+        runs = self.replications.get(scenario_name) or {0: self.results.get(scenario_name, {})}
+        for metrics in runs.values():
+            state = metrics.get("response_time_stats")
+            if state:
+                pooled.merge(StreamingStats.from_state(state))
+        return pooled
+        
+    def iter_incidents(self, scenario_name: str, replication: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """惰性遍历一次运行的全部事件（需运行时指定 incident_log_path）"""
+        metrics = self.results.get(scenario_name, {})
+        if replication is not None:
+            metrics = self.replications[scenario_name][replication]
+        directory = metrics.get("incident_log")
+        if not directory:
+            raise ValueError(f"情景 {scenario_name} 的结果没有磁盘事件日志（运行时需指定 incident_log_path）")
+        return iter_incidents(directory)
+        
+    def incident_breakdown(self, scenario_name: str, replication: Optional[int] = None) -> Dict[str, int]:
+        """按事件类型统计一次运行的事件数（逐条流式读取）"""
+        counts = Counter(incident["incident_type"] for incident in self.iter_incidents(scenario_name, replication))
+        return dict(counts)
+        
     def compare_scenarios(self):
-        """比较不同情景"""
+        """比较不同情景（有重复实验时取各次的平均）"""
         
         comparison = {}
+        intervals = {}
         
         for scenario_name, metrics in self.results.items():
-            backlog = metrics.get("task_backlog", [0])
-            if not backlog:
-                backlog = [0]
-            
-            # 安全计算指标，避免除零
-            total_incidents = max(metrics.get("total_incidents", 0), 1)
-            resolved_incidents = metrics.get("resolved_incidents", 0)
-            
-            avg_response = metrics.get("avg_response_time", 0)
-            if avg_response == 0 and resolved_incidents > 0:
-                avg_response = 1.0
-                
-            system_efficiency = metrics.get("system_efficiency", 0)
-            if system_efficiency == 0 and resolved_incidents > 0:
-                resolution_rate = resolved_incidents / total_incidents
-                system_efficiency = resolution_rate * (1 / max(avg_response, 1))
-            
-            comparison[scenario_name] = {
-                "事件总数": metrics.get("total_incidents", 0),
-                "解决事件数": resolved_incidents,
-                "解决率": resolved_incidents / total_incidents,
-                "平均响应时间": avg_response,
-                "系统效率": system_efficiency,
-                "瓶颈事件次数": metrics.get("bottleneck_events", 0),
-                "最大任务积压": max(backlog),
-                "平均任务积压": statistics.mean(backlog) if backlog else 0,
-            }
+            runs = self.replications.get(scenario_name)
+            if runs:
+                _, matrix = self.replication_arrays(scenario_name)
+                n = len(matrix)
+                means = matrix.mean(axis=0)
+                comparison[scenario_name] = dict(zip(SUMMARY_KEYS, means.tolist()))
+                comparison[scenario_name]["重复次数"] = n
+                if n > 1:
+                    half = t_critical(n - 1, self.confidence) * matrix.std(axis=0, ddof=1) / math.sqrt(n)
+                    intervals[scenario_name] = {
+                        key: (m, m - h, m + h) for key, m, h in zip(SUMMARY_KEYS, means.tolist(), half.tolist())
+                    }
+            else:
+                comparison[scenario_name] = self._summarize(metrics)
         
         self.comparison_data = comparison
+        self.intervals = intervals
         return comparison
         
+    def _bootstrap_weights(self, n: int, stream: int = 0) -> np.ndarray:
+        """(n_bootstrap, n) 的重抽样次数矩阵：第 b 行为第 b 次有放回抽样中各重复被抽中的次数。
+        由 (seed, stream, n) 确定，同一 n 的各情景、各指标共用，配对重抽样即同一行权重"""
+        key = (n, stream)
+        weights = self._bootstrap_cache.get(key)
+        if weights is None:
+            rng = np.random.default_rng([self.seed, stream])
+            weights = np.empty((self.n_bootstrap, n), dtype=np.float32)  # 次数为小整数，float32 精确
+            for start in range(0, self.n_bootstrap, _BOOTSTRAP_CHUNK):
+                rows = min(_BOOTSTRAP_CHUNK, self.n_bootstrap - start)
+                index = rng.integers(0, n, size=(rows, n))
+                index += np.arange(rows)[:, None] * n
+                weights[start:start + rows] = np.bincount(index.ravel(), minlength=rows * n).reshape(rows, n)
+            weights = self._bootstrap_cache[key] = weights
+        return weights
+        
+    def _resample_means(self, values: np.ndarray, stream: int = 0) -> np.ndarray:
+        """各次重抽样的均值（values 为 (n,) 或 (n, K)），按块做矩阵乘法"""
+        n = len(values)
+        weights = self._bootstrap_weights(n, stream)
+        values = np.asarray(values, dtype=np.float64)
+        out = np.empty((self.n_bootstrap,) + values.shape[1:])
+        for start in range(0, self.n_bootstrap, _BOOTSTRAP_CHUNK):
+            out[start:start + _BOOTSTRAP_CHUNK] = weights[start:start + _BOOTSTRAP_CHUNK].astype(np.float64) @ values
+        return out / n
+        
+    def bootstrap_means(self, scenario_name: str) -> np.ndarray:
+        """情景全部指标的重抽样均值 (n_bootstrap, K)，缓存到有新结果为止"""
+        means = self._bootstrap_means.get(scenario_name)
+        if means is None:
+            _, matrix = self.replication_arrays(scenario_name)
+            means = self._bootstrap_means[scenario_name] = self._resample_means(matrix)
+        return means
+        
+    def _aligned(self, new_scenario: str, old_scenario: str, metric: str):
+        """两个情景的指标序列；重复编号一致时按编号配对"""
+        ids_new, new = self._metric(new_scenario, metric)
+        ids_old, old = self._metric(old_scenario, metric)
+        if len(ids_new) == len(ids_old) and np.array_equal(ids_new, ids_old):
+            return new, old, True
+        common, i_new, i_old = np.intersect1d(ids_new, ids_old, return_indices=True)
+        if len(common) > 1:
+            return new[i_new], old[i_old], True
+        return new, old, False
+        
+    def bootstrap_change(self, new_scenario: str, old_scenario: str, metric: str) -> Tuple[float, float, float]:
+        """均值相对变化及其自助法置信区间 (点估计, 下限, 上限)；配对时两情景按相同权重重抽样"""
+        new, old, paired = self._aligned(new_scenario, old_scenario, metric)
+        point = float(percent_change(new.mean(), old.mean()))
+        if len(new) < 2 or len(old) < 2:
+            return point, point, point
+        ids_new, _ = self.replication_arrays(new_scenario)
+        ids_old, _ = self.replication_arrays(old_scenario)
+        if paired and len(new) == len(ids_new) == len(ids_old):
+            # 重复编号完全一致：直接取两情景缓存的重抽样均值
+            column = SUMMARY_KEYS.index(metric)
+            new_means = self.bootstrap_means(new_scenario)[:, column]
+            old_means = self.bootstrap_means(old_scenario)[:, column]
+        else:
+            new_means = self._resample_means(new)
+            old_means = self._resample_means(old, stream=0 if paired else 1)
+        alpha = 1 - self.confidence
+        low, high = np.quantile(percent_change(new_means, old_means), [alpha / 2, 1 - alpha / 2])
+        return point, float(low), float(high)
+        
+    def paired_comparison(self, scenario_a: str, scenario_b: str, metric: str) -> Dict[str, float]:
+        """按重复编号配对比较 b - a：差值均值、t 置信区间、配对 t 统计量与双侧 p 值、b 更优的比例"""
+        b, a, paired = self._aligned(scenario_b, scenario_a, metric)
+        if not paired:
+            raise ValueError(f"{scenario_a} 与 {scenario_b} 没有可配对的重复实验")
+        diff = b - a
+        n = len(diff)
+        mean = float(diff.mean())
+        std = float(diff.std(ddof=1))
+        se = std / math.sqrt(n)
+        half = t_critical(n - 1, self.confidence) * se
+        t_stat = mean / se if se > 0 else (0.0 if mean == 0 else math.copysign(math.inf, mean))
+        better = diff > 0 if HIGHER_IS_BETTER.get(metric, True) else diff < 0
+        return {
+            "n": n,
+            "mean_diff": mean,
+            "low": mean - half,
+            "high": mean + half,
+            "t": t_stat,
+            "p_value": t_p_value(t_stat, n - 1),
+            "b_better_fraction": float(better.mean()),
+        }
+        
+    def _interval_text(self, scenario_name: str, metric: str, fmt: str) -> str:
+        """有重复实验时的置信区间文本"""
+        interval = self.intervals.get(scenario_name, {}).get(metric)
+        if interval is None:
+            return ""
+        _, low, high = interval
+        return f"（{self.confidence:.0%}区间 {low:{fmt}} ~ {high:{fmt}}）"
+        
+    def _change_interval_text(self, new_scenario: str, old_scenario: str, metric: str) -> str:
+        """有重复实验时相对变化的自助法区间文本"""
+        if new_scenario not in self.intervals or old_scenario not in self.intervals:
+            return ""
+        _, low, high = self.bootstrap_change(new_scenario, old_scenario, metric)
+        return f" [{self.confidence:.0%}自助区间 {low:+.1%} ~ {high:+.1%}]"
+        
+    def _summarize(self, metrics: Dict[str, Any]) -> Dict[str, float]:
+        """单次运行的指标摘要"""
+        backlog = metrics.get("task_backlog", [0])
+        if not backlog:
+            backlog = [0]
+        
+        # 安全计算指标，避免除零
+        total_incidents = max(metrics.get("total_incidents", 0), 1)
+        resolved_incidents = metrics.get("resolved_incidents", 0)
+        
+        avg_response = metrics.get("avg_response_time", 0)
+        if avg_response == 0 and resolved_incidents > 0:
+            avg_response = 1.0
+            
+        system_efficiency = metrics.get("system_efficiency", 0)
+        if system_efficiency == 0 and resolved_incidents > 0:
+            resolution_rate = resolved_incidents / total_incidents
+            system_efficiency = resolution_rate * (1 / max(avg_response, 1))
+        
+        return {
+            "事件总数": metrics.get("total_incidents", 0),
+            "解决事件数": resolved_incidents,
+            "解决率": resolved_incidents / total_incidents,
+            "平均响应时间": avg_response,
+            "系统效率": system_efficiency,
+            "瓶颈事件次数": metrics.get("bottleneck_events", 0),
+            "最大任务积压": max(backlog),
+            "平均任务积压": statistics.mean(backlog) if backlog else 0,
+        }
+        
     def print_comparison_table(self):
         """打印比较表格"""
         if not self.comparison_data:
@@ -89,6 +405,39 @@ class ScenarioAnalyzer:
         
         print("="*80)
         
+    def print_uncertainty_table(self):
+        """打印各情景指标的重复实验均值与 t 置信区间"""
+        if not self.intervals:
+            print("没有多次重复实验，无法计算置信区间")
+            return
+        
+        print("\n" + "="*80)
+        print(f"重复实验均值与{self.confidence:.0%}置信区间")
+        print("="*80)
+        for scenario, metrics in self.intervals.items():
+            print(f"{scenario}（{self.comparison_data[scenario]['重复次数']} 次）")
+            for metric, (mean, low, high) in metrics.items():
+                fmt = ".2%" if "率" in metric else ".2f"
+                print(f"   {metric:<12} {mean:{fmt}}  [{low:{fmt}}, {high:{fmt}}]")
+        print("="*80)
+        
+    def print_paired_comparisons(self, pairs=(("baseline", "hierarchical"), ("baseline", "optimized")),
+                                 metrics=("解决率", "平均响应时间", "系统效率", "瓶颈事件次数")):
+        """打印按重复编号配对的情景差异（b - a）"""
+        print("\n" + "="*80)
+        print("配对比较（同一重复编号共用随机数流）")
+        print("="*80)
+        for a, b in pairs:
+            if a not in self.intervals or b not in self.intervals:
+                continue
+            print(f"{b} - {a}")
+            for metric in metrics:
+                result = self.paired_comparison(a, b, metric)
+                fmt = ".2%" if "率" in metric else ".2f"
+                print(f"   {metric:<12} {result['mean_diff']:+{fmt}}  [{result['low']:+{fmt}}, {result['high']:+{fmt}}]  "
+                      f"t={result['t']:.2f}  p={result['p_value']:.3g}  {b}更优 {result['b_better_fraction']:.0%}")
+        print("="*80)
+        
     def calculate_improvements(self):
         """计算改进效果 - 安全版"""
         
@@ -121,17 +470,19 @@ class ScenarioAnalyzer:
             hierarchical["系统效率"]
         )
         
-        print(f"1. 响应时间对比: {response_change:+.1%} ({'科层更慢' if response_change > 0 else '科层更快' if response_change < 0 else '相同'})")
+        print(f"1. 响应时间对比: {response_change:+.1%}{self._change_interval_text('hierarchical', 'baseline', '平均响应时间')} "
+              f"({'科层更慢' if response_change > 0 else '科层更快' if response_change < 0 else '相同'})")
         print(f"   • 基准模式: {baseline['平均响应时间']:.1f}步")
         print(f"   • 科层结构: {hierarchical['平均响应时间']:.1f}步")
         
-        print(f"\n2. 系统效率对比: {efficiency_change:+.1%} ({'基准更好' if efficiency_change > 0 else '科层更好' if efficiency_change < 0 else '相同'})")
+        print(f"\n2. 系统效率对比: {efficiency_change:+.1%}{self._change_interval_text('baseline', 'hierarchical', '系统效率')} "
+              f"({'基准更好' if efficiency_change > 0 else '科层更好' if efficiency_change < 0 else '相同'})")
         print(f"   • 基准模式: {baseline['系统效率']:.3f}")
         print(f"   • 科层结构: {hierarchical['系统效率']:.3f}")
         
         print(f"\n3. 任务处理能力:")
-        print(f"   • 基准模式解决率: {baseline['解决率']:.1%}")
-        print(f"   • 科层结构解决率: {hierarchical['解决率']:.1%}")
+        print(f"   • 基准模式解决率: {baseline['解决率']:.1%}{self._interval_text('baseline', '解决率', '.1%')}")
+        print(f"   • 科层结构解决率: {hierarchical['解决率']:.1%}{self._interval_text('hierarchical', '解决率', '.1%')}")
         print(f"   • 科层结构任务积压: 最大{hierarchical['最大任务积压']}，平均{hierarchical['平均任务积压']:.1f}")
         
         # 优化模式 vs 基准模式
@@ -151,8 +502,9 @@ class ScenarioAnalyzer:
                 baseline["解决率"]
             )
                 
-            print(f"1. 响应时间变化: {time_change:+.1%} ({'优化更慢' if time_change > 0 else '优化更快' if time_change < 0 else '相同'})")
-            print(f"2. 解决率提升: {resolution_change:+.1%}")
+            print(f"1. 响应时间变化: {time_change:+.1%}{self._change_interval_text('optimized', 'baseline', '平均响应时间')} "
+                  f"({'优化更慢' if time_change > 0 else '优化更快' if time_change < 0 else '相同'})")
+            print(f"2. 解决率提升: {resolution_change:+.1%}{self._change_interval_text('optimized', 'baseline', '解决率')}")
             bottleneck_change = baseline['瓶颈事件次数'] - optimized['瓶颈事件次数']
             print(f"3. 瓶颈事件变化: {bottleneck_change:+.0f}次 ({'减少' if bottleneck_change > 0 else '增加' if bottleneck_change < 0 else '相同'})")
         
@@ -171,7 +523,7 @@ class ScenarioAnalyzer:
                 "title": "科层结构的局限性",
                 "content": f"""
                 纯树状科层结构在模拟中表现出明显不足：
-                1. 事件解决率仅为{hierarchical_data['解决率']:.1%}，而基准模式为{baseline_data.get('解决率', 0):.1%}
+                1. 事件解决率仅为{hierarchical_data['解决率']:.1%}{self._interval_text('hierarchical', '解决率', '.1%')}，而基准模式为{baseline_data.get('解决率', 0):.1%}
                 2. 响应时间相对基准模式{(hierarchical_data['平均响应时间'] - baseline_data.get('平均响应时间', 0)):+.1f}步
                 3. 任务积压严重，最大积压达{hierarchical_data['最大任务积压']}个
                 这验证了扁平化、网络化改革的必要性。
@@ -186,7 +538,7 @@ class ScenarioAnalyzer:
                 武汉2020年采用的混合模式有效平衡了效率与控制：
                 1. 信息平台作为枢纽，处理了大量信息流
                 2. 直接指挥链路缩短了关键任务响应时间
-                3. 事件解决率达到{baseline_data['解决率']:.1%}
+                3. 事件解决率达到{baseline_data['解决率']:.1%}{self._interval_text('baseline', '解决率', '.1%')}
                 4. 平均响应时间为{baseline_data['平均响应时间']:.1f}步
                 """
             })
@@ -224,7 +576,10 @@ class ScenarioAnalyzer:
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump({
                 "results": self.results,
-                "comparison": self.comparison_data
+                "replications": self.replications,
+                "comparison": self.comparison_data,
+                "intervals": {name: {key: list(value) for key, value in metrics.items()}
+                              for name, metrics in self.intervals.items()},
             }, f, ensure_ascii=False, indent=2)
         
         print(f"结果已导出到 {filename}")
\ No newline at end of file
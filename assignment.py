@@ -0,0 +1,153 @@
+"""
+批量任务指派 - 向量化打分矩阵 + 一对一最优指派
+
+抢险队等排他性资源每步至多接一个任务。得分可分解为 f(单位) + g(任务)，
+各类单位可承接的任务互不重叠时，按紧急度和能力各取前 k 名配对即为最优，O(n log n)；
+只有多类排他性单位可承接同一类任务时才按一般指派问题求解（匈牙利算法，可选 SciPy 加速）。
+水务局、交管局等非排他性单位不受一对一约束，直接取得分最高者。
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # 未安装 SciPy 时使用内置实现
+    linear_sum_assignment = None
+
+# 不可行配对的代价（有限大数，保证求解器总有解）
+INFEASIBLE_COST = 1e9
+
+
+def _hungarian(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """最小代价指派（要求行数 <= 列数），O(n^2 m)，内层循环向量化"""
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)    # p[j]: 第 j 列指派的行（1 起，0 表示未指派）
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+
+            used_cols = np.nonzero(used)[0]
+            u[p[used_cols]] += delta
+            v[used_cols] -= delta
+            minv[1:][free] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+        # 沿增广路径回溯
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def solve_assignment(score: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """最大化总分的一对一指派，返回 (行下标, 列下标)"""
+    if score.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    cost = -score
+    if linear_sum_assignment is not None:
+        return linear_sum_assignment(cost)
+    if cost.shape[0] <= cost.shape[1]:
+        return _hungarian(cost)
+    cols, rows = _hungarian(cost.T)
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def _overlapping_assign(score: np.ndarray, feasible: np.ndarray, urgency: np.ndarray,
+                        excl_rows: np.ndarray, excl_cols: np.ndarray) -> List[Tuple[int, int]]:
+    """多类排他性单位可承接同一类任务时，贪心取前 k 名不再最优，按一般指派问题求解"""
+    # 得分可分解为 f(单位) + g(任务)，因此每个单位只可能接到它可承接任务中
+    # 紧急度前 len(excl_cols) 名之一；先剪掉其余任务以缩小指派规模
+    excl_rows = excl_rows[np.argsort(-urgency[excl_rows], kind="stable")]
+    ranked = feasible[np.ix_(excl_rows, excl_cols)]
+    keep = (ranked & (np.cumsum(ranked, axis=0) <= len(excl_cols))).any(axis=1)
+    excl_rows = excl_rows[keep]
+
+    sub_feasible = feasible[np.ix_(excl_rows, excl_cols)]
+    sub_score = np.where(sub_feasible, score[np.ix_(excl_rows, excl_cols)], -INFEASIBLE_COST)
+    rows, cols = solve_assignment(sub_score)
+    ok = sub_feasible[rows, cols]
+    return [(int(excl_rows[r]), int(excl_cols[c])) for r, c in zip(rows[ok], cols[ok])]
+
+
+def batch_assign(urgency: Sequence[float], feasible: np.ndarray, capability: Sequence[float],
+                 available: Sequence[bool], exclusive: Sequence[bool]) -> List[Tuple[int, int]]:
+    """为一批任务指派智能体
+
+    urgency: (T,) 任务紧急度
+    feasible: (T, A) 布尔矩阵，任务与智能体类型是否匹配
+    capability / available / exclusive: (A,) 智能体能力、是否空闲、是否排他
+    返回 [(任务下标, 智能体下标)]
+    """
+    urgency = np.asarray(urgency, dtype=float)
+    capability = np.asarray(capability, dtype=float)
+    available = np.asarray(available, dtype=bool)
+    exclusive = np.asarray(exclusive, dtype=bool)
+
+    # 与 InfoPlatform._calculate_priority 相同的打分规则
+    score = 0.4 * capability[None, :] + 0.3 * urgency[:, None] + 0.3 * available[None, :]
+    # 排他性资源必须空闲才可指派
+    feasible = feasible & (available | ~exclusive)[None, :]
+
+    pairs: List[Tuple[int, int]] = []
+
+    # 非排他性单位：每个任务直接取得分最高者
+    shared = feasible & ~exclusive[None, :]
+    has_shared = shared.any(axis=1)
+    if has_shared.any():
+        best = np.where(shared, score, -np.inf).argmax(axis=1)
+        pairs.extend((int(t), int(best[t])) for t in np.nonzero(has_shared)[0])
+
+    # 排他性单位（仅空闲者）：一对一最优指派
+    excl_cols = np.nonzero(exclusive & available)[0]
+    excl_rows = np.nonzero(~has_shared & feasible[:, excl_cols].any(axis=1))[0]
+    if len(excl_rows) and len(excl_cols):
+        sub_feasible = feasible[np.ix_(excl_rows, excl_cols)]
+        # 可行性按(事件类型, 单位类型)查表，同类单位的可行列相同：按可行模式分组
+        packed = np.ascontiguousarray(np.packbits(sub_feasible, axis=0).T)
+        groups = {}
+        for j, column in enumerate(packed):
+            groups.setdefault(column.tobytes(), []).append(j)
+        members = list(groups.values())
+        patterns = sub_feasible[:, [m[0] for m in members]]
+        if (patterns.sum(axis=1) <= 1).all():
+            # 各组可承接的任务互不重叠（现有单位类型即如此）：组内为完全二部图，
+            # 得分可分解为 f(单位) + g(任务)，紧急度前 k 名的任务配能力前 k 名的单位即为最优
+            for g, member in enumerate(members):
+                rows, cols = excl_rows[patterns[:, g]], excl_cols[member]
+                k = min(len(rows), len(cols))
+                rows = rows[np.argsort(-urgency[rows], kind="stable")[:k]]
+                cols = cols[np.argsort(-capability[cols], kind="stable")[:k]]
+                pairs.extend(zip(rows.tolist(), cols.tolist()))
+        else:
+            pairs.extend(_overlapping_assign(score, feasible, urgency, excl_rows, excl_cols))
+
+    pairs.sort()
+    return pairs
@@ -3,9 +3,13 @@
 """
 
 import random
-from enum import Enum
+from collections import deque
+from enum import Enum, IntEnum
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple, Any
+from events import CONSOLE_EVENTS, EventLog
+from messaging import Message, MessageBus
+from stats import StreamingStats
 
 class AgentType(Enum):
     """智能体类型枚举"""
@@ -48,9 +52,16 @@ class IncidentType(Enum):
         except ValueError:
             return cls.ROAD_FLOODING  # 默认类型
 
-@dataclass
+class TaskStatus(IntEnum):
+    """任务状态码"""
+    PENDING = 0
+    ASSIGNED = 1
+    IN_PROGRESS = 2
+    COMPLETED = 3
+
+@dataclass(slots=True)
 class Task:
-    """任务类"""
+    """任务类（无 __dict__，节省内存）"""
     id: int
     incident_type: IncidentType
     location: str
@@ -59,47 +70,81 @@ class Task:
     assigned_to: Optional[str] = None
     start_time: Optional[int] = None
     completion_time: Optional[int] = None
-    status: str = "pending"  # pending, assigned, in_progress, completed
+    status: TaskStatus = TaskStatus.PENDING
 
 class BaseAgent:
     """智能体基类"""
-    def __init__(self, agent_id: int, agent_type: AgentType):
+    def __init__(self, agent_id: int, agent_type: AgentType, rng=None):
         self.id = agent_id
         self.type = agent_type
-        self.inbox: List[Dict] = []  # 收件箱
-        self.outbox: List[Dict] = []  # 发件箱
+        self.rng = rng if rng is not None else random  # 随机数流（由模型注入，默认全局 random）
+        self.inbox: deque = deque()  # 收件箱
+        self.outbox: deque = deque(maxlen=100)  # 发件箱（仅保留最近的消息）
+        self.bus: Optional[MessageBus] = None  # 消息总线（由模型注入）
         self.tasks: List[Task] = []  # 当前任务
-        self.response_times: List[int] = []  # 响应时间记录
+        self.response_stats = StreamingStats()  # 响应时间流式统计
+        self.shared_response_stats: Optional[StreamingStats] = None  # 模型级汇总（由模型注入）
         self.busy_until: int = 0  # 忙碌到哪个时间步
+        self.events: EventLog = CONSOLE_EVENTS  # 事件日志（由模型注入）
+        self.mail_listener = None  # 收到消息时的回调（离散事件引擎用于唤醒）
+        self.task_store = None  # 任务库（由模型注入，负责全局唯一编号和归档）
         self.metrics = {
             "tasks_completed": 0,
             "avg_response_time": 0,
             "utilization": 0
         }
         
-    def send_message(self, to_agent, message: Dict):
+    def send_message(self, to_agent, message: Message):
         """发送消息"""
-        message["from"] = f"{self.type.value}_{self.id}"
-        message["timestamp"] = self._current_time if hasattr(self, '_current_time') else 0
-        self.outbox.append(message)
+        message.sender = str(self)
+        if message.timestamp is None:
+            message.timestamp = 0
+        if self.bus is not None:
+            self.bus.retain(self, message)
+        else:
+            self.outbox.append(message)
         to_agent.receive_message(message)
         
-    def receive_message(self, message: Dict):
+    def receive_message(self, message: Message):
         """接收消息"""
+        if self.bus is not None:
+            self.bus.deliver(self, message)
+            return
         self.inbox.append(message)
+        if self.mail_listener is not None:
+            self.mail_listener(self)
         
     def process_inbox(self, current_step: int):
         """处理收件箱（由子类实现）"""
         raise NotImplementedError
         
+    def _store(self):
+        if self.task_store is None:
+            from task_store import DEFAULT_TASK_STORE
+            self.task_store = DEFAULT_TASK_STORE
+        return self.task_store
+        
+    def new_task(self, **fields) -> Task:
+        """创建任务（编号在任务库内全局唯一）"""
+        return self._store().create(**fields)
+        
+    def archive_task(self, task: Task):
+        """归档已结束的任务"""
+        self._store().archive_task(task)
+        
+    def next_wakeup(self, current_step: int) -> Optional[int]:
+        """下一次需要处理收件箱的时间步（无定时任务时返回 None）"""
+        return None
+        
     def update_metrics(self, task_completed=False, response_time=None):
         """更新指标"""
         if task_completed:
             self.metrics["tasks_completed"] += 1
         if response_time is not None:
-            self.response_times.append(response_time)
-            if self.response_times:
-                self.metrics["avg_response_time"] = sum(self.response_times) / len(self.response_times)
+            self.response_stats.add(response_time)
+            self.metrics["avg_response_time"] = self.response_stats.mean
+            if self.shared_response_stats is not None:
+                self.shared_response_stats.add(response_time)
 
     def __str__(self):
         return f"{self.type.value}_{self.id}"
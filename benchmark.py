@@ -0,0 +1,193 @@
+"""
+性能基准 - 在 1×/10×/100×/1000× 智能体数与事件率下测量模拟器自身的速度和内存
+
+测量项（每步平均耗时）：
+- step: FloodResponseModel.step 一个时间步
+- dispatch_tasks: InfoPlatform.dispatch_tasks
+- generate_incidents: FloodResponseModel.generate_incidents
+- run: 完整 run()（含步间报告等开销）
+另以 tracemalloc 单独运行一次测量峰值内存（追踪会拖慢运行，不与计时混在一起）。
+
+结果可保存为基线 JSON；之后的运行与基线对比，超过阈值的项标记为变慢。
+"""
+
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from events import make_event_log
+from model import FloodResponseModel
+from replication import scenario_config
+from rng import DEFAULT_SEED
+
+SCALES = (1, 10, 100, 1000)
+TIMED_PHASES = ("step", "dispatch_tasks", "generate_incidents")
+DEFAULT_THRESHOLD = 1.25  # 比基线慢 25% 以上视为退化
+
+
+def scaled_config(scenario: str, scale: int, steps: int) -> Dict[str, Any]:
+    """把情景的智能体数、平台容量和事件率放大 scale 倍"""
+    config = scenario_config(scenario, steps)
+    config["name"] = f"{config.get('name', scenario)} ×{scale}"
+    config["event_mode"] = "silent"
+    config["num_rescue_teams"] = config.get("num_rescue_teams", len(config["rescue_team_types"])) * scale
+    config["num_inspectors"] = config.get("num_inspectors", 6) * scale
+    grids = list(config.get("traffic_police_grids", []))
+    config["traffic_police_grids"] = grids + [f"网格{i + 1}" for i in range(len(grids), len(grids) * scale)]
+    config["platform_capacity"] = config.get("platform_capacity", 15) * scale
+    config["incident_scale"] = scale
+    config["outbox_retention"] = "none"
+    return config
+
+
+class _PhaseTimer:
+    """包装实例方法，累计调用耗时"""
+
+    def __init__(self, func):
+        self.func = func
+        self.seconds = 0.0
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.calls += 1
+
+
+def _instrument(model: FloodResponseModel) -> Dict[str, _PhaseTimer]:
+    timers = {
+        "step": _PhaseTimer(model.step),
+        "generate_incidents": _PhaseTimer(model.generate_incidents),
+    }
+    model.step = timers["step"]
+    model.generate_incidents = timers["generate_incidents"]
+    platform_agent = model.registry.info_platform
+    if platform_agent is not None:
+        timers["dispatch_tasks"] = _PhaseTimer(platform_agent.dispatch_tasks)
+        platform_agent.dispatch_tasks = timers["dispatch_tasks"]
+    return timers
+
+
+def measure(scenario: str, scale: int, steps: int = 40, repeat: int = 3,
+            memory: bool = True, seed: int = DEFAULT_SEED) -> Dict[str, float]:
+    """一个规模的测量结果（耗时取 repeat 次中的最小值，单位：秒/步）"""
+    config = scaled_config(scenario, scale, steps)
+    best: Dict[str, float] = {}
+    for _ in range(repeat):
+        model = FloodResponseModel(config, events=make_event_log("silent"), seed=seed)
+        timers = _instrument(model)
+        start = time.perf_counter()
+        model.run()
+        elapsed = time.perf_counter() - start
+        result = {"run": elapsed / steps}
+        for name, timer in timers.items():
+            result[name] = timer.seconds / max(timer.calls, 1)
+        for name, value in result.items():
+            best[name] = min(best.get(name, value), value)
+
+    best["agents"] = len(model.agents)
+    best["incidents"] = model.metrics["total_incidents"]
+    if memory:
+        tracemalloc.start()
+        FloodResponseModel(config, events=make_event_log("silent"), seed=seed).run()
+        best["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return best
+
+
+def run_suite(scenario: str = "baseline", scales=SCALES, steps: int = 40, repeat: int = 3,
+              memory: bool = True, progress: bool = True) -> Dict[str, Any]:
+    """运行全部规模，返回可保存为基线的结果"""
+    results = {}
+    for scale in scales:
+        # 大规模单次运行已足够稳定，减少重复以控制总耗时
+        n = repeat if scale < 100 else 1
+        results[f"x{scale}"] = measure(scenario, scale, steps, n, memory)
+        if progress:
+            print(f"{scenario} ×{scale}: " + format_result(results[f"x{scale}"]))
+    return {
+        "scenario": scenario,
+        "steps": steps,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def format_result(result: Dict[str, float]) -> str:
+    parts = [f"{name} {result[name] * 1000:.3f}ms/步" for name in ("run",) + TIMED_PHASES if name in result]
+    if "peak_memory_mb" in result:
+        parts.append(f"峰值内存 {result['peak_memory_mb']:.1f}MB")
+    parts.append(f"{result['agents']} 个智能体")
+    return "，".join(parts)
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """与基线逐项对比，返回比值超过阈值的项"""
+    regressions = []
+    for scale, result in current["results"].items():
+        base = baseline.get("results", {}).get(scale)
+        if not base:
+            continue
+        for name in ("run",) + TIMED_PHASES + ("peak_memory_mb",):
+            if name not in result or not base.get(name):
+                continue
+            ratio = result[name] / base[name]
+            if ratio > threshold:
+                regressions.append({"scale": scale, "metric": name, "baseline": base[name],
+                                    "current": result[name], "ratio": ratio})
+    return regressions
+
+
+def save_baseline(suite: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(suite, f, ensure_ascii=False, indent=2)
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="模拟器性能基准")
+    parser.add_argument("--scenario", default="baseline", help="情景")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES), help="规模倍数")
+    parser.add_argument("--steps", type=int, default=40, help="每次运行的步数")
+    parser.add_argument("--repeat", type=int, default=3, help="小规模下的重复次数（取最快）")
+    parser.add_argument("--no-memory", action="store_true", help="不测量峰值内存")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="基线文件")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="判定变慢的比值")
+    args = parser.parse_args()
+
+    suite = run_suite(args.scenario, args.scales, args.steps, args.repeat, not args.no_memory)
+    if args.save_baseline:
+        save_baseline(suite, args.baseline)
+        print(f"基线已保存到 {args.baseline}")
+        sys.exit(0)
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"未找到基线 {args.baseline}，可使用 --save-baseline 创建")
+        sys.exit(0)
+    regressions = compare(suite, baseline, args.threshold)
+    for item in regressions:
+        print(f"变慢: ×{item['scale'][1:]} {item['metric']} {item['baseline']:.6g} -> {item['current']:.6g}"
+              f"（{item['ratio']:.2f} 倍）")
+    if not regressions:
+        print("与基线相比未发现变慢")
+    sys.exit(1 if regressions else 0)
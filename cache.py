@@ -0,0 +1,202 @@
+"""
+结果缓存 - 按内容寻址的本地磁盘缓存，避免重复运行完全相同的模拟
+
+缓存键 = SHA-256(规范化的情景配置 + 根种子 + 重复编号 + 模型代码指纹 [+ 格点降雨文件的大小与修改时间])。
+配置中包含步数；代码指纹由 model 及其（直接或间接）导入的全部本地模块源码计算，模型代码一改旧结果自动失效。
+
+目录结构：<缓存目录>/<代码指纹>/<键前两位>/<键>.pkl
+超过容量上限时按最近使用时间淘汰；invalidate / clear / prune_stale 显式失效。
+"""
+
+import ast
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from typing import Any, Dict, List, Optional, Tuple
+
+# 代码指纹的根模块：指纹覆盖它直接或间接导入的全部本地模块（含函数内的延迟导入）
+MODEL_ROOTS = ("model",)
+
+DEFAULT_CACHE_DIR = ".abm_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_code_fingerprint: Optional[str] = None
+
+
+def _local_imports(root: str, name: str) -> List[str]:
+    """模块源码中导入的本地模块（包目录下存在同名 .py 的顶层模块）"""
+    with open(os.path.join(root, name + ".py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules = [node.module]
+        else:
+            continue
+        for module in modules:
+            top = module.split(".")[0]
+            if os.path.exists(os.path.join(root, top + ".py")):
+                found.add(top)
+    return sorted(found)
+
+
+def model_modules() -> List[str]:
+    """影响模拟结果的模块：从 MODEL_ROOTS 出发按导入关系求闭包，新模块无需手工登记"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    seen, pending = set(), list(MODEL_ROOTS)
+    while pending:
+        name = pending.pop()
+        if name not in seen:
+            seen.add(name)
+            pending.extend(_local_imports(root, name))
+    return sorted(seen)
+
+
+def code_fingerprint() -> str:
+    """模型代码指纹（进程内只计算一次）"""
+    global _code_fingerprint
+    if _code_fingerprint is None:
+        root = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for name in model_modules():
+            digest.update(name.encode("utf-8"))
+            with open(os.path.join(root, name + ".py"), "rb") as f:
+                digest.update(f.read())
+        _code_fingerprint = digest.hexdigest()[:16]
+    return _code_fingerprint
+
+
+def _normalize(value):
+    """元组转列表、字典键排序，保证等价配置得到相同的文本"""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def _input_stamp(config: Dict[str, Any]) -> Optional[list]:
+    """配置引用的外部输入文件（格点降雨）的大小与修改时间，文件变化时缓存失效"""
+    grid = config.get("rainfall_grid")
+    if not grid:
+        return None
+    try:
+        stat = os.stat(grid["path"])
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def run_key(config: Dict[str, Any], replication: int, seed: int) -> str:
+    """一次运行的缓存键"""
+    record = {"config": _normalize(config), "seed": seed, "replication": replication, "code": code_fingerprint()}
+    stamp = _input_stamp(config)
+    if stamp is not None:
+        record["inputs"] = stamp
+    text = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """磁盘结果缓存"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None
+
+    @property
+    def code_dir(self) -> str:
+        return os.path.join(self.directory, code_fingerprint())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.code_dir, key[:2], key + ".pkl")
+
+    def key(self, config: Dict[str, Any], replication: int, seed: int) -> str:
+        return run_key(config, replication, seed)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存结果，未命中返回 None"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                metrics = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        os.utime(path)  # 记录最近使用时间，供淘汰使用
+        self.hits += 1
+        return metrics
+
+    def put(self, key: str, metrics: Dict[str, Any]):
+        """写入结果（先写临时文件再原子替换）"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(metrics, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        if self._size is not None:
+            self._size += os.path.getsize(path)
+        if self.size() > self.max_bytes:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """全部缓存文件 (最近使用时间, 大小, 路径)"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".pkl"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self) -> int:
+        """缓存总字节数（首次调用时扫描目录，之后增量维护）"""
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def evict(self, target_bytes: Optional[int] = None):
+        """按最近使用时间淘汰，直到总大小不超过 target_bytes（默认容量上限的 90%）"""
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target_bytes:
+                break
+            os.remove(path)
+            total -= size
+        self._size = total
+
+    def invalidate(self, key: str) -> bool:
+        """删除一个结果"""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            return False
+        self._size = None
+        return True
+
+    def prune_stale(self):
+        """删除其他代码版本的结果"""
+        if not os.path.isdir(self.directory):
+            return
+        current = code_fingerprint()
+        for name in os.listdir(self.directory):
+            if name != current:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+        self._size = None
+
+    def clear(self):
+        """清空缓存"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._size = 0
@@ -0,0 +1,100 @@
+"""
+模型检查点 - 保存/恢复 FloodResponseModel 的完整状态
+
+文件格式（版本 2）：
+- 8 字节魔数 b"FRMCKPT\\0"
+- 2 字节版本号（大端）、1 字节标志（bit0: zlib 压缩）、1 字节保留
+- 载荷：模型对象图的 pickle（协议 5）
+
+保存内容包括智能体、收件箱/发件箱、任务队列、忙碌计时、各随机数流状态、
+指标、时间序列、任务归档和时间步。事件日志（可能持有文件/控制台）不保存，
+恢复时重新挂接；离散事件引擎的队列可由模型状态重建，也不保存。
+恢复后继续运行的结果与不中断运行逐位一致。
+"""
+
+import io
+import pickle
+import random
+import struct
+import types
+import zlib
+from typing import Optional
+
+from events import EventLog, make_event_log
+
+MAGIC = b"FRMCKPT\0"
+CHECKPOINT_VERSION = 2  # 2: 抢险队 available 改为属性（就近调度索引）
+_HEADER = struct.Struct(">HBx")
+_COMPRESSED = 0x01
+
+# 外部引用的持久化标记
+_EVENTS = "events"
+_RANDOM_MODULE = "random"
+_DETACHED = "detached"
+
+
+class _ModelPickler(pickle.Pickler):
+    """把事件日志、全局 random 模块和引擎回调替换为引用标记"""
+
+    def persistent_id(self, obj):
+        if isinstance(obj, EventLog):
+            return _EVENTS
+        if obj is random:
+            return _RANDOM_MODULE
+        if isinstance(obj, types.MethodType) and type(obj.__self__).__name__ == "EventDrivenEngine":
+            return _DETACHED
+        return None
+
+
+class _ModelUnpickler(pickle.Unpickler):
+    def __init__(self, file, events: EventLog):
+        super().__init__(file)
+        self._events = events
+
+    def persistent_load(self, pid):
+        if pid == _EVENTS:
+            return self._events
+        if pid == _RANDOM_MODULE:
+            return random
+        if pid == _DETACHED:
+            return None
+        raise pickle.UnpicklingError(f"未知的持久化引用: {pid}")
+
+
+def dumps(model, compress: bool = True) -> bytes:
+    """序列化模型状态"""
+    buffer = io.BytesIO()
+    _ModelPickler(buffer, protocol=5).dump(model)
+    payload = buffer.getvalue()
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 1)
+        flags |= _COMPRESSED
+    return MAGIC + _HEADER.pack(CHECKPOINT_VERSION, flags) + payload
+
+
+def loads(data: bytes, events: Optional[EventLog] = None):
+    """由 dumps 的结果恢复模型；events 为 None 时使用控制台输出"""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("不是模型检查点文件")
+    version, flags = _HEADER.unpack_from(data, len(MAGIC))
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"不支持的检查点版本: {version}（当前版本 {CHECKPOINT_VERSION}）")
+    payload = memoryview(data)[len(MAGIC) + _HEADER.size:]
+    if flags & _COMPRESSED:
+        payload = zlib.decompress(payload)
+    if events is None:
+        events = make_event_log("console")
+    return _ModelUnpickler(io.BytesIO(payload), events).load()
+
+
+def save_checkpoint(model, path: str, compress: bool = True):
+    """保存检查点到文件"""
+    with open(path, "wb") as f:
+        f.write(dumps(model, compress))
+
+
+def load_checkpoint(path: str, events: Optional[EventLog] = None):
+    """从文件恢复模型"""
+    with open(path, "rb") as f:
+        return loads(f.read(), events)
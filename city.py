@@ -0,0 +1,150 @@
+"""
+城市规模情景生成器 - 数十个行政区、数百名巡查员、抢险队和交警网格
+
+在基础情景（scenarios.py）之上生成：
+- 行政区：武汉 13 个行政区之后按编号扩展，在边长 size_km 的正方形城市中按网格排布
+- 巡查范围、交警网格、抢险队：按行政区生成，抢险队类型与能力按行政区抽样
+- 事件区域：每个行政区若干片区，事件区域空间随城市规模扩大
+- 坐标：行政区中心、事件区域、巡查范围和抢险队驻地的 (x, y) 坐标（公里）
+
+平台容量和事件率按事件区域数相对默认 20 个区域的倍数放大，保持每个区域的事件密度不变。
+"""
+
+import math
+import random
+from typing import Any, Dict, List, Tuple
+
+from rng import DEFAULT_SEED, derive_seed
+from scenarios import get_scenario_config
+
+WUHAN_DISTRICTS = ["江岸区", "江汉区", "硚口区", "汉阳区", "武昌区", "青山区", "洪山区",
+                   "东西湖区", "汉南区", "蔡甸区", "江夏区", "黄陂区", "新洲区"]
+
+# 抢险队类型及能力范围
+TEAM_TYPES = [("市级", 0.85, 0.95), ("国企", 0.75, 0.9), ("区级", 0.65, 0.85),
+              ("企业", 0.7, 0.85), ("社会", 0.6, 0.75), ("机动", 0.7, 0.85)]
+
+# 默认情景的事件区域数，用于按比例放大事件率与平台容量
+BASE_LOCATIONS = 20
+
+# 预设规模
+CITY_PRESETS = {
+    "wuhan": {"districts": 13, "inspectors_per_district": 8, "grids_per_district": 4,
+              "teams_per_district": 3, "locations_per_district": 20},
+    "metro": {"districts": 40, "inspectors_per_district": 10, "grids_per_district": 6,
+              "teams_per_district": 5, "locations_per_district": 25},
+}
+
+
+def district_names(n: int) -> List[str]:
+    """前 13 个为武汉实际行政区，其余按编号命名"""
+    return WUHAN_DISTRICTS[:n] + [f"新区{i + 1}" for i in range(len(WUHAN_DISTRICTS), n)]
+
+
+def _layout(n: int, size_km: float) -> List[Tuple[float, float]]:
+    """行政区中心：在城市正方形内按网格排布"""
+    cols = math.ceil(math.sqrt(n))
+    rows = math.ceil(n / cols)
+    cell_w, cell_h = size_km / cols, size_km / rows
+    return [((i % cols + 0.5) * cell_w, (i // cols + 0.5) * cell_h) for i in range(n)]
+
+
+def generate_city_config(base: str = "optimized", districts: int = 13, inspectors_per_district: int = 8,
+                         grids_per_district: int = 4, teams_per_district: int = 3,
+                         locations_per_district: int = 20, size_km: float = 60.0,
+                         seed: int = DEFAULT_SEED) -> Dict[str, Any]:
+    """生成城市规模的情景配置"""
+    rng = random.Random(derive_seed(seed, ("city", districts)))
+    config = dict(get_scenario_config(base))
+    names = district_names(districts)
+    centers = _layout(districts, size_km)
+    # 行政区的大致半径，用于在中心周围撒点
+    radius = size_km / math.ceil(math.sqrt(districts)) / 2
+
+    def near(center):
+        x, y = center
+        return [round(x + rng.uniform(-radius, radius), 3), round(y + rng.uniform(-radius, radius), 3)]
+
+    patrol_ranges, patrol_coords = [], {}
+    grids = []
+    team_types, team_bases = [], []
+    locations, location_coords = [], {}
+    for name, center in zip(names, centers):
+        for k in range(inspectors_per_district):
+            patrol = f"{name}巡查{k + 1}"
+            patrol_ranges.append(patrol)
+            patrol_coords[patrol] = near(center)
+        grids.extend(f"{name}网格{k + 1}" for k in range(grids_per_district))
+        for k in range(teams_per_district):
+            team_type, low, high = TEAM_TYPES[rng.randrange(len(TEAM_TYPES))]
+            team_types.append((f"{name}{team_type}", round(rng.uniform(low, high), 2)))
+            team_bases.append(near(center))
+        for k in range(locations_per_district):
+            location = f"{name}{k + 1}片"
+            locations.append(location)
+            location_coords[location] = near(center)
+
+    # 每个行政区一个堤防险点，供市防指直接指挥（在其余抽样之后生成，不改变已有布局）
+    emergency_sites = []
+    for name, center in zip(names, centers):
+        site = f"{name}堤防险点"
+        emergency_sites.append(site)
+        location_coords[site] = near(center)
+
+    scale = max(1, round(len(locations) / BASE_LOCATIONS))
+    config.update({
+        "name": f"{config.get('name', base)}（{districts}个行政区）",
+        "districts": {name: [round(x, 3), round(y, 3)] for name, (x, y) in zip(names, centers)},
+        "city_size_km": size_km,
+        "patrol_ranges": patrol_ranges,
+        "patrol_coords": patrol_coords,
+        "num_inspectors": len(patrol_ranges),
+        "traffic_police_grids": grids,
+        "rescue_team_types": team_types,
+        "num_rescue_teams": len(team_types),
+        "team_bases": team_bases,
+        "incident_locations": locations,
+        "emergency_sites": emergency_sites,
+        "location_coords": location_coords,
+        "incident_scale": scale,
+        "platform_capacity": config.get("platform_capacity", 15) * scale,
+    })
+    return config
+
+
+def city_config(preset: str = "wuhan", base: str = "optimized", seed: int = DEFAULT_SEED, **overrides) -> Dict[str, Any]:
+    """按预设生成城市配置"""
+    params = dict(CITY_PRESETS[preset], **overrides)
+    return generate_city_config(base, seed=seed, **params)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from events import make_event_log
+    from model import FloodResponseModel
+
+    parser = argparse.ArgumentParser(description="城市规模情景")
+    parser.add_argument("--preset", choices=list(CITY_PRESETS), default="wuhan", help="预设规模")
+    parser.add_argument("--base", default="optimized", help="基础情景")
+    parser.add_argument("--districts", type=int, default=None, help="行政区数（覆盖预设）")
+    parser.add_argument("--steps", type=int, default=40, help="模拟步数")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="随机种子")
+    parser.add_argument("--dispatch", choices=["first", "nearest", "idle", "capability"], default="first", help="抢险队调度策略")
+    parser.add_argument("--roads", action="store_true", help="按路网最短路计算抢险队行程时间")
+    args = parser.parse_args()
+
+    overrides = {"districts": args.districts} if args.districts else {}
+    config = city_config(args.preset, args.base, args.seed, **overrides)
+    config["steps"] = args.steps
+    config["dispatch_policy"] = args.dispatch
+    config["road_network"] = args.roads
+    model = FloodResponseModel(config, events=make_event_log("silent"), seed=args.seed)
+    start = time.perf_counter()
+    metrics = model.run()
+    elapsed = time.perf_counter() - start
+    print(f"{config['name']}: {len(model.agents)} 个智能体，{len(config['incident_locations'])} 个事件区域")
+    print(f"{args.steps} 步耗时 {elapsed:.2f}s（{elapsed / args.steps * 1000:.1f}ms/步）")
+    print(f"事件 {metrics['total_incidents']}，解决 {metrics['resolved_incidents']}，"
+          f"平均响应 {metrics['avg_response_time']:.2f} 步")
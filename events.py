@@ -0,0 +1,172 @@
+"""
+事件日志 - 分级、可插拔的输出通道，替代热路径中的 print()
+
+消息模板只在某个通道真正需要文本时才格式化（惰性格式化）。
+"""
+
+import json
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+# 日志级别（与 logging 模块数值一致）
+DEBUG = 10
+INFO = 20
+WARNING = 30
+SILENT = 100
+
+
+class Event:
+    """单条事件记录"""
+    __slots__ = ("level", "kind", "template", "fields")
+
+    def __init__(self, level: int, kind: str, template: str, fields: Dict[str, Any]):
+        self.level = level
+        self.kind = kind
+        self.template = template
+        self.fields = fields
+
+    @property
+    def message(self) -> str:
+        """格式化后的中文消息"""
+        return self.template.format(**self.fields) if self.fields else self.template
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {"level": self.level, "kind": self.kind}
+        record.update(self.fields)
+        return record
+
+
+class EventSink:
+    """输出通道基类"""
+
+    def __init__(self, level: int = DEBUG):
+        self.level = level
+
+    def consume(self, event: Event):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ConsoleSink(EventSink):
+    """控制台输出（保持原有中文打印格式）"""
+
+    def __init__(self, level: int = DEBUG, stream=None):
+        super().__init__(level)
+        self.stream = stream
+
+    def consume(self, event: Event):
+        print(event.message, file=self.stream)
+
+
+class CounterSink(EventSink):
+    """仅计数，不格式化消息"""
+
+    def __init__(self, level: int = DEBUG):
+        super().__init__(level)
+        self.counts: Counter = Counter()
+
+    def consume(self, event: Event):
+        self.counts[event.kind] += 1
+
+
+class RingBufferSink(EventSink):
+    """有界内存环形缓冲，保留最近的事件"""
+
+    def __init__(self, maxlen: int = 1000, level: int = DEBUG):
+        super().__init__(level)
+        self.buffer: deque = deque(maxlen=maxlen)
+
+    def consume(self, event: Event):
+        self.buffer.append(event)
+
+    def messages(self) -> List[str]:
+        """读取时才格式化"""
+        return [event.message for event in self.buffer]
+
+
+class JsonlSink(EventSink):
+    """写入 JSONL 文件，每行一条结构化事件"""
+
+    def __init__(self, path: str, level: int = DEBUG, with_message: bool = False):
+        super().__init__(level)
+        self.path = path
+        self.with_message = with_message
+        self._file = open(path, "w", encoding="utf-8")
+
+    def consume(self, event: Event):
+        record = event.to_dict()
+        if self.with_message:
+            record["message"] = event.message
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class EventLog:
+    """事件日志：将事件分发到各输出通道"""
+
+    def __init__(self, *sinks: EventSink):
+        self.sinks: List[EventSink] = list(sinks)
+        self._update_level()
+
+    def _update_level(self):
+        self.level = min((sink.level for sink in self.sinks), default=SILENT)
+
+    def add_sink(self, sink: EventSink):
+        self.sinks.append(sink)
+        self._update_level()
+
+    def enabled(self, level: int) -> bool:
+        """是否有通道接收该级别（可在构造昂贵参数前判断）"""
+        return level >= self.level
+
+    def emit(self, level: int, kind: str, template: str, **fields):
+        """发出事件；无通道接收时立即返回"""
+        if level < self.level:
+            return
+        event = Event(level, kind, template, fields)
+        for sink in self.sinks:
+            if level >= sink.level:
+                sink.consume(event)
+
+    def debug(self, kind: str, template: str, **fields):
+        self.emit(DEBUG, kind, template, **fields)
+
+    def info(self, kind: str, template: str, **fields):
+        self.emit(INFO, kind, template, **fields)
+
+    def warning(self, kind: str, template: str, **fields):
+        self.emit(WARNING, kind, template, **fields)
+
+    def find_sink(self, sink_type) -> Optional[EventSink]:
+        for sink in self.sinks:
+            if isinstance(sink, sink_type):
+                return sink
+        return None
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def make_event_log(mode: str = "console", **kwargs) -> EventLog:
+    """按模式创建事件日志：silent / counter / ring / jsonl / console"""
+    if mode == "silent":
+        return EventLog()
+    if mode == "counter":
+        return EventLog(CounterSink(**kwargs))
+    if mode == "ring":
+        return EventLog(RingBufferSink(**kwargs))
+    if mode == "jsonl":
+        return EventLog(JsonlSink(**kwargs))
+    if mode == "console":
+        return EventLog(ConsoleSink(**kwargs))
+    raise ValueError(f"未知的事件日志模式: {mode}")
+
+
+# 独立使用智能体时的默认日志（控制台输出）
+CONSOLE_EVENTS = EventLog(ConsoleSink())
@@ -0,0 +1,123 @@
+"""
+外生输入批量生成 - 用 NumPy 一次性生成 R 次重复 × T 步的降雨序列和事件流
+
+分布与 FloodResponseModel.generate_rainfall / generate_incidents 的阶段规则一致：
+- 第 0-19 步：降雨 U(20, 40)
+- 第 20-49 步：降雨 U(40, 80)
+- 第 50 步起：30% 概率暴雨 U(80, 120)，否则 U(30, 60)
+- 每步事件数 0/1/2，权重 (1-p, 0.7p, 0.3p)，p = min(0.2 + 降雨/200, 0.6)；
+  incident_scale > 1 时每步抽样 incident_scale 轮后相加（与模型放大事件率的方式一致）
+- 事件类型均匀、区域 1..num_locations 均匀（应等于情景的事件区域数）、水深 U(10, min(降雨+20, 120))、紧急度 min(0.3 + 水深/100, 0.95)
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from base_types import IncidentType
+from rng import DEFAULT_SEED, derive_seed
+
+INCIDENT_TYPES = list(IncidentType)
+MAX_INCIDENTS_PER_STEP = 2
+NUM_LOCATIONS = 20
+
+
+@dataclass
+class ExogenousSeries:
+    """单次重复的外生输入，按时间步下标访问（下标 0 对应 time_step 0）"""
+    rainfall: np.ndarray            # (T+1,) float64
+    incident_count: np.ndarray      # (T+1,) int8
+    incident_type: np.ndarray       # (T+1, 2×scale) int8，INCIDENT_TYPES 下标
+    incident_location: np.ndarray   # (T+1, 2×scale) int16，区域编号 1..num_locations
+    water_depth: np.ndarray         # (T+1, 2×scale) float64
+    urgency: np.ndarray             # (T+1, 2×scale) float64
+    num_locations: int = NUM_LOCATIONS
+    incident_scale: int = 1
+
+    @property
+    def steps(self) -> int:
+        return len(self.rainfall) - 1
+
+
+@dataclass
+class ExogenousBatch:
+    """R 次重复的外生输入（首维为重复编号）"""
+    rainfall: np.ndarray            # (R, T+1)
+    incident_count: np.ndarray      # (R, T+1)
+    incident_type: np.ndarray       # (R, T+1, 2×scale)
+    incident_location: np.ndarray   # (R, T+1, 2×scale)
+    water_depth: np.ndarray         # (R, T+1, 2×scale)
+    urgency: np.ndarray             # (R, T+1, 2×scale)
+    num_locations: int = NUM_LOCATIONS
+    incident_scale: int = 1
+
+    @property
+    def replications(self) -> int:
+        return self.rainfall.shape[0]
+
+    def replication(self, r: int) -> ExogenousSeries:
+        """第 r 次重复（视图，不复制数据）"""
+        return ExogenousSeries(
+            rainfall=self.rainfall[r],
+            incident_count=self.incident_count[r],
+            incident_type=self.incident_type[r],
+            incident_location=self.incident_location[r],
+            water_depth=self.water_depth[r],
+            urgency=self.urgency[r],
+            num_locations=self.num_locations,
+            incident_scale=self.incident_scale,
+        )
+
+
+def generate_rainfall_batch(rng: np.random.Generator, replications: int, steps: int) -> np.ndarray:
+    """批量生成降雨强度 (R, T+1)"""
+    shape = (replications, steps + 1)
+    t = np.arange(steps + 1)
+
+    low = np.where(t < 20, 20.0, np.where(t < 50, 40.0, 30.0))
+    high = np.where(t < 20, 40.0, np.where(t < 50, 80.0, 60.0))
+    low = np.broadcast_to(low, shape).copy()
+    high = np.broadcast_to(high, shape).copy()
+
+    # 第 50 步起的暴雨突发
+    burst = (t >= 50) & (rng.random(shape) < 0.3)
+    low[burst] = 80.0
+    high[burst] = 120.0
+
+    return low + (high - low) * rng.random(shape)
+
+
+def generate_incidents_batch(rng: np.random.Generator, rainfall: np.ndarray,
+                             num_locations: int = NUM_LOCATIONS, incident_scale: int = 1):
+    """根据降雨批量生成事件流（区域编号 1..num_locations，每步抽样 incident_scale 轮）"""
+    if incident_scale < 1:
+        raise ValueError("事件率倍数必须为正整数")
+    shape = rainfall.shape
+    slot_shape = shape + (MAX_INCIDENTS_PER_STEP * incident_scale,)
+
+    # incident_scale = 1 时与按 shape 抽样得到相同的随机数，结果不变
+    p = np.minimum(0.2 + rainfall / 200, 0.6)[..., None]
+    u = rng.random(shape + (incident_scale,))
+    count_dtype = np.int8 if MAX_INCIDENTS_PER_STEP * incident_scale <= np.iinfo(np.int8).max else np.int32
+    count = np.where(u < 1 - p, 0, np.where(u < 1 - 0.3 * p, 1, 2)).sum(axis=-1).astype(count_dtype)
+
+    incident_type = rng.integers(0, len(INCIDENT_TYPES), size=slot_shape, dtype=np.int8)
+    location_dtype = np.int16 if num_locations <= np.iinfo(np.int16).max else np.int32
+    location = rng.integers(1, num_locations + 1, size=slot_shape, dtype=location_dtype)
+
+    depth_high = np.minimum(rainfall + 20, 120)[..., None]
+    water_depth = 10 + (depth_high - 10) * rng.random(slot_shape)
+    urgency = np.minimum(0.3 + water_depth / 100, 0.95)
+
+    return count, incident_type, location, water_depth, urgency
+
+
+def generate_exogenous(replications: int, steps: int, seed: int = DEFAULT_SEED,
+                       num_locations: int = NUM_LOCATIONS, incident_scale: int = 1) -> ExogenousBatch:
+    """一次性生成 R × T 的降雨和事件流（num_locations、incident_scale 应与情景配置一致）"""
+    rng = np.random.default_rng(np.random.SeedSequence(derive_seed(seed, ("exogenous",))))
+    rainfall = generate_rainfall_batch(rng, replications, steps)
+    count, incident_type, location, water_depth, urgency = generate_incidents_batch(
+        rng, rainfall, num_locations, incident_scale)
+    return ExogenousBatch(rainfall, count, incident_type, location, water_depth, urgency,
+                          num_locations, incident_scale)
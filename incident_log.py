@@ -0,0 +1,106 @@
+"""
+事件日志 - 内存中只保留最近的有界尾部，全部事件可按块溢写到磁盘（JSONL）
+
+长时间或城市规模的运行不再在内存中保留全部事件字典：
+- 未指定目录时只保留最近 tail_size 条（计数仍是全部事件）
+- 指定目录时每 chunk_size 条写一个文件 incidents-00000.jsonl、incidents-00001.jsonl ...，
+  iter_incidents(目录) 按顺序惰性读取，ScenarioAnalyzer 可据此逐条遍历一次运行的事件
+
+从检查点恢复后续写时，会把磁盘上的记录截断到检查点时的条数，避免重复。
+同一目录只能由一个运行写入：ReplicationRunner / ParameterSweep 把 incident_log_path 当作根目录，
+每次运行写入其下的专用目录（replication.run_log_dir）。
+"""
+
+import glob
+import json
+import os
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_TAIL_SIZE = 1000
+DEFAULT_CHUNK_SIZE = 10000
+_CHUNK_PATTERN = "incidents-{:05d}.jsonl"
+
+
+def chunk_files(directory: str) -> List[str]:
+    """目录下的事件块文件（按编号排序）"""
+    return sorted(glob.glob(os.path.join(directory, "incidents-*.jsonl")))
+
+
+def iter_incidents(directory: str) -> Iterator[Dict[str, Any]]:
+    """按生成顺序惰性读取目录中的全部事件"""
+    for path in chunk_files(directory):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class IncidentLog:
+    """有界内存、可溢写磁盘的事件日志"""
+
+    def __init__(self, directory: Optional[str] = None, tail_size: int = DEFAULT_TAIL_SIZE,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size <= 0:
+            raise ValueError("事件块大小必须为正数")
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.tail: deque = deque(maxlen=tail_size)
+        self.count = 0
+        self._file = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            for path in chunk_files(directory):
+                os.remove(path)
+
+    def append(self, incident: Dict[str, Any]):
+        """登记一个事件"""
+        self.tail.append(incident)
+        if self.directory:
+            if self._file is None or self.count % self.chunk_size == 0:
+                self._open_chunk()
+            self._file.write(json.dumps(incident, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def _open_chunk(self):
+        """打开第 count // chunk_size 个块（恢复续写时截断到当前条数并删除其后的块）"""
+        if self._file is not None:
+            self._file.close()
+        index, offset = divmod(self.count, self.chunk_size)
+        path = os.path.join(self.directory, _CHUNK_PATTERN.format(index))
+        for stale in chunk_files(self.directory):
+            if stale > path:
+                os.remove(stale)
+        if offset and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                kept = [next(f) for _ in range(offset)]
+            self._file = open(path, "w", encoding="utf-8")
+            self._file.writelines(kept)
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """全部事件（已溢写时从磁盘读取，否则为内存中的尾部）"""
+        if self.directory:
+            self.flush()
+            return iter_incidents(self.directory)
+        return iter(self.tail)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getstate__(self):
+        # 文件句柄不随检查点保存，恢复后续写时重新打开（先落盘，恢复时才能截断到检查点条数）
+        self.flush()
+        state = self.__dict__.copy()
+        state["_file"] = None
+        return state
@@ -0,0 +1,142 @@
+"""
+消息总线 - 类型化消息记录、deque 收件箱、有界发件箱和按类型的投递计数
+"""
+
+import json
+import os
+from collections import Counter, deque
+from typing import Any, Dict, Optional
+
+# 消息类型
+INCIDENT_REPORT = "incident_report"
+EMERGENCY_REPORT = "emergency_report"
+HIERARCHICAL_REPORT = "hierarchical_report"
+DIRECT_COMMAND = "direct_command"
+TASK_ASSIGNMENT = "task_assignment"
+HIERARCHICAL_ASSIGNMENT = "hierarchical_assignment"
+DRAINAGE_REQUEST = "drainage_request"
+TRAFFIC_COORDINATION = "traffic_coordination"
+
+# 发件箱保留策略
+RETAIN_NONE = "none"
+RETAIN_LAST = "last"
+RETAIN_SPILL = "spill"
+
+
+class Message:
+    """智能体间消息"""
+    __slots__ = ("type", "sender", "timestamp", "task", "incident_type", "location",
+                 "water_depth", "urgency", "priority", "scenario_mode")
+
+    def __init__(self, type: str, timestamp: Optional[int] = None, task=None,
+                 incident_type: Optional[str] = None, location: Optional[str] = None,
+                 water_depth: Optional[float] = None, urgency: Optional[float] = None,
+                 priority: Optional[str] = None, scenario_mode: Optional[str] = None):
+        self.type = type
+        self.sender: Optional[str] = None
+        self.timestamp = timestamp
+        self.task = task
+        self.incident_type = incident_type
+        self.location = location
+        self.water_depth = water_depth
+        self.urgency = urgency
+        self.priority = priority
+        self.scenario_mode = scenario_mode
+
+    @classmethod
+    def incident_report(cls, report: Dict[str, Any]) -> "Message":
+        """由巡查员报告或生成的事件构造上报消息"""
+        return cls(INCIDENT_REPORT, timestamp=report.get("timestamp"),
+                   incident_type=report.get("incident_type"), location=report.get("location"),
+                   water_depth=report.get("water_depth"), urgency=report.get("urgency"),
+                   scenario_mode=report.get("scenario"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """可序列化的字典（任务只记录编号）"""
+        record = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            record[name] = value.id if name == "task" else value
+        return record
+
+    def __repr__(self):
+        return f"Message({self.to_dict()})"
+
+
+class MessageBus:
+    """消息总线
+
+    retention: 发件箱保留策略
+      - "none": 不保留已发送消息
+      - "last": 每个智能体只保留最近 outbox_size 条
+      - "spill": 内存中保留最近 outbox_size 条，全部写入 spill_path（JSONL）
+    """
+
+    def __init__(self, retention: str = RETAIN_LAST, outbox_size: int = 100,
+                 spill_path: Optional[str] = None):
+        if retention not in (RETAIN_NONE, RETAIN_LAST, RETAIN_SPILL):
+            raise ValueError(f"未知的发件箱保留策略: {retention}")
+        if retention == RETAIN_SPILL and not spill_path:
+            raise ValueError("spill 策略需要指定 spill_path")
+        self.retention = retention
+        self.outbox_size = 0 if retention == RETAIN_NONE else outbox_size
+        self.spill_path = spill_path
+        self._spill_file = None
+        self._spill_offset: Optional[int] = None  # 已写入的字节数（None：本次运行尚未写入）
+        self.delivered: Counter = Counter()  # 按消息类型的投递计数
+        self.sent: Counter = Counter()       # 按消息类型的发送计数
+
+    def register(self, agent):
+        """为智能体分配收件箱和发件箱"""
+        agent.bus = self
+        agent.inbox = deque(agent.inbox)
+        agent.outbox = deque(maxlen=self.outbox_size)
+
+    def unregister(self, agent):
+        """智能体移出模型：之后不再经总线收发（收件箱保留原内容）"""
+        if agent.bus is self:
+            agent.bus = None
+
+    def deliver(self, recipient, message: Message):
+        """投递到收件人的收件箱"""
+        recipient.inbox.append(message)
+        self.delivered[message.type] += 1
+        if recipient.mail_listener is not None:
+            recipient.mail_listener(recipient)
+
+    def retain(self, sender, message: Message):
+        """按保留策略记录已发送消息"""
+        self.sent[message.type] += 1
+        if self.outbox_size:
+            sender.outbox.append(message)
+        if self.retention == RETAIN_SPILL:
+            if self._spill_file is None:
+                self._open_spill()
+            line = json.dumps(message.to_dict(), ensure_ascii=False, default=str) + "\n"
+            self._spill_file.write(line.encode("utf-8"))
+
+    def _open_spill(self):
+        """新的运行清空溢写文件；从检查点恢复时截断到检查点位置后续写"""
+        if self._spill_offset is None or not os.path.exists(self.spill_path):
+            self._spill_file = open(self.spill_path, "wb")
+        else:
+            self._spill_file = open(self.spill_path, "r+b")
+            self._spill_file.truncate(self._spill_offset)
+            self._spill_file.seek(self._spill_offset)
+
+    def __getstate__(self):
+        # 溢写文件不随检查点保存，只记录已写入的位置
+        state = self.__dict__.copy()
+        if self._spill_file is not None:
+            self._spill_file.flush()
+            state["_spill_offset"] = self._spill_file.tell()
+        state["_spill_file"] = None
+        return state
+
+    def close(self):
+        if self._spill_file is not None:
+            self._spill_offset = self._spill_file.tell()
+            self._spill_file.close()
+            self._spill_file = None
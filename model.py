@@ -4,25 +4,103 @@
 
 import random
 import time
-from typing import List, Dict, Any, Optional
+import zlib
+from typing import List, Dict, Any, Optional, Union
 from base_types import *
 from agents import *
+from registry import AgentRegistry
+from events import INFO, EventLog, make_event_log
+from rng import DEFAULT_SEED, RandomStreams
+from task_store import TaskStore
+from stats import StreamingStats
+from timeseries import DEFAULT_SERIES, TimeSeriesRecorder
+from profiling import PhaseProfiler
+from incident_log import DEFAULT_CHUNK_SIZE, DEFAULT_TAIL_SIZE, IncidentLog
+from spatial import DEFAULT_EXTENT_KM, CityGeometry, TeamLocator
+from team_pool import POOL_ORDERS, TeamPool
+from rainfall_grid import GriddedRainfall, grid_points
+from roads import DEFAULT_CLOSURE_DEPTH, DEFAULT_CLOSURE_STEPS, DEFAULT_SPEED, RoadNetwork, Router
+from messaging import Message, MessageBus, HIERARCHICAL_ASSIGNMENT, TRAFFIC_COORDINATION
+
+# 默认巡查范围与事件区域（city.py 可生成城市规模的配置）
+DEFAULT_PATROL_RANGES = ["堤段A", "堤段B", "街道C", "街道D", "社区E", "社区F", "区域G", "区域H"]
+DEFAULT_INCIDENT_LOCATIONS = [f"区域{i}" for i in range(1, 21)]
 
 class FloodResponseModel:
     """洪水响应ABM模型"""
     
-    def __init__(self, scenario_config: Dict[str, Any]):
-        # 设置固定随机种子确保可重复
-        random.seed(42)
+    def __init__(self, scenario_config: Dict[str, Any], events: Optional[EventLog] = None,
+                 seed: Union[int, RandomStreams, None] = None, exogenous=None):
+        # 模型独立的随机数流（固定种子确保可重复，且不依赖全局 random）
+        if seed is None:
+            seed = scenario_config.get("seed", DEFAULT_SEED)
+        self.streams = seed if isinstance(seed, RandomStreams) else RandomStreams(seed)
+        self.weather_rng = self.streams.stream("weather")
+        self.incident_rng = self.streams.stream("incidents")
+        self.reporting_rng = self.streams.stream("reporting")
+        self.coordination_rng = self.streams.stream("coordination")
+        
+        # 抢险队响应时间的模型级流式汇总
+        self.response_stats = StreamingStats()
+        
+        # 任务库：全局唯一任务编号，已结束任务列式归档
+        self.task_store = TaskStore()
+        
+        # 消息总线：发件箱保留策略 none / last / spill
+        self.bus = MessageBus(
+            retention=scenario_config.get("outbox_retention", "last"),
+            outbox_size=scenario_config.get("outbox_size", 100),
+            spill_path=scenario_config.get("outbox_spill_path"),
+        )
+        
+        # 预生成的外生输入（exogenous.ExogenousSeries），为 None 时逐步抽样
+        self.exogenous = exogenous
+        
+        # 实时模式下本步的外部读数（realtime.StepReading），由 RealtimeRunner 在每步前设置
+        self.live_input = None
+        
+        # 事件日志：默认沿用控制台中文输出，批量实验可传入静默/计数通道
+        self.events = events if events is not None else make_event_log(
+            scenario_config.get("event_mode", "console"))
         
         self.scenario_name = scenario_config.get("name", "baseline")
         self.scenario_mode = scenario_config.get("mode", "baseline")
         self.steps = scenario_config.get("steps", 80)
-        
-        self.agents: List[BaseAgent] = []
+        self.engine = scenario_config.get("engine", "stepped")  # stepped: 逐步推进；event: 离散事件
+        self.incident_locations = list(scenario_config.get("incident_locations", DEFAULT_INCIDENT_LOCATIONS))
+        # 市防指直接指挥的险情地点（城市配置的堤防险点；未配置时取事件区域）
+        self.emergency_sites = list(scenario_config.get("emergency_sites", self.incident_locations))
+        self.incident_scale = scenario_config.get("incident_scale", 1)  # 每步事件抽样轮数（放大事件率）
+        if exogenous is not None and (exogenous.num_locations != len(self.incident_locations)
+                                      or exogenous.incident_scale != self.incident_scale):
+            raise ValueError(
+                f"外生输入按 {exogenous.num_locations} 个事件区域、{exogenous.incident_scale} 倍事件率生成，"
+                f"与情景配置（{len(self.incident_locations)} 个区域、{self.incident_scale} 倍）不一致")
+        if exogenous is not None and exogenous.steps < self.steps:
+            raise ValueError(f"外生输入只有 {exogenous.steps} 步，情景需要 {self.steps} 步")
+        self.hierarchical_delay = tuple(scenario_config.get("hierarchical_delay", (3, 8)))  # 层级上报延迟范围（步）
+        # first: 取首个空闲队伍；nearest: 就近调度；idle / capability: 空闲最久 / 能力最强的队伍优先
+        self.dispatch_policy = scenario_config.get("dispatch_policy", "first")
+        if self.dispatch_policy not in ("first", "nearest") + POOL_ORDERS:
+            raise ValueError(f"未知的调度策略: {self.dispatch_policy}")
+        
+        # 分阶段剖析（默认关闭，关闭时各阶段只多一次 None 判断）
+        self.profiler: Optional[PhaseProfiler] = None
+        if scenario_config.get("profile"):
+            self.profiler = PhaseProfiler(scenario_config.get("profile_steps"),
+                                          scenario_config.get("profile_path"))
+        
+        self.registry = AgentRegistry()
         self.time_step = 0
-        self.rainfall_history: List[float] = []
-        self.incidents_log: List[Dict] = []
+        self.current_rainfall = 0.0
+        self.current_backlog = 0
+        # 逐步时间序列（列式预分配），rainfall_history 与 task_backlog 由其生成
+        self.timeseries = TimeSeriesRecorder(scenario_config.get("timeseries", DEFAULT_SERIES),
+                                             capacity=self.steps)
+        # 事件日志：内存只保留最近的尾部，指定 incident_log_path（目录）时全部事件分块写入磁盘
+        self.incidents_log = IncidentLog(scenario_config.get("incident_log_path"),
+                                         tail_size=scenario_config.get("incident_log_tail", DEFAULT_TAIL_SIZE),
+                                         chunk_size=scenario_config.get("incident_log_chunk", DEFAULT_CHUNK_SIZE))
         self.metrics = {
             "total_incidents": 0,
             "resolved_incidents": 0,
@@ -34,6 +112,94 @@ class FloodResponseModel:
         
         self._create_agents(scenario_config)
         
+        # 事件地点坐标（就近调度与路网共用）
+        self.geometry: Optional[CityGeometry] = None
+        grid_config = scenario_config.get("rainfall_grid")
+        if self.dispatch_policy == "nearest" or scenario_config.get("road_network") or grid_config:
+            self.geometry = CityGeometry(scenario_config.get("location_coords"), scenario_config.get("patrol_coords"),
+                                         extent=scenario_config.get("city_size_km", DEFAULT_EXTENT_KM))
+        
+        # 空闲抢险队池（就近调度为网格索引），随 available 增量维护，由三条调度路径共用
+        self.team_pool: Union[TeamLocator, TeamPool, None] = None
+        if self.dispatch_policy == "nearest":
+            self.team_pool = TeamLocator(self.geometry, self.registry.rescue_teams)
+        elif self.dispatch_policy in POOL_ORDERS:
+            self.team_pool = TeamPool(self.registry.rescue_teams, order=self.dispatch_policy)
+        if self.team_pool is not None and self.registry.info_platform:
+            self.registry.info_platform.team_pool = self.team_pool
+        
+        # 路网行程时间：积水或交通管制处的路段临时封闭
+        self.router: Optional[Router] = None
+        if scenario_config.get("road_network"):
+            self.router = Router(self.geometry, self._build_road_network(scenario_config),
+                                 speed=scenario_config.get("road_speed", DEFAULT_SPEED))
+            self.road_closure_depth = scenario_config.get("road_closure_depth", DEFAULT_CLOSURE_DEPTH)
+            self.road_closure_steps = scenario_config.get("road_closure_steps", DEFAULT_CLOSURE_STEPS)
+            network = self.router.network
+            network.precompute({network.nearest_node(team.current_location) for team in self.registry.rescue_teams})
+            for team in self.registry.rescue_teams:
+                team.router = self.router
+        
+        # 格点降雨：各巡查范围、事件区域（和行政区）取各自的雨强
+        self.rainfall_grid: Optional[GriddedRainfall] = None
+        if grid_config:
+            self.rainfall_grid = GriddedRainfall(**grid_config)
+            if self.steps > self.rainfall_grid.steps:
+                raise ValueError(f"格点降雨只覆盖 {self.rainfall_grid.steps} 步（{grid_config['path']}），"
+                                 f"情景需要 {self.steps} 步")
+            names = [inspector.patrol_range for inspector in self.registry.inspectors] + self.incident_locations
+            self.rainfall_grid.bind(grid_points(scenario_config, self.geometry, names))
+        
+    def _build_road_network(self, config: Dict[str, Any]) -> RoadNetwork:
+        """配置给出的路网，或覆盖城市范围的方格路网"""
+        if config.get("road_nodes"):
+            return RoadNetwork.from_named(config["road_nodes"], config.get("road_edges", []))
+        extent = self.geometry.extent
+        return RoadNetwork.lattice(extent, config.get("road_spacing_km", extent / 30))
+        
+    @property
+    def rainfall_history(self) -> List[float]:
+        """各步降雨强度"""
+        return self.timeseries["rainfall"].tolist()
+        
+    @property
+    def agents(self) -> List[BaseAgent]:
+        """全部智能体（按注册顺序）"""
+        return self.registry.agents
+        
+    def add_agent(self, agent: BaseAgent):
+        """加入智能体并更新注册表"""
+        agent.events = self.events
+        agent.task_store = self.task_store
+        if agent.type == AgentType.RESCUE_TEAM:
+            agent.shared_response_stats = self.response_stats
+        self.bus.register(agent)
+        if agent.rng is random:
+            agent.rng = self._agent_rng(agent.type, agent.id)
+        self.registry.add(agent)
+        # 运行中加入的抢险队：接入空闲队伍池与路网（初始化时由池和路网统一接入）
+        if agent.type == AgentType.RESCUE_TEAM:
+            if getattr(self, "team_pool", None) is not None:
+                self.team_pool.track(agent)
+            if getattr(self, "router", None) is not None:
+                agent.router = self.router
+        
+    def remove_agent(self, agent: BaseAgent):
+        """移除智能体：撤销 add_agent 的全部接入（注册表、消息总线、队伍池及各回调）"""
+        self.registry.remove(agent)
+        self.bus.unregister(agent)
+        agent.mail_listener = None
+        if agent.type == AgentType.RESCUE_TEAM:
+            if self.team_pool is not None:
+                self.team_pool.untrack(agent)
+            agent.availability_listener = None
+            agent.router = None
+            agent.shared_response_stats = None
+        
+    def _agent_rng(self, agent_type: AgentType, agent_id: int):
+        """智能体专属随机数流（巡查与行动子系统下按编号派生）"""
+        subsystem = "patrol" if agent_type == AgentType.INSPECTOR else "operations"
+        return self.streams.child(subsystem).stream(f"{agent_type.name}_{agent_id}")
         
     def _create_agents(self, config: Dict[str, Any]):
         """根据配置创建智能体"""
@@ -41,127 +207,199 @@ class FloodResponseModel:
         # 1. 市防指
         command_center = CommandCenter(1)
         command_center.direct_command_enabled = config.get("direct_command_enabled", True)
-        self.agents.append(command_center)
+        self.add_agent(command_center)
         
         # 2. 水务局
         water_bureau = WaterBureau(2)
-        self.agents.append(water_bureau)
+        self.add_agent(water_bureau)
         
         # 3. 交管局
         grid_areas = config.get("traffic_police_grids", ["江岸区", "江汉区", "硚口区"])
         for i, area in enumerate(grid_areas):
-            traffic_police = TrafficPolice(3 + i, area)
+            traffic_police = TrafficPolice(3 + i, area, rng=self._agent_rng(AgentType.TRAFFIC_POLICE, 3 + i))
             traffic_police.standardized_procedure = config.get("standardized_procedures", False)
-            self.agents.append(traffic_police)
+            self.add_agent(traffic_police)
         
         # 4. 抢险队
         rescue_teams_config = config.get("rescue_team_types", [("市级", 0.9), ("国企", 0.8), ("区级", 0.7)])
-        for i, (team_type, capability) in enumerate(rescue_teams_config):
-            rescue_team = RescueTeam(10 + i, team_type, capability)
-            self.agents.append(rescue_team)
+        num_rescue_teams = config.get("num_rescue_teams", len(rescue_teams_config))
+        team_bases = config.get("team_bases", [])
+        for i in range(num_rescue_teams):
+            # 队伍数多于类型数时循环使用类型配置
+            team_type, capability = rescue_teams_config[i % len(rescue_teams_config)]
+            rescue_team = RescueTeam(10 + i, team_type, capability, rng=self._agent_rng(AgentType.RESCUE_TEAM, 10 + i))
+            if i < len(team_bases):
+                rescue_team.current_location = tuple(team_bases[i])  # 城市配置给出的驻地坐标
+            self.add_agent(rescue_team)
         
         # 5. 巡查员
         num_inspectors = config.get("num_inspectors", 6)
-        patrol_ranges = ["堤段A", "堤段B", "街道C", "街道D", "社区E", "社区F", "区域G", "区域H"]
+        patrol_ranges = config.get("patrol_ranges", DEFAULT_PATROL_RANGES)
         reporting_path = config.get("reporting_path", "mixed")
-        for i in range(min(num_inspectors, len(patrol_ranges))):
-            inspector = Inspector(20 + i, patrol_ranges[i], reporting_path)
-            self.agents.append(inspector)
+        for i in range(num_inspectors):
+            # 超出预设巡查范围时按编号命名新的片区
+            patrol_range = patrol_ranges[i] if i < len(patrol_ranges) else f"片区{i + 1}"
+            inspector = Inspector(20 + i, patrol_range, reporting_path, rng=self._agent_rng(AgentType.INSPECTOR, 20 + i))
+            self.add_agent(inspector)
         
         # 6. 信息平台
         if config.get("info_platform_enabled", True):
             info_platform = InfoPlatform(100, processing_capacity=config.get("platform_capacity", 15))
             info_platform.intelligent_matching = config.get("intelligent_matching", False)
-            self.agents.append(info_platform)
+            info_platform.batch_assignment = config.get("batch_assignment", False)
+            self.add_agent(info_platform)
         
-        print(f"情景 '{self.scenario_name}' 初始化完成，共创建 {len(self.agents)} 个智能体")
+        self.events.info("model_init", "情景 '{scenario}' 初始化完成，共创建 {num_agents} 个智能体",
+                         scenario=self.scenario_name, num_agents=len(self.agents))
         
     def generate_rainfall(self) -> float:
         """生成降雨事件"""
+        if self.live_input is not None:
+            self.current_rainfall = self.live_input.rainfall
+            return self.current_rainfall
+            
+        if self.rainfall_grid is not None:
+            self.current_rainfall = self.rainfall_grid.citywide(self.time_step)
+            return self.current_rainfall
+            
+        if self.exogenous is not None:
+            base = float(self.exogenous.rainfall[self.time_step])
+            self.current_rainfall = base
+            return base
+            
+        rng = self.weather_rng
         if self.time_step < 20:
-            base = random.uniform(20, 40)
+            base = rng.uniform(20, 40)
         elif self.time_step < 50:
-            base = random.uniform(40, 80)
+            base = rng.uniform(40, 80)
         else:
-            if random.random() < 0.3:
-                base = random.uniform(80, 120)
+            if rng.random() < 0.3:
+                base = rng.uniform(80, 120)
             else:
-                base = random.uniform(30, 60)
+                base = rng.uniform(30, 60)
                 
-        self.rainfall_history.append(base)
+        self.current_rainfall = base
         return base
         
 # 在 generate_incidents 方法中，确保所有事件都被记录
     def generate_incidents(self, rainfall: float):
         """生成随机事件"""
+        if self.live_input is not None:
+            return self._live_incidents()
+            
+        if self.exogenous is not None:
+            return self._exogenous_incidents()
+            
         incident_types = list(IncidentType)
         
         incident_prob = min(0.2 + rainfall/200, 0.6)
         
-        num_incidents = random.choices([0, 1, 2], 
-                                    weights=[1-incident_prob, incident_prob*0.7, 
-                                            incident_prob*0.3])[0]
+        rng = self.incident_rng
+        num_incidents = 0
+        for _ in range(self.incident_scale):
+            num_incidents += rng.choices([0, 1, 2], 
+                                         weights=[1-incident_prob, incident_prob*0.7, 
+                                                 incident_prob*0.3])[0]
         
         incidents = []
         for _ in range(num_incidents):
-            incident_type = random.choice(incident_types)
-            location = f"区域{random.randint(1, 20)}"
-            water_depth = random.uniform(10, min(rainfall + 20, 120))
-            
-            incident = {
-                "type": "incident_report",
-                "incident_type": incident_type.value,
-                "location": location,
-                "water_depth": water_depth,
-                "urgency": min(0.3 + water_depth/100, 0.95),
-                "timestamp": self.time_step,
-                "scenario": self.scenario_mode  # 添加情景标记
-            }
-            
-            incidents.append(incident)
-            self.incidents_log.append(incident)
-            self.metrics["total_incidents"] += 1
-            
-            print(f"[{self.time_step}] 生成事件：{incident_type.value}于{location}")
+            incident_type = rng.choice(incident_types)
+            location = self.incident_locations[rng.randint(1, len(self.incident_locations)) - 1]
+            water_depth = rng.uniform(10, min(self.local_rainfall(location, rainfall) + 20, 120))
+            urgency = min(0.3 + water_depth/100, 0.95)
+            incidents.append(self._record_incident(incident_type, location, water_depth, urgency))
+        
+        return incidents
+        
+    def local_rainfall(self, name: str, rainfall: float) -> float:
+        """区域雨强（无格点降雨或区域未登记时为全市雨强）"""
+        grid = self.rainfall_grid
+        if grid is not None and name in grid:
+            return grid.at(self.time_step, name)
+        return rainfall
+        
+    def _exogenous_incidents(self) -> List[Dict]:
+        """按下标读取预生成的事件流"""
+        exo = self.exogenous
+        t = self.time_step
+        incident_types = list(IncidentType)
         
+        incidents = []
+        for k in range(int(exo.incident_count[t])):
+            incidents.append(self._record_incident(
+                incident_types[exo.incident_type[t, k]],
+                self.incident_locations[exo.incident_location[t, k] - 1],
+                float(exo.water_depth[t, k]),
+                float(exo.urgency[t, k]),
+            ))
         return incidents
+        
+    def _live_incidents(self) -> List[Dict]:
+        """登记外部数据源报告的事件"""
+        from realtime import live_incident
+        return [self._record_incident(**live_incident(record)) for record in self.live_input.incidents]
+        
+    def _record_incident(self, incident_type: IncidentType, location: str,
+                         water_depth: float, urgency: float) -> Dict:
+        """登记一个新事件"""
+        incident = {
+            "type": "incident_report",
+            "incident_type": incident_type.value,
+            "location": location,
+            "water_depth": water_depth,
+            "urgency": urgency,
+            "timestamp": self.time_step,
+            "scenario": self.scenario_mode  # 添加情景标记
+        }
+        
+        self.incidents_log.append(incident)
+        self.metrics["total_incidents"] += 1
+        
+        if self.router is not None and water_depth >= self.road_closure_depth:
+            self.router.close_near(location, self.time_step + self.road_closure_steps)
+        
+        self.events.info("incident", "[{step}] 生成事件：{incident_type}于{location}",
+                         step=self.time_step, incident_type=incident_type.value, location=location)
+        return incident
          
     def hierarchical_reporting(self, incident: Dict, inspector: Inspector):
         """层级上报机制 - 修复版"""
         if inspector.reporting_path == "hierarchical":
-            delay_steps = random.randint(3, 8)
+            delay_steps = self.reporting_rng.randint(*self.hierarchical_delay)
             
-            print(f"[{self.time_step}] {inspector.patrol_range}巡查员发现{incident['incident_type']}，开始层级上报...")
+            self.events.info("hierarchical_report", "[{step}] {patrol_range}巡查员发现{incident_type}，开始层级上报...",
+                             step=self.time_step, patrol_range=inspector.patrol_range,
+                             incident_type=incident["incident_type"])
             
             # 模拟上报到指挥部
-            for agent in self.agents:
-                if isinstance(agent, CommandCenter):
-                    # 使用安全转换
-                    incident_type = IncidentType.from_string(incident["incident_type"])
-                    
-                    # 创建任务（考虑上报延迟）
-                    task = Task(
-                        id=len(self.incidents_log) + 1000,
-                        incident_type=incident_type,
-                        location=incident["location"],
-                        urgency=incident.get("urgency", 0.5),
-                        create_time=self.time_step + delay_steps  # 任务创建时间考虑延迟
-                    )
-                    
-                    # 添加到指挥部紧急任务列表
-                    agent.emergency_tasks.append(task)
-                    print(f"[{self.time_step}] 事件已上报，预计{delay_steps}步后到达市防指")
-                    return delay_steps
+            command_center = self.registry.command_center
+            if command_center:
+                # 使用安全转换
+                incident_type = IncidentType.from_string(incident["incident_type"])
+                
+                # 创建任务（考虑上报延迟）
+                task = self.task_store.create(
+                    incident_type=incident_type,
+                    location=incident["location"],
+                    urgency=incident.get("urgency", 0.5),
+                    create_time=self.time_step + delay_steps  # 任务创建时间考虑延迟
+                )
+                
+                # 添加到指挥部紧急任务列表
+                command_center.emergency_tasks.append(task)
+                self.events.info("hierarchical_report_sent", "[{step}] 事件已上报，预计{delay}步后到达市防指",
+                                 step=self.time_step, delay=delay_steps)
+                return delay_steps
         
         return 0
         
     def direct_platform_reporting(self, incident: Dict, inspector: Inspector):
         """直接平台上报"""
         if inspector.reporting_path in ["direct", "mixed"]:
-            for agent in self.agents:
-                if isinstance(agent, InfoPlatform):
-                    agent.receive_message(incident)
-                    return True
+            info_platform = self.registry.info_platform
+            if info_platform:
+                info_platform.receive_message(Message.incident_report(incident))
+                return True
         return False
         
     def hierarchical_dispatch(self):
@@ -169,30 +407,25 @@ class FloodResponseModel:
         if self.scenario_mode != "hierarchical":
             return
         
-        # 查找指挥部
-        command_center = None
-        for agent in self.agents:
-            if isinstance(agent, CommandCenter):
-                command_center = agent
-                break
-        
+        command_center = self.registry.command_center
         if not command_center:
             return
         
         # 处理已到达的紧急任务（考虑上报延迟）
         current_tasks = []
         for task in command_center.emergency_tasks:
-            if task.status == "pending" and self.time_step >= task.create_time:
+            if task.status == TaskStatus.PENDING and self.time_step >= task.create_time:
                 current_tasks.append(task)
         
         if not current_tasks:
             return
         
+        if self.team_pool is not None:
+            self._pooled_hierarchical_dispatch(current_tasks[:2])
+            return
+        
         # 查找可用抢险队
-        available_teams = []
-        for agent in self.agents:
-            if isinstance(agent, RescueTeam) and agent.available:
-                available_teams.append(agent)
+        available_teams = [team for team in self.registry.rescue_teams if team.available]
         
         if not available_teams:
             return
@@ -200,89 +433,88 @@ class FloodResponseModel:
         # 分派任务（每次最多2个）
         for task in current_tasks[:2]:
             team = available_teams[0]
-            print(f"[{self.time_step}] 市防指通过科层调度{team.team_type}抢险队执行{task.incident_type.value}")
-            
-            team.receive_message({
-                "type": "hierarchical_assignment",
-                "task": task,
-                "urgency": "medium"
-            })
-            task.assigned_to = f"{team.type.value}_{team.id}"
-            task.start_time = self.time_step
-            task.status = "assigned"
-            
-            # 从指挥部任务列表移除
-            command_center.emergency_tasks.remove(task)
+            self._hierarchical_assign(task, team)
             available_teams.pop(0)  # 该队伍不再可用
             
             if not available_teams:
                 break
         
+    def _pooled_hierarchical_dispatch(self, tasks: List[Task]):
+        """科层调度：每个任务从空闲队伍池取一支队伍"""
+        for task in tasks:
+            team = self.team_pool.acquire(task.location)
+            if team is None:
+                break
+            self._hierarchical_assign(task, team)
+        
+    def _hierarchical_assign(self, task: Task, team: RescueTeam):
+        """市防指向抢险队下达科层任务"""
+        command_center = self.registry.command_center
+        self.events.info("hierarchical_dispatch", "[{step}] 市防指通过科层调度{team_type}抢险队执行{incident_type}",
+                         step=self.time_step, team_type=team.team_type, incident_type=task.incident_type.value)
+        
+        team.receive_message(Message(HIERARCHICAL_ASSIGNMENT, task=task, priority="medium"))
+        task.assigned_to = f"{team.type.value}_{team.id}"
+        task.start_time = self.time_step
+        task.status = TaskStatus.ASSIGNED
+        
+        # 从指挥部任务列表移除
+        command_center.emergency_tasks.remove(task)
+        
     def run_coordination(self, rainfall: float):
         """运行协同机制"""
         # 水务-交管协同
         if rainfall > 60:
-            water_bureau = None
-            traffic_police_list = []
-            
-            for agent in self.agents:
-                if isinstance(agent, WaterBureau):
-                    water_bureau = agent
-                elif isinstance(agent, TrafficPolice):
-                    traffic_police_list.append(agent)
+            water_bureau = self.registry.water_bureau
+            traffic_police_list = self.registry.traffic_police
             
             if water_bureau and traffic_police_list:
-                location = f"区域{random.randint(1, 10)}"
-                water_depth = random.uniform(40, 80)
+                location = self.incident_locations[self.coordination_rng.randint(1, len(self.incident_locations)) - 1]
+                water_depth = self.coordination_rng.uniform(40, 80)
                 
                 result = water_bureau.schedule_drainage(water_depth, location, self.time_step)
                 
                 if result == 2:
-                    area_index = hash(location) % len(traffic_police_list)
+                    # 使用稳定哈希，保证跨进程可复现（内置 hash() 随进程随机化）
+                    area_index = zlib.crc32(location.encode("utf-8")) % len(traffic_police_list)
                     traffic_police = traffic_police_list[area_index]
                     
-                    traffic_police.receive_message({
-                        "type": "traffic_coordination",
-                        "water_depth": water_depth,
-                        "location": location,
-                        "timestamp": self.time_step
-                    })
+                    traffic_police.receive_message(Message(TRAFFIC_COORDINATION, timestamp=self.time_step,
+                                                           water_depth=water_depth, location=location))
+                    if self.router is not None:
+                        # 交通管制路段不可通行
+                        self.router.close_near(location, self.time_step + self.road_closure_steps)
         
         # 市防指直接指挥（紧急情况下）
         if rainfall > 80 and self.time_step > 10:
-            command_center = None
-            rescue_teams = []
-            
-            for agent in self.agents:
-                if isinstance(agent, CommandCenter):
-                    command_center = agent
-                elif isinstance(agent, RescueTeam) and agent.available:
-                    rescue_teams.append(agent)
+            command_center = self.registry.command_center
+            if self.team_pool is not None:
+                has_team = len(self.team_pool) > 0
+            else:
+                rescue_teams = [team for team in self.registry.rescue_teams if team.available]
+                has_team = bool(rescue_teams)
             
-            if command_center and command_center.direct_command_enabled and rescue_teams:
-                emergency_task = Task(
-                    id=1000 + self.time_step,
+            if command_center and command_center.direct_command_enabled and has_team:
+                emergency_task = self.task_store.create(
                     incident_type=IncidentType.EMBANKMENT_DANGER,
-                    location=f"紧急区域{random.randint(1, 5)}",
+                    location=self.emergency_sites[self.coordination_rng.randint(1, len(self.emergency_sites)) - 1],
                     urgency=0.95,
                     create_time=self.time_step
                 )
                 
-                selected_team = rescue_teams[0]
+                if self.team_pool is not None:
+                    selected_team = self.team_pool.acquire(emergency_task.location)
+                else:
+                    selected_team = rescue_teams[0]
                 command_center.direct_dispatch(selected_team, emergency_task, self.time_step)
                 
     def collect_metrics(self):
         """收集性能指标"""
-        response_times = []
-        tasks_completed = 0
-        
-        for agent in self.agents:
-            if isinstance(agent, RescueTeam):
-                response_times.extend(agent.response_times)
-                tasks_completed += agent.metrics["tasks_completed"]
+        # 抢险队每完成一个任务都会记录一次响应时间，因此完成数即样本数
+        tasks_completed = self.response_stats.count
         
-        if response_times:
-            self.metrics["avg_response_time"] = sum(response_times) / len(response_times)
+        if tasks_completed:
+            self.metrics["avg_response_time"] = self.response_stats.mean
         
         self.metrics["resolved_incidents"] = tasks_completed
         
@@ -296,18 +528,17 @@ class FloodResponseModel:
         backlog = 0
         if self.scenario_mode == "hierarchical":
             # 科层结构：统计指挥部未分派的任务
-            for agent in self.agents:
-                if isinstance(agent, CommandCenter):
-                    backlog = len([t for t in agent.emergency_tasks if t.status == "pending"])
-                    break
+            command_center = self.registry.command_center
+            if command_center:
+                backlog = len([t for t in command_center.emergency_tasks if t.status == TaskStatus.PENDING])
         else:
             # 其他模式：统计信息平台积压
-            for agent in self.agents:
-                if isinstance(agent, InfoPlatform):
-                    backlog = len(agent.task_queue)
-                    break
+            info_platform = self.registry.info_platform
+            if info_platform:
+                backlog = len(info_platform.task_queue)
         
-        self.metrics["task_backlog"].append(backlog)
+        self.current_backlog = backlog
+        self.timeseries.record(self)
         
         # 检查瓶颈
         if backlog > (20 if self.scenario_mode == "optimized" else 10):
@@ -315,53 +546,86 @@ class FloodResponseModel:
             
     def step(self):
         """运行一个时间步"""
-        self.time_step += 1
-        
-        print(f"\n{'='*60}")
-        print(f"时间步 {self.time_step} | 情景: {self.scenario_name}")
-        print(f"{'='*60}")
-        
-        # 1. 生成降雨
-        rainfall = self.generate_rainfall()
-        print(f"[{self.time_step}] 降雨强度: {rainfall:.1f}mm")
-        
-        # 2. 指挥部发布响应等级
-        for agent in self.agents:
-            if isinstance(agent, CommandCenter):
-                agent.issue_response_level(rainfall, self.time_step)
-                break
-        
-        # 3. 生成事件
-        incidents = self.generate_incidents(rainfall)
-        
-        # 4. 巡查员报告
-        for agent in self.agents:
-            if isinstance(agent, Inspector):
-                report = agent.patrol(self.time_step, rainfall)
-                if report:
-                    if self.scenario_mode == "hierarchical":
-                        delay = self.hierarchical_reporting(report, agent)
-                    elif self.scenario_mode in ["baseline", "optimized"]:
-                        if self.direct_platform_reporting(report, agent):
-                            print(f"[{self.time_step}] {agent.patrol_range}巡查员直接上报信息平台")
+        rainfall = self._begin_step()
+        prof = self.profiler
         
         # 5. 智能体处理消息
         for agent in self.agents:
             agent.process_inbox(self.time_step)
+            if prof:
+                prof.lap_agent(agent)
         
         # 6. 信息平台分派任务
-        for agent in self.agents:
-            if isinstance(agent, InfoPlatform):
-                other_agents = [a for a in self.agents if a != agent]
-                agent.dispatch_tasks(other_agents, self.time_step)
+        self._platform_dispatch()
+        if prof:
+            prof.lap("platform_dispatch")
         
         # 6.5 科层结构下的手动调度
         if self.scenario_mode == "hierarchical":
             self.hierarchical_dispatch()
+            if prof:
+                prof.lap("hierarchical_dispatch")
         
         # 7. 运行协同机制
         self.run_coordination(rainfall)
+        if prof:
+            prof.lap("coordination")
+        
+        self._end_step()
         
+    def _begin_step(self) -> float:
+        """推进时钟并执行外生阶段（1-4），返回本步降雨"""
+        prof = self.profiler
+        if prof:
+            prof.begin_step(self.time_step + 1)
+        self.time_step += 1
+        if self.router is not None:
+            self.router.network.reopen_expired(self.time_step)
+        
+        self.events.debug("step_start", "\n" + "=" * 60 + "\n时间步 {step} | 情景: {scenario}\n" + "=" * 60,
+                          step=self.time_step, scenario=self.scenario_name)
+        
+        # 1. 生成降雨
+        rainfall = self.generate_rainfall()
+        self.events.info("rainfall", "[{step}] 降雨强度: {rainfall:.1f}mm", step=self.time_step, rainfall=rainfall)
+        if prof:
+            prof.lap("rainfall")
+        
+        # 2. 指挥部发布响应等级
+        command_center = self.registry.command_center
+        if command_center:
+            command_center.issue_response_level(rainfall, self.time_step)
+        if prof:
+            prof.lap("response_level")
+        
+        # 3. 生成事件
+        incidents = self.generate_incidents(rainfall)
+        if prof:
+            prof.lap("incidents")
+        
+        # 4. 巡查员报告
+        for agent in self.registry.inspectors:
+            report = agent.patrol(self.time_step, self.local_rainfall(agent.patrol_range, rainfall))
+            if report:
+                if self.scenario_mode == "hierarchical":
+                    delay = self.hierarchical_reporting(report, agent)
+                elif self.scenario_mode in ["baseline", "optimized"]:
+                    if self.direct_platform_reporting(report, agent):
+                        self.events.info("direct_report", "[{step}] {patrol_range}巡查员直接上报信息平台",
+                                         step=self.time_step, patrol_range=agent.patrol_range)
+        if prof:
+            prof.lap("patrol")
+        
+        return rainfall
+        
+    def _platform_dispatch(self):
+        """信息平台分派任务"""
+        info_platform = self.registry.info_platform
+        if info_platform:
+            info_platform.dispatch_tasks(self.registry.dispatch_candidates(), self.time_step)
+        
+    def _end_step(self):
+        """步末阶段（8-9）"""
         # 8. 收集指标
         self.collect_metrics()
         
@@ -369,52 +633,114 @@ class FloodResponseModel:
         if self.time_step % 20 == 0:
             self.print_status()
         
+        prof = self.profiler
+        if prof:
+            prof.lap("metrics")
+            prof.end_step(self.time_step)
+        
     def print_status(self):
         """输出当前状态"""
-        print(f"\n[状态报告] 时间步 {self.time_step}")
-        print(f"累积事件: {self.metrics['total_incidents']}")
-        print(f"已解决: {self.metrics['resolved_incidents']}")
+        if not self.events.enabled(INFO):
+            return
+        
+        lines = ["\n[状态报告] 时间步 {step}", "累积事件: {total_incidents}", "已解决: {resolved_incidents}"]
         if self.metrics['avg_response_time'] > 0:
-            print(f"平均响应时间: {self.metrics['avg_response_time']:.1f}步")
-        print(f"系统效率: {self.metrics['system_efficiency']:.3f}")
+            lines.append("平均响应时间: {avg_response_time:.1f}步")
+        lines.append("系统效率: {system_efficiency:.3f}")
         
         # 检查信息平台积压
-        for agent in self.agents:
-            if isinstance(agent, InfoPlatform):
-                backlog = len(agent.task_queue)
-                print(f"信息平台积压任务: {backlog}")
-                break
-        
-    def run(self):
-        """运行完整模拟"""
-        print(f"\n{'#'*60}")
-        print(f"开始运行情景: {self.scenario_name}")
-        print(f"{'#'*60}\n")
+        info_platform = self.registry.info_platform
+        backlog = 0
+        if info_platform:
+            lines.append("信息平台积压任务: {backlog}")
+            backlog = len(info_platform.task_queue)
+        
+        self.events.info("status", "\n".join(lines), step=self.time_step,
+                         total_incidents=self.metrics['total_incidents'],
+                         resolved_incidents=self.metrics['resolved_incidents'],
+                         avg_response_time=self.metrics['avg_response_time'],
+                         system_efficiency=self.metrics['system_efficiency'],
+                         backlog=backlog)
+        
+    def run(self, until: Optional[int] = None):
+        """运行模拟（从当前时间步继续，until 指定时停在该步，之后可再次调用续跑）"""
+        self.events.info("run_start", "\n" + "#" * 60 + "\n开始运行情景: {scenario}\n" + "#" * 60 + "\n",
+                         scenario=self.scenario_name)
         
         start_time = time.time()
         
-        for step in range(self.steps):
-            self.step()
-            
-            # 每20步输出详细报告
-            if (step + 1) % 20 == 0:
-                print(f"\n{'='*60}")
-                print(f"阶段报告 (步数 {step + 1})")
-                print(f"{'='*60}")
-                self.print_detailed_metrics()
+        end_step = self.steps if until is None else min(until, self.steps)
+        if self.engine == "event":
+            from scheduler import EventDrivenEngine
+            EventDrivenEngine(self).run(end_step, on_step=self._stage_report)
+        else:
+            while self.time_step < end_step:
+                self.step()
+                self._stage_report()
         
+        self._finish_run()
         end_time = time.time()
-        print(f"\n{'#'*60}")
-        print(f"情景 '{self.scenario_name}' 模拟完成")
-        print(f"总耗时: {end_time - start_time:.2f}秒")
-        print(f"{'#'*60}")
+        self.events.info("run_end", "\n" + "#" * 60 + "\n情景 '{scenario}' 模拟完成\n总耗时: {elapsed:.2f}秒\n" + "#" * 60,
+                         scenario=self.scenario_name, elapsed=end_time - start_time)
         
         return self.metrics
         
+    def _finish_run(self):
+        """运行结束：关闭输出文件并汇总指标"""
+        self.bus.close()
+        self.incidents_log.close()
+        if self.incidents_log.directory:
+            self.metrics["incident_log"] = self.incidents_log.directory
+        if self.profiler:
+            self.profiler.close()
+            self.metrics["profile"] = self.profiler.summary()
+            self.events.info("profile", "\n[分阶段耗时]\n{report}", report=self.profiler.format_report())
+        self.metrics["task_backlog"] = self.timeseries["backlog"].tolist()
+        self.metrics["response_time_stats"] = self.response_stats.to_state()
+        # 信息平台未入队的报告：无单位可承接（如社区渍水，不计入积压）/ 队列饱和被丢弃
+        platform = self.registry.info_platform
+        self.metrics["dropped_reports"] = {
+            "unroutable": platform.metrics.get("unroutable_reports", 0) if platform else 0,
+            "saturated": platform.metrics.get("saturated_reports", 0) if platform else 0,
+        }
+        if self.router is not None:
+            self.metrics["road_cache"] = dict(self.router.network.stats)
+        
+    def save_checkpoint(self, path: str):
+        """保存检查点（见 checkpoint 模块）"""
+        from checkpoint import save_checkpoint
+        save_checkpoint(self, path)
+        
+    def snapshot(self) -> bytes:
+        """内存快照，可用于从同一状态派生多个分支"""
+        from checkpoint import dumps
+        return dumps(self)
+        
+    @classmethod
+    def load_checkpoint(cls, path: str, events: Optional[EventLog] = None) -> "FloodResponseModel":
+        """从检查点文件恢复"""
+        from checkpoint import load_checkpoint
+        return load_checkpoint(path, events)
+        
+    @classmethod
+    def from_snapshot(cls, data: bytes, events: Optional[EventLog] = None) -> "FloodResponseModel":
+        """从内存快照恢复"""
+        from checkpoint import loads
+        return loads(data, events)
+        
+    def _stage_report(self):
+        """每20步输出详细报告"""
+        if self.time_step % 20 == 0:
+            self.events.info("stage_report", "\n" + "=" * 60 + "\n阶段报告 (步数 {step})\n" + "=" * 60,
+                             step=self.time_step)
+            self.print_detailed_metrics()
+        
     def print_detailed_metrics(self):
         """输出详细指标"""
-        print("\n[详细性能指标]")
-        print("-" * 40)
+        if not self.events.enabled(INFO):
+            return
+        
+        self.events.info("report", "\n[详细性能指标]\n" + "-" * 40)
         
         agent_types = {}
         for agent in self.agents:
@@ -432,11 +758,12 @@ class FloodResponseModel:
                 agent_types[agent_type]["avg_response"] = agent.metrics['avg_response_time']
         
         for agent_type, stats in agent_types.items():
-            print(f"{agent_type}: {stats['count']}个，完成任务: {stats['tasks_completed']}，平均响应: {stats['avg_response']:.1f}步")
+            self.events.info("agent_type_report", "{agent_type}: {count}个，完成任务: {tasks_completed}，平均响应: {avg_response:.1f}步",
+                             agent_type=agent_type, **stats)
         
-        print(f"\n系统总体表现:")
         total = self.metrics['total_incidents']
         resolved = self.metrics['resolved_incidents']
-        print(f"事件解决率: {resolved}/{total} ({resolved/max(total,1)*100:.1f}%)")
-        print(f"瓶颈事件次数: {self.metrics['bottleneck_events']}")
-        print("-" * 40)
\ No newline at end of file
+        self.events.info("summary_report",
+                         "\n系统总体表现:\n事件解决率: {resolved}/{total} ({rate:.1f}%)\n瓶颈事件次数: {bottleneck_events}\n" + "-" * 40,
+                         resolved=resolved, total=total, rate=resolved / max(total, 1) * 100,
+                         bottleneck_events=self.metrics['bottleneck_events'])
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+分阶段性能剖析 - 统计每个时间步各阶段及各类智能体 process_inbox 的耗时
+
+启用方式：情景配置 "profile": True（可选 "profile_steps": [起始步, 结束步] 在该步区间挂接 cProfile），
+或直接设置 model.profiler = PhaseProfiler(...)。未启用时模型只多做几次 None 判断。
+
+阶段名称与 FloodResponseModel.step 的编号一致：
+rainfall, response_level, incidents, patrol, inbox:<智能体类型>, platform_dispatch,
+hierarchical_dispatch, coordination, metrics
+"""
+
+import cProfile
+import io
+import pstats
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+PHASES = ("rainfall", "response_level", "incidents", "patrol", "inbox",
+          "platform_dispatch", "hierarchical_dispatch", "coordination", "metrics")
+INBOX_PREFIX = "inbox:"
+
+
+class PhaseProfiler:
+    """分阶段计时器"""
+
+    def __init__(self, cprofile_steps: Optional[Tuple[int, int]] = None,
+                 cprofile_path: Optional[str] = None):
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.steps = 0
+        self._mark = 0.0
+        self.cprofile_steps = tuple(cprofile_steps) if cprofile_steps else None
+        self.cprofile_path = cprofile_path
+        self._cprofile: Optional[cProfile.Profile] = None
+        self.cprofile_stats: Optional[pstats.Stats] = None
+
+    def begin_step(self, step: int):
+        """时间步开始（step 为即将运行的步号）"""
+        if self.cprofile_steps and step == self.cprofile_steps[0]:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._mark = time.perf_counter()
+
+    def lap(self, name: str):
+        """把上次标记以来的耗时计入 name"""
+        now = time.perf_counter()
+        self.seconds[name] = self.seconds.get(name, 0.0) + (now - self._mark)
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self._mark = now
+
+    def lap_agent(self, agent):
+        """计入一个智能体的 process_inbox"""
+        self.lap(INBOX_PREFIX + agent.type.value)
+
+    def end_step(self, step: int):
+        self.steps += 1
+        if self._cprofile is not None and step >= self.cprofile_steps[1]:
+            self._finish_cprofile()
+
+    def _finish_cprofile(self):
+        self._cprofile.disable()
+        self.cprofile_stats = pstats.Stats(self._cprofile, stream=io.StringIO())
+        if self.cprofile_path:
+            self.cprofile_stats.dump_stats(self.cprofile_path)
+        self._cprofile = None
+
+    def close(self):
+        """运行结束时收尾（cProfile 区间超出运行步数时在此停止）"""
+        if self._cprofile is not None:
+            self._finish_cprofile()
+
+    def __getstate__(self):
+        # 随模型检查点保存时不带 cProfile 状态
+        state = self.__dict__.copy()
+        state["_cprofile"] = None
+        state["cprofile_stats"] = None
+        return state
+
+    def summary(self) -> Dict[str, float]:
+        """各阶段累计秒数；inbox 为各类智能体之和"""
+        result = {name: 0.0 for name in PHASES}
+        for name, seconds in self.seconds.items():
+            result[name] = result.get(name, 0.0) + seconds
+            if name.startswith(INBOX_PREFIX):
+                result["inbox"] += seconds
+        return result
+
+    def format_report(self) -> str:
+        """文本报告：阶段、累计耗时、每步耗时、占比"""
+        summary = self.summary()
+        total = sum(seconds for name, seconds in summary.items() if not name.startswith(INBOX_PREFIX))
+        steps = max(self.steps, 1)
+        lines = [f"{'阶段':<28}{'累计(s)':>10}{'每步(ms)':>10}{'占比':>8}"]
+        for name in _report_order(summary):
+            seconds = summary[name]
+            indent = "  " if name.startswith(INBOX_PREFIX) else ""
+            lines.append(f"{indent + name:<28}{seconds:>10.4f}{seconds / steps * 1000:>10.3f}"
+                         f"{seconds / total if total else 0:>8.1%}")
+        lines.append(f"{'合计':<28}{total:>10.4f}{total / steps * 1000:>10.3f}")
+        return "\n".join(lines)
+
+    def top_functions(self, limit: int = 20, sort: str = "cumulative") -> str:
+        """cProfile 区间内耗时最多的函数"""
+        if self.cprofile_stats is None:
+            return ""
+        stream = io.StringIO()
+        self.cprofile_stats.stream = stream
+        self.cprofile_stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+
+def _report_order(summary: Dict[str, float]) -> Iterable[str]:
+    for name in PHASES:
+        yield name
+        if name == "inbox":
+            yield from sorted((n for n in summary if n.startswith(INBOX_PREFIX)),
+                              key=lambda n: -summary[n])
+
+
+def merge_summaries(summaries: Iterable[Dict[str, float]]) -> Dict[str, float]:
+    """合并多次运行（如一次参数扫描）的阶段耗时"""
+    total: Dict[str, float] = {}
+    for summary in summaries:
+        for name, seconds in summary.items():
+            total[name] = total.get(name, 0.0) + seconds
+    return total
@@ -2,22 +2,19 @@
 快速演示脚本
 """
 
-import random
 from model import FloodResponseModel
 from scenarios import get_scenario_config
 
-def quick_demo(scenario="baseline", steps=30):
+def quick_demo(scenario="baseline", steps=30, seed=42):
     """快速演示"""
     print(f"\n{'='*60}")
     print(f"快速演示: {scenario}模式 ({steps}步)")
     print(f"{'='*60}")
     
-    random.seed(42)
-    
     config = get_scenario_config(scenario)
     config["steps"] = steps
     
-    model = FloodResponseModel(config)
+    model = FloodResponseModel(config, seed=seed)
     
     # 简略输出
     for i in range(steps):
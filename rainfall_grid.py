@@ -0,0 +1,161 @@
+"""
+格点降雨输入 - 通过内存映射读取 (步数, 行, 列) 的降雨格点序列，按区域取各自的雨强
+
+雷达/雨量站插值得到的历史暴雨格点数据（如 2020 年 7 月武汉暴雨）往往远大于内存：
+- 文件为 .npy（float32，形状 (T, ny, nx)），以 numpy.load(mmap_mode="r") 只读映射，不整体载入
+- 模型绑定需要的区域坐标（巡查范围、事件区域、行政区）后，每次只读取一个步数窗口内
+  这些区域所在格点的值（window × 区域数），窗口用完再读下一段
+- 进程间共享：配置中只保存路径，各工作进程各自映射同一文件，由操作系统页缓存共享；
+  对象序列化（检查点、进程池）时不携带映射和窗口数据
+
+全市雨强取各绑定区域的平均；巡查员按所在巡查范围、事件水深按事件区域取局部雨强。
+"""
+
+import math
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+Point = Tuple[float, float]
+
+DEFAULT_WINDOW = 16
+
+
+class GriddedRainfall:
+    """内存映射的格点降雨（配置 rainfall_grid 时启用）"""
+
+    def __init__(self, path: str, cell_km: float = 1.0, origin: Sequence[float] = (0.0, 0.0),
+                 step_offset: int = 0, window: int = DEFAULT_WINDOW, scale: float = 1.0):
+        if cell_km <= 0 or window <= 0:
+            raise ValueError("格点大小和窗口长度必须为正数")
+        self.path = path
+        self.cell_km = cell_km
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.step_offset = step_offset  # 模型第 t 步对应文件第 step_offset + t 帧
+        self.window = window
+        self.scale = scale              # 单位换算（如文件为 0.1mm）
+        self._data: Optional[np.ndarray] = None
+        self._names: Dict[str, int] = {}
+        self._rows = np.zeros(0, dtype=np.intp)
+        self._cols = np.zeros(0, dtype=np.intp)
+        self._window_start = -1
+        self._values: Optional[np.ndarray] = None  # (窗口步数, 区域数)
+        self._citywide: Optional[np.ndarray] = None
+
+    @property
+    def data(self) -> np.ndarray:
+        """只读内存映射（首次访问时打开）"""
+        if self._data is None:
+            data = np.load(self.path, mmap_mode="r")
+            if data.ndim != 3:
+                raise ValueError(f"格点降雨应为 (步数, 行, 列) 三维数组，实际形状 {data.shape}")
+            self._data = data
+        return self._data
+
+    @property
+    def steps(self) -> int:
+        """可覆盖的模型步数（第 0..steps 步各取一帧）"""
+        return self.data.shape[0] - self.step_offset - 1
+
+    def bind(self, points: Dict[str, Point]):
+        """登记需要取值的区域坐标（超出格点范围的取边缘格点）"""
+        _, ny, nx = self.data.shape
+        for name, point in points.items():
+            if name in self._names:
+                continue
+            self._names[name] = len(self._names)
+            col = min(max(math.floor((point[0] - self.origin[0]) / self.cell_km), 0), nx - 1)
+            row = min(max(math.floor((point[1] - self.origin[1]) / self.cell_km), 0), ny - 1)
+            self._rows = np.append(self._rows, row)
+            self._cols = np.append(self._cols, col)
+        self._window_start = -1  # 区域变化后重新读取窗口
+
+    def _load(self, step: int):
+        """读取包含 step 的窗口（只取绑定区域所在格点）"""
+        frame = self.step_offset + step
+        total = self.data.shape[0]
+        if not 0 <= frame < total:
+            raise IndexError(f"格点降雨只有 {total} 帧，无法提供第 {step} 步（偏移 {self.step_offset}）")
+        start = frame - frame % self.window
+        block = self.data[start:start + self.window]
+        self._values = np.asarray(block[:, self._rows, self._cols], dtype=np.float64) * self.scale
+        self._citywide = self._values.mean(axis=1) if len(self._names) else np.zeros(len(block))
+        self._window_start = start
+
+    def _row(self, step: int) -> int:
+        frame = self.step_offset + step
+        # 按实际读入的帧数判断（文件末尾的窗口可能不足 window 帧）
+        if self._values is None or not self._window_start <= frame < self._window_start + len(self._values):
+            self._load(step)
+        return frame - self._window_start
+
+    def citywide(self, step: int) -> float:
+        """全市雨强（各区域平均）"""
+        row = self._row(step)
+        return float(self._citywide[row])
+
+    def at(self, step: int, name: str) -> float:
+        """区域雨强"""
+        row = self._row(step)
+        return float(self._values[row, self._names[name]])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def __getstate__(self):
+        # 映射与窗口不随对象序列化，恢复后按路径重新映射
+        state = self.__dict__.copy()
+        state.update(_data=None, _values=None, _citywide=None, _window_start=-1)
+        return state
+
+
+def write_grid(path: str, frames: np.ndarray):
+    """把 (步数, 行, 列) 数组写成可内存映射的 .npy（float32）"""
+    np.save(path, np.asarray(frames, dtype=np.float32))
+
+
+def synthesize_storm(path: str, steps: int = 80, size: int = 100, cell_km: float = 1.0,
+                     seed: int = 42, chunk: int = 16):
+    """生成一个移动暴雨团的格点序列（演示用），逐块写入，不在内存中保留全部帧"""
+    from numpy.lib.format import open_memmap
+
+    rng = np.random.default_rng(seed)
+    out = open_memmap(path, mode="w+", dtype=np.float32, shape=(steps + 1, size, size))
+    coords = (np.arange(size) + 0.5) * cell_km
+    xs, ys = np.meshgrid(coords, coords)
+    extent = size * cell_km
+    for start in range(0, steps + 1, chunk):
+        for t in range(start, min(start + chunk, steps + 1)):
+            # 阶段强度与模型的合成降雨规则大致一致，暴雨中心自西向东移动
+            peak = 30.0 if t < 20 else (60.0 if t < 50 else 90.0)
+            cx = extent * (0.1 + 0.8 * t / max(steps, 1))
+            cy = extent * (0.5 + 0.15 * math.sin(t / 7))
+            radius = extent * 0.25
+            core = np.exp(-((xs - cx) ** 2 + (ys - cy) ** 2) / (2 * radius ** 2))
+            noise = rng.gamma(4.0, 0.25, size=(size, size))
+            out[t] = (10.0 + peak * core) * noise
+        out.flush()
+    del out
+
+
+def grid_points(config: Dict, geometry, names: Iterable[str]) -> Dict[str, Point]:
+    """需要取雨强的区域坐标（配置给出的行政区坐标 + 各地点）"""
+    points = {name: tuple(p) for name, p in config.get("districts", {}).items()}
+    for name in names:
+        points[name] = geometry.point(name)
+    return points
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="生成演示用的格点降雨文件")
+    parser.add_argument("path", help="输出 .npy 路径")
+    parser.add_argument("--steps", type=int, default=80, help="步数")
+    parser.add_argument("--size", type=int, default=100, help="格点边长（格数）")
+    parser.add_argument("--cell-km", type=float, default=1.0, help="格点大小（公里）")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    synthesize_storm(args.path, args.steps, args.size, args.cell_km, args.seed)
+    print(f"已写出 {args.steps + 1}×{args.size}×{args.size} 格点降雨: {args.path}")
@@ -0,0 +1,287 @@
+"""
+实时模式 - asyncio 驱动，模型随外部降雨/事件读数按墙钟（或加速）推进
+
+数据源每行一条 JSON 读数（JSONL）：
+    {"step": 12, "rainfall": 63.5,
+     "incidents": [{"incident_type": "道路积水", "location": "区域3", "water_depth": 45.0}]}
+step 可省略（按到达顺序编号），incidents 可省略，事件缺少 urgency 时按水深计算。
+
+- 数据源：回放文件或命名管道（FileSource，在线程中逐行读取）、本地套接字（SocketSource）
+- 背压：读取协程与推进协程之间是有界 asyncio.Queue，队列满时读取方等待，
+  不再从文件/套接字读取（套接字由 TCP 流控传导给发送方）
+- 节拍：第 t 步在 t × step_seconds / speed 秒时开始；到点仍未收到本步读数时沿用
+  上一步降雨、不生成事件（记为缺测），过期读数丢弃
+- 延迟：每步模型计算耗时进入流式统计，超过单步预算（step_seconds / speed）记为超时
+
+只支持逐步引擎；读数通过 model.live_input 注入降雨和事件生成阶段。
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from base_types import IncidentType
+from stats import StreamingStats
+
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_STEP_SECONDS = 1.0
+
+
+@dataclass
+class StepReading:
+    """一步的外部读数"""
+    step: Optional[int]
+    rainfall: float
+    incidents: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "StepReading":
+        return cls(record.get("step"), float(record["rainfall"]), list(record.get("incidents", ())))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"step": self.step, "rainfall": self.rainfall, "incidents": self.incidents}
+
+
+def parse_line(line: str) -> Optional[StepReading]:
+    line = line.strip()
+    return StepReading.from_dict(json.loads(line)) if line else None
+
+
+class FileSource:
+    """逐行读取回放文件或命名管道（阻塞读放在线程中，不占用事件循环）"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def readings(self) -> AsyncIterator[StepReading]:
+        f = await asyncio.to_thread(open, self.path, encoding="utf-8")
+        try:
+            while True:
+                line = await asyncio.to_thread(f.readline)
+                if not line:
+                    return
+                reading = parse_line(line)
+                if reading is not None:
+                    yield reading
+        finally:
+            f.close()
+
+
+class SocketSource:
+    """在本地端口监听，读取第一个连接发送的 JSONL 读数"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.bound = asyncio.Event()  # 监听开始后置位，port 为实际端口
+
+    async def readings(self) -> AsyncIterator[StepReading]:
+        connected: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+        async def on_connect(reader, writer):
+            await connected.put((reader, writer))
+
+        server = await asyncio.start_server(on_connect, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self.bound.set()
+        try:
+            reader, writer = await connected.get()
+            server.close()
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        return
+                    reading = parse_line(line.decode("utf-8"))
+                    if reading is not None:
+                        yield reading
+            finally:
+                writer.close()
+        finally:
+            server.close()
+
+
+class RealtimeRunner:
+    """实时运行器"""
+
+    def __init__(self, model, source, step_seconds: float = DEFAULT_STEP_SECONDS, speed: float = 1.0,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, paced: bool = True):
+        if model.engine != "stepped":
+            raise ValueError("实时模式只支持逐步引擎")
+        if step_seconds <= 0 or speed <= 0:
+            raise ValueError("步长和加速倍数必须为正数")
+        self.model = model
+        self.source = source
+        self.budget = step_seconds / speed  # 每步的墙钟预算（秒）
+        self.queue_size = queue_size
+        self.paced = paced                  # False 时读数一到即推进（尽快回放）
+        self.latency = StreamingStats()     # 每步模型计算耗时（微秒，直方图按整数计）
+        self.source_error: Optional[Exception] = None
+        self.counts = {"steps": 0, "readings": 0, "missed": 0, "late": 0, "overruns": 0, "queue_full": 0}
+
+    async def _produce(self, queue: asyncio.Queue):
+        """读取数据源并放入有界队列（满时等待，形成背压）"""
+        try:
+            async for reading in self.source.readings():
+                if queue.full():
+                    self.counts["queue_full"] += 1
+                await queue.put(reading)
+        except (OSError, ValueError, KeyError) as exc:
+            # 数据源断开或读数格式错误：记录后按数据源结束处理
+            self.source_error = exc
+            self.model.events.warning("realtime_source_error", "实时数据源错误: {error}", error=repr(exc))
+        await queue.put(None)
+
+    async def run(self, until: Optional[int] = None) -> Dict[str, Any]:
+        """运行到 until 步（默认情景步数）或数据源结束"""
+        model = self.model
+        end_step = model.steps if until is None else min(until, model.steps)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        producer = asyncio.create_task(self._produce(queue))
+        loop = asyncio.get_running_loop()
+        start = loop.time() - model.time_step * self.budget
+        held: Optional[StepReading] = None  # 提前到达的后续步读数
+        ended = False
+        rainfall = model.current_rainfall
+
+        try:
+            while model.time_step < end_step and not (ended and held is None):
+                step = model.time_step + 1
+                deadline = start + step * self.budget
+                reading = None
+                while reading is None and not ended:
+                    if held is not None:
+                        candidate, held = held, None
+                    else:
+                        if not queue.empty():
+                            candidate = queue.get_nowait()
+                        else:
+                            timeout = max(deadline - loop.time(), 0) if self.paced else None
+                            try:
+                                candidate = await asyncio.wait_for(queue.get(), timeout)
+                            except asyncio.TimeoutError:
+                                break
+                        if candidate is None:
+                            ended = True
+                            break
+                        self.counts["readings"] += 1
+                        if candidate.step is None:
+                            candidate.step = step
+                    if candidate.step < step:
+                        self.counts["late"] += 1
+                    elif candidate.step > step:
+                        held = candidate
+                        break
+                    else:
+                        reading = candidate
+                if reading is None and ended and held is None:
+                    break
+
+                if self.paced:
+                    await asyncio.sleep(max(deadline - loop.time(), 0))
+                if reading is None:
+                    self.counts["missed"] += 1
+                    reading = StepReading(step, rainfall)
+                rainfall = reading.rainfall
+
+                t0 = time.perf_counter()
+                model.live_input = reading
+                model.step()
+                model.live_input = None
+                elapsed = time.perf_counter() - t0
+                model._stage_report()
+
+                self.counts["steps"] += 1
+                self.latency.add(elapsed * 1e6)
+                if elapsed > self.budget:
+                    self.counts["overruns"] += 1
+                    model.events.warning("realtime_overrun", "[{step}] 实时模式单步耗时 {ms:.1f}ms，超过预算 {budget:.1f}ms",
+                                         step=model.time_step, ms=elapsed * 1000, budget=self.budget * 1000)
+                # 让出事件循环，读取协程可及时补充队列
+                await asyncio.sleep(0)
+        finally:
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+        model._finish_run()
+        model.metrics["realtime"] = self.report()
+        return model.metrics
+
+    def report(self) -> Dict[str, Any]:
+        """单步延迟分布（毫秒）与计数"""
+        latency = {key: value / 1000 if key != "count" else value for key, value in self.latency.summary().items()}
+        return dict(self.counts, budget_ms=self.budget * 1000, latency_ms=latency)
+
+
+def live_incident(record: Dict[str, Any]) -> Dict[str, Any]:
+    """外部事件报告 -> 模型事件字段（缺省值与模型生成规则一致）"""
+    water_depth = float(record.get("water_depth", 30.0))
+    return {
+        "incident_type": IncidentType.from_string(record.get("incident_type", "道路积水")),
+        "location": record.get("location", "未知区域"),
+        "water_depth": water_depth,
+        "urgency": float(record.get("urgency", min(0.3 + water_depth / 100, 0.95))),
+    }
+
+
+def write_feed(path: str, steps: int, seed: int = 42, num_locations: int = 20):
+    """由批量外生生成器写出一个回放文件（演示与测试用的数据源）"""
+    from exogenous import INCIDENT_TYPES, generate_exogenous
+
+    series = generate_exogenous(1, steps, seed, num_locations).replication(0)
+    with open(path, "w", encoding="utf-8") as f:
+        for t in range(1, steps + 1):
+            incidents = [{
+                "incident_type": INCIDENT_TYPES[series.incident_type[t, k]].value,
+                "location": f"区域{series.incident_location[t, k]}",
+                "water_depth": round(float(series.water_depth[t, k]), 2),
+            } for k in range(int(series.incident_count[t]))]
+            f.write(json.dumps({"step": t, "rainfall": round(float(series.rainfall[t]), 2),
+                                "incidents": incidents}, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from events import make_event_log
+    from model import FloodResponseModel
+    from scenarios import get_scenario_config
+
+    parser = argparse.ArgumentParser(description="实时模式（回放文件/命名管道/本地套接字）")
+    parser.add_argument("--scenario", default="baseline", help="情景")
+    parser.add_argument("--feed", help="回放文件或命名管道路径")
+    parser.add_argument("--port", type=int, default=None, help="在本地端口监听读数")
+    parser.add_argument("--write-feed", metavar="PATH", help="生成一个回放文件后退出")
+    parser.add_argument("--steps", type=int, default=80, help="模拟步数")
+    parser.add_argument("--step-seconds", type=float, default=DEFAULT_STEP_SECONDS, help="每步对应的墙钟秒数")
+    parser.add_argument("--speed", type=float, default=1.0, help="相对墙钟的加速倍数")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="读数队列容量")
+    parser.add_argument("--unpaced", action="store_true", help="不按墙钟节拍，读数一到即推进")
+    args = parser.parse_args()
+
+    if args.write_feed:
+        write_feed(args.write_feed, args.steps)
+        print(f"已写出 {args.steps} 步读数: {args.write_feed}")
+        raise SystemExit(0)
+    if args.feed:
+        source = FileSource(args.feed)
+    elif args.port is not None:
+        source = SocketSource(port=args.port)
+    else:
+        parser.error("需要 --feed 或 --port")
+
+    config = dict(get_scenario_config(args.scenario), steps=args.steps)
+    model = FloodResponseModel(config, events=make_event_log("silent"))
+    runner = RealtimeRunner(model, source, args.step_seconds, args.speed, args.queue_size, paced=not args.unpaced)
+    metrics = asyncio.run(runner.run())
+    report = metrics["realtime"]
+    latency = report["latency_ms"]
+    print(f"{report['steps']} 步，读数 {report['readings']}，缺测 {report['missed']}，过期 {report['late']}，"
+          f"超时 {report['overruns']}（预算 {report['budget_ms']:.1f}ms）")
+    print(f"单步耗时 ms: 平均 {latency['mean']:.2f}，p50 {latency['p50']:.2f}，p99 {latency['p99']:.2f}，最大 {latency['max']:.2f}")
+    print(f"事件 {metrics['total_incidents']}，解决 {metrics['resolved_incidents']}")
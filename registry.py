@@ -0,0 +1,93 @@
+"""
+智能体注册表 - 按类型索引，替代每步的 isinstance 线性扫描
+"""
+
+from typing import Dict, Iterator, List, Optional
+from base_types import AgentType, BaseAgent
+
+# 单例角色：每个模型至多一个
+SINGLETON_TYPES = (AgentType.COMMAND_CENTER, AgentType.WATER_BUREAU, AgentType.INFO_PLATFORM)
+
+# 可接收平台分派任务的类型
+DISPATCHABLE_TYPES = (AgentType.WATER_BUREAU, AgentType.TRAFFIC_POLICE, AgentType.RESCUE_TEAM)
+
+
+class AgentRegistry:
+    """智能体注册表"""
+
+    def __init__(self):
+        self._agents: List[BaseAgent] = []
+        self._by_type: Dict[AgentType, List[BaseAgent]] = {t: [] for t in AgentType}
+        self._by_name: Dict[str, BaseAgent] = {}
+        self._candidates: Optional[List[BaseAgent]] = None
+
+    def add(self, agent: BaseAgent):
+        """注册智能体"""
+        if agent.type in SINGLETON_TYPES and self._by_type[agent.type]:
+            raise ValueError(f"{agent.type.value}已存在，不能重复注册")
+        self._agents.append(agent)
+        self._by_type[agent.type].append(agent)
+        self._by_name[str(agent)] = agent
+        self._candidates = None
+
+    def remove(self, agent: BaseAgent):
+        """注销智能体"""
+        self._agents.remove(agent)
+        self._by_type[agent.type].remove(agent)
+        self._by_name.pop(str(agent), None)
+        self._candidates = None
+
+    @property
+    def agents(self) -> List[BaseAgent]:
+        """全部智能体（按注册顺序，只读）"""
+        return self._agents
+
+    def of_type(self, agent_type: AgentType) -> List[BaseAgent]:
+        """按类型获取智能体列表（只读，勿修改）"""
+        return self._by_type[agent_type]
+
+    def get(self, name: str) -> Optional[BaseAgent]:
+        """按名称（类型_编号）查找智能体"""
+        return self._by_name.get(name)
+
+    def _single(self, agent_type: AgentType) -> Optional[BaseAgent]:
+        agents = self._by_type[agent_type]
+        return agents[0] if agents else None
+
+    @property
+    def command_center(self):
+        return self._single(AgentType.COMMAND_CENTER)
+
+    @property
+    def water_bureau(self):
+        return self._single(AgentType.WATER_BUREAU)
+
+    @property
+    def info_platform(self):
+        return self._single(AgentType.INFO_PLATFORM)
+
+    @property
+    def traffic_police(self) -> List[BaseAgent]:
+        return self._by_type[AgentType.TRAFFIC_POLICE]
+
+    @property
+    def rescue_teams(self) -> List[BaseAgent]:
+        return self._by_type[AgentType.RESCUE_TEAM]
+
+    @property
+    def inspectors(self) -> List[BaseAgent]:
+        return self._by_type[AgentType.INSPECTOR]
+
+    def dispatch_candidates(self) -> List[BaseAgent]:
+        """信息平台可分派的智能体（同类型内保持注册顺序）"""
+        if self._candidates is None:
+            self._candidates = []
+            for agent_type in DISPATCHABLE_TYPES:
+                self._candidates.extend(self._by_type[agent_type])
+        return self._candidates
+
+    def __iter__(self) -> Iterator[BaseAgent]:
+        return iter(self._agents)
+
+    def __len__(self) -> int:
+        return len(self._agents)
@@ -0,0 +1,148 @@
+"""
+蒙特卡洛重复实验 - 将 (情景, 重复编号) 任务分发到进程池并流式回收结果
+"""
+
+import os
+import time
+from multiprocessing import Pool
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from cache import run_key
+from events import make_event_log
+from model import FloodResponseModel
+from rng import DEFAULT_SEED, replication_streams
+from scenarios import get_scenario_config
+
+# (情景名, 重复编号, 根种子, 步数, 事件日志根目录)
+Job = Tuple[str, int, int, Optional[int], Optional[str]]
+
+
+def run_log_dir(config: Dict[str, Any], name: str, replication: int, seed: int) -> str:
+    """一次运行专用的事件日志目录：<incident_log_path>/<名称>-r<重复编号>-<运行键前缀>
+
+    IncidentLog 打开目录时会清空其中的旧块，多个运行共用一个目录会互相覆盖；
+    目录名带上与结果缓存相同的运行键，缓存命中的结果指向的正是写出它的那次运行的文件。
+    """
+    return os.path.join(config["incident_log_path"], f"{name}-r{replication}-{run_key(config, replication, seed)[:12]}")
+
+
+def run_spill_path(config: Dict[str, Any], name: str, replication: int, seed: int) -> str:
+    """一次运行专用的消息溢写文件：<outbox_spill_path 去扩展名>-<名称>-r<重复编号>-<运行键前缀><扩展名>"""
+    root, ext = os.path.splitext(config["outbox_spill_path"])
+    return f"{root}-{name}-r{replication}-{run_key(config, replication, seed)[:12]}{ext}"
+
+
+def run_config(config: Dict[str, Any], replication: int, seed: int = DEFAULT_SEED,
+               name: Optional[str] = None) -> Dict[str, Any]:
+    """以第 replication 次重复的随机数流运行一个配置（静默模式），返回指标
+
+    配置指定 incident_log_path 时，它是根目录，本次运行写入其下的专用目录（run_log_dir）；
+    消息溢写文件（outbox_spill_path）同样按运行改为专用文件名（run_spill_path）。
+    """
+    name = name or config.get("mode", "run")
+    overrides = {}
+    if config.get("incident_log_path"):
+        overrides["incident_log_path"] = run_log_dir(config, name, replication, seed)
+    if config.get("outbox_spill_path"):
+        overrides["outbox_spill_path"] = run_spill_path(config, name, replication, seed)
+    if overrides:
+        config = dict(config, **overrides)
+    model = FloodResponseModel(config, events=make_event_log("silent"),
+                               seed=replication_streams(seed, replication))
+    return model.run()
+
+
+def scenario_config(scenario_name: str, steps: Optional[int] = None,
+                    incident_log_dir: Optional[str] = None) -> Dict[str, Any]:
+    """情景配置副本（可覆盖步数、指定事件日志根目录）"""
+    config = dict(get_scenario_config(scenario_name))
+    if steps:
+        config["steps"] = steps
+    if incident_log_dir:
+        config["incident_log_path"] = incident_log_dir
+    return config
+
+
+def run_replication(job: Job) -> Tuple[str, int, Dict[str, Any]]:
+    """在工作进程中运行一次重复实验（静默模式）"""
+    scenario_name, replication, seed, steps, incident_log_dir = job
+    config = scenario_config(scenario_name, steps, incident_log_dir)
+    return scenario_name, replication, run_config(config, replication, seed, name=scenario_name)
+
+
+def print_progress(done: int, total: int, elapsed: float):
+    """默认进度输出（约每 10% 一次）"""
+    step = max(total // 10, 1)
+    if done % step == 0 or done == total:
+        rate = done / elapsed if elapsed > 0 else 0
+        print(f"进度: {done}/{total} ({done / total:.0%})，{rate:.1f} 次/秒")
+
+
+class ReplicationRunner:
+    """重复实验运行器"""
+
+    def __init__(self, scenarios: List[str], replications: int = 1, steps: Optional[int] = None,
+                 seed: int = DEFAULT_SEED, workers: Optional[int] = None, cache=None,
+                 incident_log_dir: Optional[str] = None):
+        self.scenarios = scenarios
+        self.replications = replications
+        self.steps = steps
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache  # cache.ResultCache，命中的任务不再运行
+        self.incident_log_dir = incident_log_dir  # 事件日志根目录，每次运行写入其下的专用目录
+
+    def jobs(self) -> List[Job]:
+        """全部任务；同一重复编号在各情景间共用随机数流，便于配对比较"""
+        return [(scenario, r, self.seed, self.steps, self.incident_log_dir)
+                for r in range(self.replications)
+                for scenario in self.scenarios]
+
+    def iter_results(self) -> Iterator[Tuple[str, int, Dict[str, Any]]]:
+        """按完成顺序逐个产出结果（先产出缓存命中的结果）"""
+        jobs = self.jobs()
+        if self.cache is None:
+            yield from self._run_jobs(jobs)
+            return
+
+        keys, pending = {}, []
+        for job in jobs:
+            scenario_name, replication, seed, steps, incident_log_dir = job
+            key = self.cache.key(scenario_config(scenario_name, steps, incident_log_dir), replication, seed)
+            metrics = self.cache.get(key)
+            if metrics is None:
+                keys[scenario_name, replication] = key
+                pending.append(job)
+            else:
+                yield scenario_name, replication, metrics
+        for scenario_name, replication, metrics in self._run_jobs(pending):
+            self.cache.put(keys[scenario_name, replication], metrics)
+            yield scenario_name, replication, metrics
+
+    def _run_jobs(self, jobs: List[Job]) -> Iterator[Tuple[str, int, Dict[str, Any]]]:
+        if self.workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                yield run_replication(job)
+            return
+
+        # 单次模拟很短，按块分发以摊薄进程间通信开销
+        chunksize = max(1, len(jobs) // (self.workers * 8))
+        with Pool(processes=min(self.workers, len(jobs))) as pool:
+            for result in pool.imap_unordered(run_replication, jobs, chunksize=chunksize):
+                yield result
+
+    def run(self, analyzer=None,
+            progress: Optional[Callable[[int, int, float], None]] = print_progress) -> int:
+        """运行全部任务，结果到达即送入分析器；返回完成数"""
+        total = self.replications * len(self.scenarios)
+        start_time = time.time()
+        done = 0
+
+        for scenario_name, replication, metrics in self.iter_results():
+            if analyzer is not None:
+                analyzer.add_replication_result(scenario_name, replication, metrics)
+            done += 1
+            if progress:
+                progress(done, total, time.time() - start_time)
+
+        return done
@@ -0,0 +1,52 @@
+"""
+随机数流 - 每个模型独立、可派生的随机数生成器，替代全局 random 模块
+
+所有子流的种子都由根种子和键路径经 SHA-256 派生，因此：
+- 同一根种子 + 同一键路径 => 完全相同的序列（可在任意进程复现）
+- 不同键路径（子系统、智能体、重复实验编号）=> 相互独立的序列
+"""
+
+import hashlib
+import random
+from typing import Dict, List, Tuple
+
+DEFAULT_SEED = 42
+
+
+def derive_seed(root_seed: int, key: Tuple) -> int:
+    """由根种子和键路径派生 128 位子种子"""
+    digest = hashlib.sha256(repr((root_seed,) + tuple(key)).encode("utf-8")).digest()
+    return int.from_bytes(digest[:16], "big")
+
+
+class RandomStreams:
+    """按名称派生的随机数流集合"""
+
+    def __init__(self, seed: int = DEFAULT_SEED, key: Tuple = ()):
+        self.seed = seed
+        self.key = tuple(key)
+        self._streams: Dict[str, random.Random] = {}
+
+    def stream(self, name: str) -> random.Random:
+        """获取（首次创建）指定名称的随机数流"""
+        rng = self._streams.get(name)
+        if rng is None:
+            rng = random.Random(derive_seed(self.seed, self.key + (name,)))
+            self._streams[name] = rng
+        return rng
+
+    def child(self, name) -> "RandomStreams":
+        """派生子流集合（如某个子系统或某个智能体）"""
+        return RandomStreams(self.seed, self.key + (name,))
+
+    def spawn(self, n: int) -> List["RandomStreams"]:
+        """派生 n 个相互独立的子流集合（用于重复实验）"""
+        return [self.child(("spawn", i)) for i in range(n)]
+
+    def __repr__(self):
+        return f"RandomStreams(seed={self.seed}, key={self.key})"
+
+
+def replication_streams(seed: int, replication: int) -> RandomStreams:
+    """第 replication 次重复实验的随机数流（与运行在哪个进程无关）"""
+    return RandomStreams(seed).child(("spawn", replication))
@@ -0,0 +1,219 @@
+"""
+道路网络 - 路网最短路行程时间，积水/交通管制封闭路段，最短路树缓存与增量更新
+
+- RoadNetwork：无向路网（节点坐标 + 路段长度，公里）。路段可按步数临时封闭，
+  到期自动恢复通行。以源节点为根的最短路树（Dijkstra）按需计算并缓存（LRU）：
+  · 封闭路段只作废用到该路段的树（路段在树中当且仅当一端是另一端的父节点）；
+  · 恢复路段时距离只会变短，从受益端点出发做局部松弛修补，不重新计算整棵树。
+  封闭状态不变时缓存永远有效，每次调度只是一次查表。
+- Router：地点名称 -> 坐标 -> 最近路网节点，给出抢险队赶赴事件地点的行程步数。
+  目标节点的路段全部封闭时开到封闭区边缘、最后一段按涉水速度计；
+  仍不连通时按直线距离和涉水速度估计。
+
+配置 road_network=True 时启用：默认在城市范围内生成方格路网（road_spacing_km），
+也可由 road_nodes（名称 -> 坐标）和 road_edges（[名称, 名称] 列表）给出自定义路网。
+"""
+
+import heapq
+import math
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from spatial import CityGeometry, GridIndex, Point, distance
+
+DEFAULT_SPEED = 10.0          # 通行速度（公里/步）
+DEFAULT_WADING_FACTOR = 0.25  # 路网不通时涉水/绕行速度相对通行速度的比例
+DEFAULT_CACHE_SIZE = 256      # 缓存的最短路树个数
+DEFAULT_CLOSURE_DEPTH = 50.0  # 事件水深达到该值（厘米）时封闭附近路段，与交通管制阈值一致
+DEFAULT_CLOSURE_STEPS = 10    # 路段封闭持续步数
+
+_Tree = Tuple[List[float], List[int]]  # (距离, 父节点)
+
+
+class RoadNetwork:
+    """路网与最短路树缓存"""
+
+    def __init__(self, points: Sequence[Point], edges: Iterable[Tuple[int, int]],
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.points: List[Point] = [tuple(p) for p in points]
+        self.adjacency: List[Dict[int, float]] = [{} for _ in self.points]
+        for u, v in edges:
+            if u != v:
+                length = distance(self.points[u], self.points[v])
+                self.adjacency[u][v] = length
+                self.adjacency[v][u] = length
+        self.closed: Dict[Tuple[int, int], int] = {}  # (u, v), u < v -> 恢复通行的时间步
+        self.cache_size = cache_size
+        self._trees: "OrderedDict[int, _Tree]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "invalidated": 0, "repaired": 0}
+        cell = math.sqrt(_bbox_area(self.points) / max(1, len(self.points))) or 1.0
+        self._nodes = GridIndex(cell)
+        for i, p in enumerate(self.points):
+            self._nodes.insert(i, p)
+
+    @classmethod
+    def lattice(cls, extent: float, spacing: float, **kwargs) -> "RoadNetwork":
+        """覆盖 [0, extent]² 的方格路网"""
+        if spacing <= 0:
+            raise ValueError("路网间距必须为正数")
+        n = int(extent // spacing) + 1
+        points = [(i * spacing, j * spacing) for j in range(n) for i in range(n)]
+        edges = []
+        for j in range(n):
+            for i in range(n):
+                k = j * n + i
+                if i + 1 < n:
+                    edges.append((k, k + 1))
+                if j + 1 < n:
+                    edges.append((k, k + n))
+        return cls(points, edges, **kwargs)
+
+    @classmethod
+    def from_named(cls, nodes: Dict[str, Point], edges: Iterable[Tuple[str, str]], **kwargs) -> "RoadNetwork":
+        """由命名节点和路段构造"""
+        names = list(nodes)
+        index = {name: i for i, name in enumerate(names)}
+        return cls([nodes[name] for name in names], [(index[a], index[b]) for a, b in edges], **kwargs)
+
+    def nearest_node(self, point: Point) -> int:
+        return self._nodes.nearest(point)
+
+    # ---- 封闭与恢复 ----
+
+    def is_closed(self, u: int, v: int) -> bool:
+        return _key(u, v) in self.closed
+
+    def close_edge(self, u: int, v: int, until: int):
+        """封闭路段直到 until 步（已封闭时延长）"""
+        key = _key(u, v)
+        if key in self.closed:
+            self.closed[key] = max(self.closed[key], until)
+            return
+        self.closed[key] = until
+        # 只作废用到该路段的最短路树
+        for source in [s for s, (_, parent) in self._trees.items() if parent[v] == u or parent[u] == v]:
+            del self._trees[source]
+            self.stats["invalidated"] += 1
+
+    def close_around(self, node: int, until: int):
+        """封闭与节点相连的全部路段（积水点/管制点）"""
+        for neighbor in self.adjacency[node]:
+            self.close_edge(node, neighbor, until)
+
+    def reopen_expired(self, current_step: int) -> int:
+        """恢复到期路段，返回恢复的路段数"""
+        expired = [key for key, until in self.closed.items() if until <= current_step]
+        for u, v in expired:
+            del self.closed[(u, v)]
+            for tree in self._trees.values():
+                if self._repair(tree, u, v):
+                    self.stats["repaired"] += 1
+        return len(expired)
+
+    def _repair(self, tree: _Tree, u: int, v: int) -> bool:
+        """路段恢复后局部松弛（距离只减不增），返回树是否改变"""
+        dist, parent = tree
+        length = self.adjacency[u][v]
+        heap = []
+        for a, b in ((u, v), (v, u)):
+            if dist[a] + length < dist[b]:
+                dist[b] = dist[a] + length
+                parent[b] = a
+                heap.append((dist[b], b))
+        if not heap:
+            return False
+        heapq.heapify(heap)
+        self._relax(dist, parent, heap)
+        return True
+
+    # ---- 最短路 ----
+
+    def _relax(self, dist: List[float], parent: List[int], heap: list):
+        adjacency, closed = self.adjacency, self.closed
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            for neighbor, length in adjacency[node].items():
+                nd = d + length
+                if nd < dist[neighbor] and (not closed or _key(node, neighbor) not in closed):
+                    dist[neighbor] = nd
+                    parent[neighbor] = node
+                    heapq.heappush(heap, (nd, neighbor))
+
+    def tree(self, source: int) -> _Tree:
+        """以 source 为根的最短路树（缓存）"""
+        tree = self._trees.get(source)
+        if tree is not None:
+            self._trees.move_to_end(source)
+            self.stats["hits"] += 1
+            return tree
+        self.stats["misses"] += 1
+        n = len(self.points)
+        dist = [math.inf] * n
+        parent = [-1] * n
+        dist[source] = 0.0
+        self._relax(dist, parent, [(0.0, source)])
+        tree = (dist, parent)
+        self._trees[source] = tree
+        if len(self._trees) > self.cache_size:
+            self._trees.popitem(last=False)
+        return tree
+
+    def precompute(self, sources: Iterable[int]):
+        """预先计算一组源节点的最短路树（如抢险队驻地）"""
+        for source in sources:
+            self.tree(source)
+
+    def path_length(self, source: int, target: int) -> float:
+        """最短路长度（公里，不连通时为 inf）"""
+        return self.tree(source)[0][target]
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+
+def _key(u: int, v: int) -> Tuple[int, int]:
+    return (u, v) if u < v else (v, u)
+
+
+def _bbox_area(points: Sequence[Point]) -> float:
+    if not points:
+        return 0.0
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return (max(xs) - min(xs)) * (max(ys) - min(ys))
+
+
+class Router:
+    """抢险队行程时间（配置 road_network=True 时注入抢险队）"""
+
+    def __init__(self, geometry: CityGeometry, network: RoadNetwork, speed: float = DEFAULT_SPEED,
+                 wading_factor: float = DEFAULT_WADING_FACTOR):
+        if speed <= 0:
+            raise ValueError("通行速度必须为正数")
+        self.geometry = geometry
+        self.network = network
+        self.speed = speed
+        self.wading_factor = wading_factor
+
+    def travel(self, origin: Point, location: Optional[str]) -> Tuple[int, Point]:
+        """从 origin 赶赴地点所需步数及目的地坐标"""
+        target = self.geometry.point(location)
+        network = self.network
+        u, v = network.nearest_node(origin), network.nearest_node(target)
+        dist = network.tree(u)[0]
+        road = dist[v]
+        if math.isinf(road) and network.adjacency[v]:
+            # 目标处路段封闭：开到封闭区边缘，最后一段涉水进入
+            road = min(dist[w] + length / self.wading_factor for w, length in network.adjacency[v].items())
+        if math.isinf(road):
+            km = distance(origin, target) / self.wading_factor
+        else:
+            # 进出路网的接驳段按直线计
+            km = distance(origin, network.points[u]) + road + distance(network.points[v], target)
+        return math.ceil(km / self.speed), target
+
+    def close_near(self, location: Optional[str], until: int):
+        """封闭地点附近的路段"""
+        self.network.close_around(self.network.nearest_node(self.geometry.point(location)), until)
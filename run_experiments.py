@@ -3,13 +3,15 @@
 """
 
 import time
-import random
 from model import FloodResponseModel
 from scenarios import get_scenario_config
 from analysis import ScenarioAnalyzer
+from events import CounterSink, make_event_log
+from replication import ReplicationRunner
+from cache import ResultCache
 
-def run_single_scenario(scenario_name: str, steps: int = None):
-    """运行单个情景"""
+def run_single_scenario(scenario_name: str, steps: int = None, event_mode: str = "counter", seed: int = 42):
+    """运行单个情景（批量模式默认只计数事件，不逐条打印）"""
     print(f"\n{'#'*80}")
     print(f"准备运行: {scenario_name}")
     print(f"{'#'*80}")
@@ -18,47 +20,40 @@ def run_single_scenario(scenario_name: str, steps: int = None):
     if steps:
         config["steps"] = steps
     
-    # 设置固定随机种子，确保可比性
-    random.seed(42)
-    
-    model = FloodResponseModel(config)
+    # 固定随机种子，确保可比性
+    events = make_event_log(event_mode)
+    model = FloodResponseModel(config, events=events, seed=seed)
     metrics = model.run()
+    events.close()
+    
+    counter = events.find_sink(CounterSink)
+    if counter:
+        print(f"事件统计: 共{sum(counter.counts.values())}条")
+        for kind, count in counter.counts.most_common():
+            print(f"  {kind}: {count}")
     
     return metrics
 
-def main():
+def main(replications: int = 1, workers: int = None, steps: int = 60, seed: int = 42,
+         cache: ResultCache = None, incident_log_dir: str = None):
     """主函数"""
     print("洪水响应ABM模拟实验 - 完整修复版")
     print("="*80)
-    print("运行三种情景对比实验")
+    print(f"运行三种情景对比实验（每种情景重复{replications}次）")
     print("="*80)
     
     analyzer = ScenarioAnalyzer()
     
-    # 运行三种情景
+    # 运行三种情景：(情景, 重复编号) 任务分发到进程池，结果到达即送入分析器
     scenarios = ["baseline", "hierarchical", "optimized"]
+    runner = ReplicationRunner(scenarios, replications, steps=steps, seed=seed, workers=workers, cache=cache,
+                               incident_log_dir=incident_log_dir)
     
-    for scenario in scenarios:
-        try:
-            print(f"\n{'='*80}")
-            print(f"开始实验: {scenario}")
-            print(f"{'='*80}")
-            
-            start_time = time.time()
-            metrics = run_single_scenario(scenario, steps=60)  # 60步加速
-            end_time = time.time()
-            
-            analyzer.add_scenario_result(scenario, metrics)
-            
-            print(f"\n情景 '{scenario}' 完成，耗时: {end_time - start_time:.1f}秒")
-            
-            time.sleep(1)  # 暂停
-            
-        except Exception as e:
-            print(f"运行情景 {scenario} 时出错: {e}")
-            import traceback
-            traceback.print_exc()
-            continue
+    start_time = time.time()
+    completed = runner.run(analyzer)
+    print(f"\n共完成{completed}次模拟，使用{runner.workers}个进程，耗时: {time.time() - start_time:.1f}秒")
+    if cache is not None:
+        print(f"结果缓存: 命中{cache.hits}次，新运行{cache.misses}次")
     
     # 分析结果
     print(f"\n{'#'*80}")
@@ -67,6 +62,9 @@ def main():
     
     analyzer.compare_scenarios()
     analyzer.print_comparison_table()
+    if replications > 1:
+        analyzer.print_uncertainty_table()
+        analyzer.print_paired_comparisons()
     analyzer.calculate_improvements()
     analyzer.generate_findings()
     
@@ -80,8 +78,28 @@ def main():
 
 if __name__ == "__main__":
     # 设置编码
+    import argparse
     import sys
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="洪水响应ABM情景对比实验")
+    parser.add_argument("--replications", type=int, default=1, help="每种情景的重复次数")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数（默认CPU核数）")
+    parser.add_argument("--steps", type=int, default=60, help="每次模拟的步数")
+    parser.add_argument("--seed", type=int, default=42, help="根随机种子")
+    parser.add_argument("--cache-dir", default=".abm_cache", help="结果缓存目录")
+    parser.add_argument("--no-cache", action="store_true", help="不使用结果缓存")
+    parser.add_argument("--clear-cache", action="store_true", help="运行前清空结果缓存")
+    parser.add_argument("--incident-log-dir", default=None, help="全部事件写入此目录（每次运行一个子目录）")
+    args = parser.parse_args()
+    
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir)
+        if args.clear_cache:
+            cache.clear()
+        else:
+            cache.prune_stale()
+    
+    main(args.replications, args.workers, args.steps, args.seed, cache, args.incident_log_dir)
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+离散事件引擎 - 只唤醒有事可做的智能体，跳过空闲时间
+
+事件队列按时间排序，包含：
+- 降雨时钟（每步一次，驱动降雨、事件生成和巡查，这些在模型规则中每步都要抽样）
+- 智能体唤醒（抢险任务完成、交通管制完成等定时事件）
+- 层级上报到达（科层结构下任务到达市防指的时间）
+收件箱有新消息的智能体在本步处理阶段被唤醒；其余智能体不被调用。
+
+固定种子下各阶段的调用顺序和随机数消耗与逐步引擎一致，因此汇总指标完全相同。
+"""
+
+import heapq
+import itertools
+from typing import Callable, Dict, List, Optional
+
+from base_types import AgentType, BaseAgent, TaskStatus
+
+# 事件类型
+TICK = 0
+WAKE = 1
+REPORT_ARRIVAL = 2
+
+
+class EventDrivenEngine:
+    """离散事件引擎"""
+
+    def __init__(self, model):
+        self.model = model
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._wake_at: Dict[int, int] = {}     # id(智能体) -> 已排定的唤醒时间
+        self._mailed: Dict[int, BaseAgent] = {}
+        self._order = {id(agent): i for i, agent in enumerate(model.agents)}
+        self._hierarchical_due = False
+        self.agent_wakeups = 0
+
+    def schedule(self, time: int, kind: int, payload=None):
+        heapq.heappush(self._queue, (time, kind, next(self._seq), payload))
+
+    def _schedule_wake(self, agent: BaseAgent, time: int):
+        current = self._wake_at.get(id(agent))
+        if current is not None and current <= time:
+            return
+        self._wake_at[id(agent)] = time
+        self.schedule(time, WAKE, agent)
+
+    def _on_mail(self, agent: BaseAgent):
+        self._mailed[id(agent)] = agent
+
+    def run(self, end_step: int, on_step: Optional[Callable[[], None]] = None):
+        """运行到 end_step（含）"""
+        model = self.model
+        for agent in model.agents:
+            agent.mail_listener = self._on_mail
+            if agent.inbox:
+                self._mailed[id(agent)] = agent
+            wakeup = agent.next_wakeup(model.time_step)
+            if wakeup is not None:
+                self._schedule_wake(agent, wakeup)
+        self._hierarchical_due = model.scenario_mode == "hierarchical"
+        # 从检查点恢复时，已生成但尚未到达的层级上报需重新排定
+        if model.registry.command_center:
+            for task in model.registry.command_center.emergency_tasks:
+                if task.status == TaskStatus.PENDING and task.create_time > model.time_step:
+                    self.schedule(task.create_time, REPORT_ARRIVAL)
+        self.schedule(model.time_step + 1, TICK)
+
+        try:
+            while self._queue and self._queue[0][0] <= end_step:
+                now = self._queue[0][0]
+                due: Dict[int, BaseAgent] = {}
+                tick = False
+                while self._queue and self._queue[0][0] == now:
+                    _, kind, _, payload = heapq.heappop(self._queue)
+                    if kind == TICK:
+                        tick = True
+                    elif kind == WAKE:
+                        if self._wake_at.get(id(payload)) == now:
+                            del self._wake_at[id(payload)]
+                            due[id(payload)] = payload
+                    elif kind == REPORT_ARRIVAL:
+                        self._hierarchical_due = True
+
+                # 降雨时钟每步都有，因此时钟与逐步引擎同步推进
+                if tick:
+                    self._step(now, due)
+                    if on_step:
+                        on_step()
+                    if now < end_step:
+                        self.schedule(now + 1, TICK)
+        finally:
+            for agent in model.agents:
+                agent.mail_listener = None
+
+    def _step(self, now: int, due: Dict[int, BaseAgent]):
+        model = self.model
+        command_center = model.registry.command_center
+        known_tasks = len(command_center.emergency_tasks) if command_center else 0
+
+        rainfall = model._begin_step()
+        prof = model.profiler
+
+        # 层级上报产生的新任务：在到达时间排定调度轮次
+        if command_center:
+            for task in command_center.emergency_tasks[known_tasks:]:
+                if task.create_time > now:
+                    self.schedule(task.create_time, REPORT_ARRIVAL)
+                else:
+                    self._hierarchical_due = True
+
+        # 5. 只处理到期或收到消息的智能体（按注册顺序）
+        due.update(self._mailed)
+        self._mailed = {}
+        # 已移出模型的智能体（remove_agent 解除了总线）不再唤醒
+        woken = sorted((a for a in due.values() if a.bus is model.bus), key=lambda a: self._order[id(a)])
+        for agent in woken:
+            agent.process_inbox(now)
+            if prof:
+                prof.lap_agent(agent)
+            self.agent_wakeups += 1
+            wakeup = agent.next_wakeup(now)
+            if wakeup is not None:
+                self._schedule_wake(agent, wakeup)
+            if agent.type == AgentType.COMMAND_CENTER or getattr(agent, "available", False):
+                # 新任务到达或抢险队空闲：科层调度可能有事可做
+                self._hierarchical_due = True
+
+        # 6. 信息平台分派任务
+        model._platform_dispatch()
+        if prof:
+            prof.lap("platform_dispatch")
+
+        # 6.5 科层结构下的手动调度（仅在有任务到达或有队伍空闲时）
+        if model.scenario_mode == "hierarchical" and self._hierarchical_due:
+            model.hierarchical_dispatch()
+            self._hierarchical_due = self._has_dispatch_work(now)
+            if prof:
+                prof.lap("hierarchical_dispatch")
+
+        # 7. 运行协同机制
+        model.run_coordination(rainfall)
+        if prof:
+            prof.lap("coordination")
+
+        model._end_step()
+
+    def _has_dispatch_work(self, now: int) -> bool:
+        """调度后仍有已到达的待派任务且仍有空闲队伍时，下一步继续调度"""
+        registry = self.model.registry
+        if registry.command_center is None:
+            return False
+        if not any(team.available for team in registry.rescue_teams):
+            return False
+        return any(task.status == TaskStatus.PENDING and now >= task.create_time
+                   for task in registry.command_center.emergency_tasks)
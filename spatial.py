@@ -0,0 +1,186 @@
+"""
+空间索引 - 事件区域坐标与空闲抢险队的均匀网格索引，就近调度
+
+- CityGeometry：地点名称 -> (x, y) 坐标（公里）。优先使用配置中的 location_coords，
+  巡查员上报的 "<巡查范围>_<编号>" 落在 patrol_coords 中该范围附近；
+  其余地点（如默认情景的 "区域k"）由名称的稳定哈希映射到城市范围内的固定点。
+- GridIndex：均匀网格上的点索引，按环逐层向外搜索最近点，
+  单元格大小取每格约一个点时，查询期望为 O(1)，与总点数无关。
+- TeamLocator：只索引空闲且未被预留的抢险队，随 available 变化增删；
+  就近调度时取出（预留）最近的队伍，完成任务后队伍位于事件地点，在该处重新入索引。
+"""
+
+import math
+import zlib
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+Point = Tuple[float, float]
+
+DEFAULT_EXTENT_KM = 100.0  # 默认情景抢险队初始位置为 [0, 100) × [0, 100)
+
+
+def _hash_unit(text: str) -> float:
+    """名称 -> [0, 1) 的稳定哈希"""
+    return (zlib.crc32(text.encode("utf-8")) % 1_000_003) / 1_000_003
+
+
+class CityGeometry:
+    """地点坐标"""
+
+    def __init__(self, location_coords: Optional[Dict[str, Point]] = None,
+                 patrol_coords: Optional[Dict[str, Point]] = None, extent: float = DEFAULT_EXTENT_KM):
+        self.extent = extent
+        self._points: Dict[str, Point] = {name: tuple(p) for name, p in (location_coords or {}).items()}
+        self._patrol: Dict[str, Point] = {name: tuple(p) for name, p in (patrol_coords or {}).items()}
+
+    def point(self, location: Optional[str]) -> Point:
+        """地点坐标（结果缓存）"""
+        location = location or ""
+        point = self._points.get(location) or self._patrol.get(location)
+        if point is None:
+            patrol_range, _, _ = location.rpartition("_")
+            center = self._patrol.get(patrol_range)
+            if center is not None:
+                # 巡查范围内 ±1 公里
+                point = (center[0] + 2 * _hash_unit(location + "#x") - 1,
+                         center[1] + 2 * _hash_unit(location + "#y") - 1)
+            else:
+                point = (self.extent * _hash_unit(location + "#x"), self.extent * _hash_unit(location + "#y"))
+            self._points[location] = point
+        return point
+
+
+def distance(a: Point, b: Point) -> float:
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+class GridIndex:
+    """均匀网格点索引"""
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("网格单元大小必须为正数")
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Dict[object, Point]] = {}
+        self._where: Dict[object, Tuple[int, int]] = {}
+        # 曾被占用的单元范围（只扩不缩），用于限定搜索半径
+        self._bounds: Optional[list] = None
+
+    def _cell(self, point: Point) -> Tuple[int, int]:
+        return int(math.floor(point[0] / self.cell_size)), int(math.floor(point[1] / self.cell_size))
+
+    def insert(self, item, point: Point):
+        """加入或移动一个点"""
+        if item in self._where:
+            self.remove(item)
+        cell = self._cell(point)
+        self._cells.setdefault(cell, {})[item] = point
+        self._where[item] = cell
+        if self._bounds is None:
+            self._bounds = [cell[0], cell[0], cell[1], cell[1]]
+        else:
+            b = self._bounds
+            b[0], b[1] = min(b[0], cell[0]), max(b[1], cell[0])
+            b[2], b[3] = min(b[2], cell[1]), max(b[3], cell[1])
+
+    def remove(self, item) -> bool:
+        """删除一个点（不存在时返回 False）"""
+        cell = self._where.pop(item, None)
+        if cell is None:
+            return False
+        bucket = self._cells[cell]
+        del bucket[item]
+        if not bucket:
+            del self._cells[cell]
+        return True
+
+    def nearest(self, point: Point, accept: Optional[Callable[[object], bool]] = None):
+        """距离最近的点（accept 可过滤；距离相同时按搜索顺序确定性地取其一）"""
+        if not self._where:
+            return None
+        cx, cy = self._cell(point)
+        b = self._bounds
+        max_ring = max(cx - b[0], b[1] - cx, cy - b[2], b[3] - cy, 0)
+        best, best_d2 = None, math.inf
+        px, py = point
+        for ring in range(max_ring + 1):
+            for cell in _ring_cells(cx, cy, ring):
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                for item, (x, y) in bucket.items():
+                    d2 = (x - px) ** 2 + (y - py) ** 2
+                    if d2 < best_d2 and (accept is None or accept(item)):
+                        best, best_d2 = item, d2
+            # 第 ring+1 环内的点与查询点的距离至少为 ring 个单元
+            if best is not None and best_d2 <= (ring * self.cell_size) ** 2:
+                break
+        return best
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, item) -> bool:
+        return item in self._where
+
+
+def _ring_cells(cx: int, cy: int, ring: int) -> Iterable[Tuple[int, int]]:
+    """以 (cx, cy) 为中心、切比雪夫距离为 ring 的一圈单元"""
+    if ring == 0:
+        yield cx, cy
+        return
+    for x in range(cx - ring, cx + ring + 1):
+        yield x, cy - ring
+        yield x, cy + ring
+    for y in range(cy - ring + 1, cy + ring):
+        yield cx - ring, y
+        yield cx + ring, y
+
+
+class TeamLocator:
+    """空闲抢险队的空间索引（配置 dispatch_policy="nearest" 时启用）"""
+
+    def __init__(self, geometry: CityGeometry, teams: Iterable, cell_size: Optional[float] = None):
+        teams = list(teams)
+        self.geometry = geometry
+        if cell_size is None:
+            # 每格约一支队伍
+            cell_size = geometry.extent / max(1.0, math.sqrt(len(teams)))
+        self.index = GridIndex(cell_size)
+        self._targets: Dict[object, Point] = {}  # 已预留队伍 -> 事件地点
+        for team in teams:
+            self.track(team)
+
+    def track(self, team):
+        """开始跟踪一支队伍"""
+        team.availability_listener = self.update
+        self.update(team)
+
+    def untrack(self, team):
+        """停止跟踪一支队伍（移出索引，不再接收 available 变化）"""
+        if team.availability_listener == self.update:
+            team.availability_listener = None
+        self.index.remove(team)
+        self._targets.pop(team, None)
+
+    def update(self, team):
+        """队伍 available 变化时调用"""
+        if team.available:
+            target = self._targets.pop(team, None)
+            if target is not None:
+                team.current_location = target
+            self.index.insert(team, team.current_location)
+        else:
+            self.index.remove(team)
+
+    def acquire(self, location: Optional[str]):
+        """预留距离地点最近的空闲队伍，无空闲队伍时返回 None"""
+        point = self.geometry.point(location)
+        team = self.index.nearest(point)
+        if team is not None:
+            self.index.remove(team)
+            self._targets[team] = point
+        return team
+
+    def __len__(self) -> int:
+        return len(self.index)
@@ -0,0 +1,138 @@
+"""
+流式统计 - O(1) 更新、可合并的均值/方差（Welford）与分位数直方图（HDR 风格）
+
+智能体、模型和参数扫描各层都只保存这些累加器，不再保留原始响应时间列表。
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+# 直方图精度：小于 2**SIGNIFICANT_BITS 的值精确计数，更大的值相对误差约 2**-(SIGNIFICANT_BITS-1)
+SIGNIFICANT_BITS = 6
+
+
+def _bucket_key(value: int, bits: int) -> int:
+    """值 -> 桶编号（单调、对数分段）"""
+    if value < (1 << bits):
+        return value
+    shift = value.bit_length() - bits
+    return (shift << (bits - 1)) + (value >> shift)
+
+
+def _bucket_range(key: int, bits: int):
+    """桶编号 -> (下界, 上界)"""
+    if key < (1 << bits):
+        return key, key
+    shift = (key >> (bits - 1)) - 1
+    mantissa = key - (shift << (bits - 1))
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class StreamingStats:
+    """可合并的流式统计量"""
+
+    def __init__(self, significant_bits: int = SIGNIFICANT_BITS):
+        self.bits = significant_bits
+        self.count = 0
+        self.total = 0          # 精确累加（整数响应时间下均值与原实现逐位一致）
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, value: float):
+        """加入一个观测值"""
+        self.count += 1
+        self.total += value
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        key = _bucket_key(max(int(round(value)), 0), self.bits)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other: "StreamingStats") -> "StreamingStats":
+        """合并另一个累加器（Chan 并行公式），返回自身"""
+        if other.bits != self.bits:
+            raise ValueError("直方图精度不同，无法合并")
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self._mean, self._m2 = other._mean, other._m2
+        else:
+            n = self.count + other.count
+            delta = other._mean - self._mean
+            self._m2 += other._m2 + delta * delta * self.count * other.count / n
+            self._mean += delta * other.count / n
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        for key, n in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        """样本方差"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def quantile(self, q: float) -> float:
+        """近似分位数（取所在桶的中点，并限制在观测范围内）"""
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                low, high = _bucket_range(key, self.bits)
+                return min(max((low + high) / 2, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min or 0,
+            "max": self.max or 0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        """可 JSON 序列化、可跨进程传递的状态"""
+        return {
+            "bits": self.bits, "count": self.count, "total": self.total,
+            "mean": self._mean, "m2": self._m2, "min": self.min, "max": self.max,
+            "buckets": dict(self.buckets),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingStats":
+        stats = cls(state["bits"])
+        stats.count = state["count"]
+        stats.total = state["total"]
+        stats._mean = state["mean"]
+        stats._m2 = state["m2"]
+        stats.min = state["min"]
+        stats.max = state["max"]
+        stats.buckets = {int(key): n for key, n in state["buckets"].items()}
+        return stats
+
+    def __repr__(self):
+        return f"StreamingStats(count={self.count}, mean={self.mean:.3f}, std={self.std:.3f})"
@@ -0,0 +1,313 @@
+"""
+参数扫描 - 在情景配置上展开网格/随机/拉丁超立方设计，分发到进程池，结果汇总为整洁表
+
+参数空间写法（名称为 scenarios.py 中的配置字段）：
+- 网格设计：{"platform_capacity": [10, 20, 30]}，取值列表的笛卡尔积
+- 随机/拉丁超立方设计：
+    (下界, 上界) 区间，两端都是整数时按整数抽样；
+    列表表示离散选项（如 rescue_team_types 的几种能力组合、hierarchical_delay 的几种范围）
+
+每个 (设计点, 重复编号) 是一个任务。同一重复编号在各设计点间共用随机数流，便于配对比较。
+指定 output 时每完成一个任务即向 JSONL 文件追加一行，中断后以同一参数重新运行会跳过已完成的任务。
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from cache import DEFAULT_CACHE_DIR, ResultCache
+from profiling import INBOX_PREFIX, merge_summaries
+from replication import print_progress, run_config, scenario_config
+from rng import DEFAULT_SEED, derive_seed
+
+# 常见的规模问题
+DEFAULT_SPACE = {
+    "platform_capacity": (5, 40),
+    "num_rescue_teams": (2, 10),
+    "num_inspectors": (2, 8),
+    "hierarchical_delay": [(1, 4), (3, 8), (6, 12)],
+    "rescue_team_types": [
+        [("市级", 0.9), ("国企", 0.8), ("区级", 0.7), ("企业", 0.75)],
+        [("市级", 0.9), ("国企", 0.85), ("区级", 0.8), ("企业", 0.8), ("社会", 0.7), ("机动", 0.75)],
+        [("区级", 0.7), ("企业", 0.75), ("社会", 0.7)],
+    ],
+}
+
+# (情景名, 设计点键, 参数覆盖, 重复编号, 根种子, 步数)
+SweepJob = Tuple[str, str, Dict[str, Any], int, int, Optional[int]]
+
+
+def _is_range(values) -> bool:
+    return isinstance(values, tuple) and len(values) == 2 and all(isinstance(v, (int, float)) for v in values)
+
+
+def _scale(values, u: float):
+    """把 [0, 1) 中的 u 映射到参数取值"""
+    if _is_range(values):
+        low, high = values
+        if isinstance(low, int) and isinstance(high, int):
+            return low + min(int(u * (high - low + 1)), high - low)
+        return low + u * (high - low)
+    values = list(values)
+    return values[min(int(u * len(values)), len(values) - 1)]
+
+
+def grid_design(space: Dict[str, Sequence]) -> List[Dict[str, Any]]:
+    """网格设计：各参数取值列表的笛卡尔积（区间按端点处理）"""
+    names = list(space)
+    axes = [list(space[name]) for name in names]
+    return [dict(zip(names, combo)) for combo in itertools.product(*axes)]
+
+
+def random_design(space: Dict[str, Any], n: int, seed: int = DEFAULT_SEED) -> List[Dict[str, Any]]:
+    """独立均匀抽样 n 个设计点"""
+    rng = random.Random(derive_seed(seed, ("sweep", "random")))
+    return [{name: _scale(values, rng.random()) for name, values in space.items()} for _ in range(n)]
+
+
+def latin_hypercube_design(space: Dict[str, Any], n: int, seed: int = DEFAULT_SEED) -> List[Dict[str, Any]]:
+    """拉丁超立方设计：每个参数的 n 个分层各取一次"""
+    rng = random.Random(derive_seed(seed, ("sweep", "lhs")))
+    columns = {}
+    for name, values in space.items():
+        strata = [(k + rng.random()) / n for k in range(n)]
+        rng.shuffle(strata)
+        columns[name] = [_scale(values, u) for u in strata]
+    return [{name: columns[name][i] for name in space} for i in range(n)]
+
+
+def expand_design(design: str, space: Dict[str, Any], samples: Optional[int] = None,
+                  seed: int = DEFAULT_SEED) -> List[Dict[str, Any]]:
+    """按设计类型展开设计点：grid / random / lhs"""
+    if design == "grid":
+        return grid_design(space)
+    if not samples:
+        raise ValueError(f"{design} 设计需要指定样本数")
+    if design == "random":
+        return random_design(space, samples, seed)
+    if design == "lhs":
+        return latin_hypercube_design(space, samples, seed)
+    raise ValueError(f"未知的设计类型: {design}")
+
+
+def point_key(params: Dict[str, Any]) -> str:
+    """设计点的稳定键（与顺序、进程无关），用于断点续跑"""
+    text = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def summarize_metrics(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """一次运行的结果列"""
+    backlog = metrics.get("task_backlog") or [0]
+    total = metrics.get("total_incidents", 0)
+    resolved = metrics.get("resolved_incidents", 0)
+    # 启用剖析时附带各阶段耗时列
+    timings = {f"time_{name}": seconds for name, seconds in metrics.get("profile", {}).items()}
+    return {
+        "total_incidents": total,
+        "resolved_incidents": resolved,
+        "resolution_rate": resolved / max(total, 1),
+        "avg_response_time": metrics.get("avg_response_time", 0),
+        "system_efficiency": metrics.get("system_efficiency", 0),
+        "bottleneck_events": metrics.get("bottleneck_events", 0),
+        "max_backlog": max(backlog),
+        "mean_backlog": sum(backlog) / len(backlog),
+        "final_backlog": backlog[-1],
+        **timings,
+    }
+
+
+def sweep_config(scenario_name: str, params: Dict[str, Any], steps: Optional[int] = None) -> Dict[str, Any]:
+    """设计点对应的完整配置"""
+    config = scenario_config(scenario_name)
+    config.update(params)
+    if steps:
+        config["steps"] = steps
+    return config
+
+
+def run_sweep_job(job: SweepJob) -> Tuple[str, int, Dict[str, Any]]:
+    """在工作进程中运行一个设计点的一次重复，返回完整指标"""
+    scenario_name, key, params, replication, seed, steps = job
+    return key, replication, run_config(sweep_config(scenario_name, params, steps), replication, seed, name=key)
+
+
+class ParameterSweep:
+    """参数扫描运行器"""
+
+    def __init__(self, scenario: str, points: List[Dict[str, Any]], replications: int = 1,
+                 steps: Optional[int] = None, seed: int = DEFAULT_SEED, workers: Optional[int] = None,
+                 output: Optional[str] = None, cache=None, profile: bool = False):
+        self.scenario = scenario
+        # 剖析模式下每个设计点都带 profile 配置（结果行附带各阶段耗时）
+        self.points = [dict(params, profile=True) for params in points] if profile else points
+        self.keys = [point_key(params) for params in points]
+        self.replications = replications
+        self.steps = steps
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.output = output
+        self.cache = cache  # cache.ResultCache，命中的任务不再运行
+        self.rows: List[Dict[str, Any]] = []
+
+    def _load_completed(self) -> set:
+        """读取输出文件中已完成的任务（忽略中断时写了一半的末行）"""
+        if not self.output or not os.path.exists(self.output):
+            return set()
+        done, keys = set(), set(self.keys)
+        with open(self.output, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if row.get("scenario") == self.scenario and row.get("seed") == self.seed \
+                        and row.get("steps") == self.steps and row.get("point") in keys:
+                    done.add((row["point"], row["replication"]))
+                    self.rows.append(row)
+        return done
+
+    def jobs(self, completed: set = frozenset()) -> List[SweepJob]:
+        """尚未完成的任务（同一设计点重复出现时只运行一次）"""
+        jobs, seen = [], set()
+        for key, params in zip(self.keys, self.points):
+            if key in seen:
+                continue
+            seen.add(key)
+            for r in range(self.replications):
+                if (key, r) not in completed:
+                    jobs.append((self.scenario, key, params, r, self.seed, self.steps))
+        return jobs
+
+    def iter_results(self, jobs: List[SweepJob]) -> Iterator[Tuple[str, int, Dict[str, Any]]]:
+        """按完成顺序逐个产出结果（先产出缓存命中的结果）"""
+        if self.cache is None:
+            yield from self._run_jobs(jobs)
+            return
+
+        cache_keys, pending = {}, []
+        for job in jobs:
+            scenario_name, key, params, replication, seed, steps = job
+            cache_key = self.cache.key(sweep_config(scenario_name, params, steps), replication, seed)
+            metrics = self.cache.get(cache_key)
+            if metrics is None:
+                cache_keys[key, replication] = cache_key
+                pending.append(job)
+            else:
+                yield key, replication, metrics
+        for key, replication, metrics in self._run_jobs(pending):
+            self.cache.put(cache_keys[key, replication], metrics)
+            yield key, replication, metrics
+
+    def _run_jobs(self, jobs: List[SweepJob]) -> Iterator[Tuple[str, int, Dict[str, Any]]]:
+        if self.workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                yield run_sweep_job(job)
+            return
+
+        chunksize = max(1, len(jobs) // (self.workers * 8))
+        with Pool(processes=min(self.workers, len(jobs))) as pool:
+            for result in pool.imap_unordered(run_sweep_job, jobs, chunksize=chunksize):
+                yield result
+
+    def run(self, progress: Optional[Callable[[int, int, float], None]] = print_progress) -> List[Dict[str, Any]]:
+        """运行全部未完成任务，返回整洁表（每个设计点每次重复一行）"""
+        self.rows = []
+        completed = self._load_completed()
+        jobs = self.jobs(completed)
+        params_by_key = dict(zip(self.keys, self.points))
+        start_time = time.time()
+
+        out = None
+        if self.output:
+            out = open(self.output, "a+", encoding="utf-8")
+            # 中断时可能留下没有换行的半行，先补换行再追加
+            if out.tell():
+                out.seek(out.tell() - 1)
+                if out.read(1) != "\n":
+                    out.write("\n")
+        try:
+            for done, (key, replication, metrics) in enumerate(self.iter_results(jobs), 1):
+                row = {"scenario": self.scenario, "seed": self.seed, "steps": self.steps,
+                       "point": key, "replication": replication,
+                       **params_by_key[key], **summarize_metrics(metrics)}
+                self.rows.append(row)
+                if out:
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    out.flush()
+                if progress:
+                    progress(done, len(jobs), time.time() - start_time)
+        finally:
+            if out:
+                out.close()
+
+        order = {key: i for i, key in reversed(list(enumerate(self.keys)))}
+        self.rows.sort(key=lambda row: (order[row["point"]], row["replication"]))
+        return self.rows
+
+    def to_csv(self, path: str):
+        """导出整洁表为 CSV（非标量参数以 JSON 文本保存）"""
+        import csv
+        if not self.rows:
+            return
+        columns = list(self.rows[0])
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for row in self.rows:
+                writer.writerow({name: json.dumps(value, ensure_ascii=False)
+                                 if isinstance(value, (list, tuple, dict)) else value
+                                 for name, value in row.items()})
+
+
+def _parse_param(text: str) -> Tuple[str, Any]:
+    """命令行参数：name=1,2,3（取值列表）或 name=low:high（区间）"""
+    name, _, spec = text.partition("=")
+    if ":" in spec:
+        low, high = (json.loads(v) for v in spec.split(":", 1))
+        return name, (low, high)
+    return name, [json.loads(v) for v in spec.split(",")]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="情景配置参数扫描")
+    parser.add_argument("--scenario", default="baseline", help="基础情景")
+    parser.add_argument("--design", choices=["grid", "random", "lhs"], default="lhs", help="设计类型")
+    parser.add_argument("--samples", type=int, default=20, help="随机/拉丁超立方设计的样本数")
+    parser.add_argument("--param", action="append", default=[],
+                        help="参数空间，如 platform_capacity=10,20,30 或 num_inspectors=2:8（默认使用 DEFAULT_SPACE）")
+    parser.add_argument("--replications", type=int, default=1, help="每个设计点的重复次数")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数（默认CPU核数）")
+    parser.add_argument("--steps", type=int, default=None, help="每次模拟的步数")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="根随机种子")
+    parser.add_argument("--output", default="sweep_results.jsonl", help="结果文件（JSONL，支持断点续跑）")
+    parser.add_argument("--csv", default=None, help="另存整洁表为 CSV")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="结果缓存目录")
+    parser.add_argument("--no-cache", action="store_true", help="不使用结果缓存")
+    parser.add_argument("--profile", action="store_true", help="记录各阶段耗时（不使用缓存）")
+    args = parser.parse_args()
+
+    space = dict(_parse_param(p) for p in args.param) or DEFAULT_SPACE
+    points = expand_design(args.design, space, args.samples, args.seed)
+    sweep = ParameterSweep(args.scenario, points, args.replications, args.steps,
+                           args.seed, args.workers, args.output,
+                           cache=None if args.no_cache or args.profile else ResultCache(args.cache_dir),
+                           profile=args.profile)
+    rows = sweep.run()
+    print(f"共 {len(points)} 个设计点，结果 {len(rows)} 行，已写入 {args.output}")
+    if args.csv:
+        sweep.to_csv(args.csv)
+    if args.profile:
+        timings = merge_summaries({name[5:]: value for name, value in row.items() if name.startswith("time_")}
+                                  for row in rows)
+        total = sum(seconds for name, seconds in timings.items() if not name.startswith(INBOX_PREFIX))
+        print("各阶段累计耗时:")
+        for name, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+            print(f"  {name}: {seconds:.3f}s ({seconds / total if total else 0:.1%})")
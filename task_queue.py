@@ -0,0 +1,138 @@
+"""
+任务优先队列 - 按紧急度和等待时间排序的堆，支持 O(log n) 入队/出队和惰性删除
+"""
+
+import heapq
+import itertools
+from typing import Dict, Iterator, List, Optional
+
+from base_types import Task
+
+# 每等待一步相当于增加的紧急度；老化是统一的，因此排序键与当前时间无关
+AGE_WEIGHT = 0.01
+
+
+class TaskQueue:
+    """任务优先队列
+
+    有效优先级 = 紧急度 + AGE_WEIGHT × 等待步数。
+    由于所有任务以相同速率老化，只需按 (紧急度 - AGE_WEIGHT × 创建时间) 建堆。
+    """
+
+    def __init__(self, age_weight: float = AGE_WEIGHT):
+        self.age_weight = age_weight
+        self._heap: List[list] = []          # [排序键, 序号, 任务]
+        self._age_heap: List[list] = []      # [创建时间, 序号, 任务]
+        self._entries: Dict[int, int] = {}   # id(任务) -> 序号（在队列中的任务）
+        self._counter = itertools.count()
+        self._create_time_sum = 0
+
+    def push(self, task: Task):
+        """入队（已在队列中的任务会被重新排序）"""
+        if id(task) in self._entries:
+            self._forget(task)
+        seq = next(self._counter)
+        key = self.age_weight * task.create_time - task.urgency
+        heapq.heappush(self._heap, [key, seq, task])
+        heapq.heappush(self._age_heap, [task.create_time, seq, task])
+        self._entries[id(task)] = seq
+        self._create_time_sum += task.create_time
+
+    def _is_live(self, entry: list) -> bool:
+        return self._entries.get(id(entry[2])) == entry[1]
+
+    def _prune(self, heap: List[list]):
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+
+    def pop(self) -> Task:
+        """取出优先级最高的任务"""
+        self._prune(self._heap)
+        if not self._heap:
+            raise IndexError("pop from empty TaskQueue")
+        task = heapq.heappop(self._heap)[2]
+        self._forget(task)
+        return task
+
+    def peek(self) -> Optional[Task]:
+        """查看优先级最高的任务（不出队）"""
+        self._prune(self._heap)
+        return self._heap[0][2] if self._heap else None
+
+    def pop_many(self, n: int) -> List[Task]:
+        """按优先级取出至多 n 个任务"""
+        tasks = []
+        while len(tasks) < n and self._entries:
+            tasks.append(self.pop())
+        return tasks
+
+    def discard(self, task: Task) -> bool:
+        """惰性删除：仅标记，堆中的旧条目在出队时跳过"""
+        if id(task) not in self._entries:
+            return False
+        self._forget(task)
+        return True
+
+    def _forget(self, task: Task):
+        del self._entries[id(task)]
+        self._create_time_sum -= task.create_time
+        # 删除较多时压缩，避免堆中积累过多失效条目。
+        # 出队只弹出 _heap 的条目，_age_heap 保留全部失效条目，总是不小于 _heap，按它判断
+        if len(self._age_heap) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def _compact(self):
+        self._heap = [e for e in self._heap if self._is_live(e)]
+        self._age_heap = [e for e in self._age_heap if self._is_live(e)]
+        heapq.heapify(self._heap)
+        heapq.heapify(self._age_heap)
+
+    def oldest_age(self, current_step: int) -> int:
+        """最老任务的等待步数"""
+        self._prune(self._age_heap)
+        if not self._age_heap:
+            return 0
+        return current_step - self._age_heap[0][0]
+
+    def mean_age(self, current_step: int) -> float:
+        """平均等待步数"""
+        if not self._entries:
+            return 0.0
+        return current_step - self._create_time_sum / len(self._entries)
+
+    def stats(self, current_step: int) -> Dict[str, float]:
+        """队列长度与等待时间统计"""
+        return {
+            "length": len(self._entries),
+            "oldest_age": self.oldest_age(current_step),
+            "mean_age": self.mean_age(current_step),
+        }
+
+    def __getstate__(self):
+        # 序号映射以 id(任务) 为键，跨进程无效：保存 (任务, 序号) 对，恢复时重建
+        next_seq = next(self._counter)
+        self._counter = itertools.count(next_seq)
+        state = self.__dict__.copy()
+        state["_entries"] = [(e[2], e[1]) for e in self._heap if self._is_live(e)]
+        state["_counter"] = next_seq
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._entries = {id(task): seq for task, seq in state["_entries"]}
+        self._counter = itertools.count(state["_counter"])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __contains__(self, task: Task) -> bool:
+        return id(task) in self._entries
+
+    def __iter__(self) -> Iterator[Task]:
+        """遍历队列中的任务（按优先级排序）"""
+        live = [e for e in self._heap if self._is_live(e)]
+        live.sort()
+        return iter([e[2] for e in live])
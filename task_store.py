@@ -0,0 +1,131 @@
+"""
+任务库 - 全局唯一任务编号，已结束任务归档为列式数组
+
+归档使用标准库 array 按列存储，每个任务约 34 字节，
+便于一次参数扫描中保存数百万个任务。
+"""
+
+from array import array
+from typing import Dict, List, Optional
+
+from base_types import IncidentType, Task, TaskStatus
+
+INCIDENT_TYPES = list(IncidentType)
+_INCIDENT_CODES = {t: i for i, t in enumerate(INCIDENT_TYPES)}
+
+# 列名 -> array 类型码
+ARCHIVE_COLUMNS = {
+    "id": "q",
+    "incident_type": "b",
+    "urgency": "f",
+    "create_time": "i",
+    "start_time": "i",
+    "completion_time": "i",
+    "status": "b",
+    "assignee": "i",
+    "location": "i",
+}
+
+# 以字符串表编码的列（列中存下标）
+INTERNED_COLUMNS = ("assignee", "location")
+
+MISSING = -1  # 时间或执行者为空时的占位值
+
+
+class TaskArchive:
+    """列式任务归档"""
+
+    def __init__(self):
+        self.columns: Dict[str, array] = {name: array(code) for name, code in ARCHIVE_COLUMNS.items()}
+        self.strings: Dict[str, List[str]] = {name: [] for name in INTERNED_COLUMNS}
+        self._string_index: Dict[str, Dict[str, int]] = {name: {} for name in INTERNED_COLUMNS}
+
+    def _intern(self, column: str, value: Optional[str]) -> int:
+        if value is None:
+            return MISSING
+        index = self._string_index[column]
+        code = index.get(value)
+        if code is None:
+            code = len(self.strings[column])
+            self.strings[column].append(value)
+            index[value] = code
+        return code
+
+    def append(self, task: Task):
+        """归档一个任务"""
+        c = self.columns
+        c["id"].append(task.id)
+        c["incident_type"].append(_INCIDENT_CODES[task.incident_type])
+        c["urgency"].append(task.urgency)
+        c["create_time"].append(task.create_time)
+        c["start_time"].append(MISSING if task.start_time is None else task.start_time)
+        c["completion_time"].append(MISSING if task.completion_time is None else task.completion_time)
+        c["status"].append(int(task.status))
+        c["assignee"].append(self._intern("assignee", task.assigned_to))
+        c["location"].append(self._intern("location", task.location))
+
+    def extend(self, other: "TaskArchive"):
+        """合并另一个归档（字符串编码重新映射）"""
+        for name in ARCHIVE_COLUMNS:
+            if name in INTERNED_COLUMNS:
+                remap = [self._intern(name, value) for value in other.strings[name]]
+                self.columns[name].extend(MISSING if code == MISSING else remap[code]
+                                          for code in other.columns[name])
+            else:
+                self.columns[name].extend(other.columns[name])
+
+    def task(self, index: int) -> Task:
+        """还原第 index 个归档任务"""
+        c = self.columns
+
+        def optional(value):
+            return None if value == MISSING else value
+
+        def string(column):
+            code = c[column][index]
+            return None if code == MISSING else self.strings[column][code]
+
+        return Task(
+            id=c["id"][index],
+            incident_type=INCIDENT_TYPES[c["incident_type"][index]],
+            location=string("location"),
+            urgency=c["urgency"][index],
+            create_time=c["create_time"][index],
+            assigned_to=string("assignee"),
+            start_time=optional(c["start_time"][index]),
+            completion_time=optional(c["completion_time"][index]),
+            status=TaskStatus(c["status"][index]),
+        )
+
+    def to_numpy(self):
+        """以 NumPy 数组形式返回各列（零拷贝）"""
+        import numpy as np
+        return {name: np.frombuffer(col, dtype=col.typecode) if len(col) else np.array([], dtype=col.typecode)
+                for name, col in self.columns.items()}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.itemsize * len(col) for col in self.columns.values())
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+
+class TaskStore:
+    """任务库：分配编号并归档已结束的任务"""
+
+    def __init__(self):
+        self._next_id = 1
+        self.archive = TaskArchive()
+
+    def create(self, **fields) -> Task:
+        task = Task(id=self._next_id, **fields)
+        self._next_id += 1
+        return task
+
+    def archive_task(self, task: Task):
+        self.archive.append(task)
+
+
+# 独立使用智能体时的默认任务库
+DEFAULT_TASK_STORE = TaskStore()
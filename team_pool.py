@@ -0,0 +1,75 @@
+"""
+空闲抢险队池 - 随 available 变化增量维护的优先堆，O(log n) 取出/放回
+
+替代每步重建空闲队伍列表并总是取第一支的做法（靠前的队伍疲于奔命，靠后的闲置）：
+- idle：空闲最久的队伍优先（按放回顺序先进先出，任务在队伍间轮转）
+- capability：能力最强的队伍优先，能力相同时空闲最久者优先
+
+与 spatial.TeamLocator（就近调度）提供相同的 acquire / __len__ 接口，
+由模型注入科层调度、市防指直接调度和信息平台三条调度路径共用。
+"""
+
+import heapq
+import itertools
+from typing import Dict, Iterable, List, Optional
+
+POOL_ORDERS = ("idle", "capability")
+
+
+class TeamPool:
+    """空闲抢险队池（配置 dispatch_policy="idle" / "capability" 时启用）"""
+
+    def __init__(self, teams: Iterable, order: str = "idle"):
+        if order not in POOL_ORDERS:
+            raise ValueError(f"未知的队伍排序方式: {order}")
+        self.order = order
+        self._heap: List[list] = []        # [排序键, 序号, 队伍]
+        self._entries: Dict[object, int] = {}  # 队伍 -> 序号（在池中的队伍）
+        self._counter = itertools.count()
+        for team in teams:
+            self.track(team)
+
+    def track(self, team):
+        """开始跟踪一支队伍"""
+        team.availability_listener = self.update
+        self.update(team)
+
+    def untrack(self, team):
+        """停止跟踪一支队伍（堆中的条目随之失效，不再接收 available 变化）"""
+        if team.availability_listener == self.update:
+            team.availability_listener = None
+        self._entries.pop(team, None)
+
+    def update(self, team):
+        """队伍 available 变化时调用"""
+        if team.available:
+            self.release(team)
+        elif self._entries.pop(team, None) is not None and len(self._heap) > 2 * len(self._entries) + 16:
+            # 绕过池直接派出的队伍留下失效条目，过多时压缩
+            self._heap = [entry for entry in self._heap if self._entries.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+
+    def release(self, team):
+        """放回空闲队伍（已在池中时不变）"""
+        if team in self._entries:
+            return
+        seq = next(self._counter)
+        key = -team.capability if self.order == "capability" else 0.0
+        heapq.heappush(self._heap, [key, seq, team])
+        self._entries[team] = seq
+
+    def acquire(self, location: Optional[str] = None):
+        """预留排在最前的空闲队伍（与地点无关），池为空时返回 None"""
+        heap = self._heap
+        while heap:
+            _, seq, team = heapq.heappop(heap)
+            if self._entries.get(team) == seq:
+                del self._entries[team]
+                return team
+        return None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, team) -> bool:
+        return team in self._entries
@@ -0,0 +1,45 @@
+"""模型运行中加入/移除抢险队：移除后不再被任何调度路径选中，加入后进入队伍池"""
+
+import pytest
+
+from agents import RescueTeam
+from base_types import AgentType
+from events import make_event_log
+from messaging import TASK_ASSIGNMENT
+from model import FloodResponseModel
+from scenarios import get_scenario_config
+
+
+def _assignments(team):
+    return [msg for msg in team.inbox if msg.type == TASK_ASSIGNMENT]
+
+
+@pytest.mark.parametrize("policy", ["idle", "capability", "nearest"])
+@pytest.mark.parametrize("engine", ["stepped", "event"])
+def test_removed_team_is_never_dispatched(policy, engine):
+    config = dict(get_scenario_config("baseline"), steps=40, dispatch_policy=policy, engine=engine)
+    model = FloodResponseModel(config, events=make_event_log("silent"), seed=3)
+    removed = model.registry.rescue_teams[0]
+    model.remove_agent(removed)
+
+    assert removed.bus is None and removed.availability_listener is None
+    assert len(model.team_pool) == len(model.registry.rescue_teams)
+
+    received = len(removed.inbox)
+    model.run()
+    assert len(removed.inbox) == received
+    assert removed not in model.registry.agents
+
+
+def test_added_team_joins_pool():
+    config = dict(get_scenario_config("optimized"), steps=40, dispatch_policy="idle")
+    model = FloodResponseModel(config, events=make_event_log("silent"), seed=3)
+    for team in list(model.registry.rescue_teams):
+        model.remove_agent(team)
+    team = RescueTeam(99, "机动", 0.8)
+    model.add_agent(team)
+
+    assert team in model.team_pool and team.bus is model.bus
+    model.run()
+    assert _assignments(team) or team.metrics["tasks_completed"] > 0
+    assert all(agent.type != AgentType.RESCUE_TEAM or agent is team for agent in model.registry.agents)
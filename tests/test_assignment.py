@@ -0,0 +1,57 @@
+"""批量指派：与穷举的最优指派比较"""
+
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from assignment import batch_assign
+
+
+def _best_exclusive(urgency, feasible, capability, rows, cols):
+    """穷举：先最大化指派数，再最大化总分"""
+    best = (0, 0.0)
+    for k in range(min(len(rows), len(cols)), 0, -1):
+        for chosen in itertools.permutations(cols, k):
+            for picked in itertools.combinations(rows, k):
+                if all(feasible[t, a] for t, a in zip(picked, chosen)):
+                    total = sum(0.4 * capability[a] + 0.3 * urgency[t] for t, a in zip(picked, chosen))
+                    best = max(best, (k, round(total, 9)))
+        if best[0]:
+            return best
+    return best
+
+
+def _score(urgency, capability, pairs, exclusive):
+    pairs = [(t, a) for t, a in pairs if exclusive[a]]
+    return len(pairs), round(sum(0.4 * capability[a] + 0.3 * urgency[t] for t, a in pairs), 9)
+
+
+@pytest.mark.parametrize("overlapping", [False, True])
+def test_exclusive_assignment_is_optimal(overlapping):
+    rng = random.Random(3)
+    for _ in range(60):
+        tasks, units = rng.randint(1, 5), rng.randint(1, 4)
+        unit_type = [rng.randrange(2) for _ in range(units)]
+        task_type = [rng.randrange(3) for _ in range(tasks)]
+        # 类型 0 / 1 的单位分别承接事件类型 0 / 1；重叠时两类单位都可承接事件类型 2
+        table = np.array([[True, False], [False, True], [overlapping, overlapping]])
+        feasible = table[np.array(task_type)[:, None], np.array(unit_type)[None, :]]
+        urgency = [round(rng.random(), 2) for _ in range(tasks)]
+        capability = [round(rng.random(), 2) for _ in range(units)]
+        available = [rng.random() < 0.8 for _ in range(units)]
+        exclusive = [True] * units
+
+        pairs = batch_assign(urgency, feasible, capability, available, exclusive)
+        assert len({a for _, a in pairs}) == len(pairs)
+        assert all(feasible[t, a] and available[a] for t, a in pairs)
+        rows = [t for t in range(tasks) if feasible[t].any()]
+        cols = [a for a in range(units) if available[a]]
+        assert _score(urgency, capability, pairs, exclusive) == _best_exclusive(urgency, feasible, capability, rows, cols)
+
+
+def test_most_urgent_task_gets_most_capable_team():
+    feasible = np.ones((3, 2), dtype=bool)
+    pairs = batch_assign([0.2, 0.9, 0.5], feasible, [0.6, 0.8], [True, True], [True, True])
+    assert pairs == [(1, 1), (2, 0)]
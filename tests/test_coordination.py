@@ -0,0 +1,48 @@
+"""协同机制：水务-交管协同与市防指直接指挥的地点取自情景配置"""
+
+from city import city_config
+from events import make_event_log
+from model import FloodResponseModel
+from scenarios import get_scenario_config
+
+
+def _record_locations(model):
+    drainage, direct = [], []
+    water_bureau = model.registry.water_bureau
+    command_center = model.registry.command_center
+    schedule_drainage = water_bureau.schedule_drainage
+    direct_dispatch = command_center.direct_dispatch
+
+    def record_drainage(water_depth, location, step):
+        drainage.append(location)
+        return schedule_drainage(water_depth, location, step)
+
+    def record_direct(team, task, step):
+        direct.append(task.location)
+        return direct_dispatch(team, task, step)
+
+    water_bureau.schedule_drainage = record_drainage
+    command_center.direct_dispatch = record_direct
+    return drainage, direct
+
+
+def test_city_coordination_uses_configured_sites():
+    config = city_config("wuhan", base="baseline")
+    model = FloodResponseModel(config, events=make_event_log("silent"), seed=7)
+    drainage, direct = _record_locations(model)
+    model.run()
+
+    assert drainage and direct
+    assert set(drainage) <= set(config["incident_locations"])
+    assert set(direct) <= set(config["emergency_sites"])
+    assert all(site in config["location_coords"] for site in config["emergency_sites"])
+
+
+def test_default_scenario_falls_back_to_incident_locations():
+    config = dict(get_scenario_config("baseline"))
+    model = FloodResponseModel(config, events=make_event_log("silent"), seed=7)
+    drainage, direct = _record_locations(model)
+    model.run()
+
+    assert drainage and direct
+    assert set(drainage) | set(direct) <= set(model.incident_locations)
@@ -0,0 +1,37 @@
+"""信息平台分派：无单位可承接的报告不能占住队列，紧急抢险任务在饱和时仍能派出"""
+
+from agents import InfoPlatform, RescueTeam, TrafficPolice
+from base_types import IncidentType
+from events import make_event_log
+from messaging import INCIDENT_REPORT, TASK_ASSIGNMENT, Message
+
+
+def _report(step, incident_type, location, urgency):
+    return Message(INCIDENT_REPORT, timestamp=step, incident_type=incident_type, location=location, urgency=urgency)
+
+
+def test_urgent_task_dispatched_under_unroutable_flood():
+    events = make_event_log("silent")
+    platform = InfoPlatform(0, processing_capacity=2)
+    police = TrafficPolice(1, "网格1")
+    team = RescueTeam(2, "市级", 0.9)
+    for agent in (platform, police, team):
+        agent.events = events
+
+    for step in range(10):
+        # 每步一条可承接的低紧急度报告和五条社区渍水（没有单位可承接）
+        platform.integrate_info(_report(step, "交通拥堵", "区域0", 0.3), step)
+        for k in range(5):
+            platform.integrate_info(_report(step, "社区渍水", f"区域{k + 1}", 0.3), step)
+        if step == 5:
+            platform.integrate_info(_report(step, "人员被困", "区域9", 0.9), step)
+        platform.dispatch_tasks([police, team], step)
+
+        assert len(platform.task_queue) <= platform.processing_capacity * 2
+        assert all(task.incident_type in platform.ROUTABLE_INCIDENTS for task in platform.task_queue)
+
+    rescued = [msg.task for msg in team.inbox if msg.type == TASK_ASSIGNMENT]
+    assert [task.incident_type for task in rescued] == [IncidentType.PEOPLE_TRAPPED]
+    assert rescued[0].start_time == 5
+    assert platform.metrics["unroutable_reports"] == 50
+    assert platform.metrics["saturated_reports"] == 0
@@ -0,0 +1,186 @@
+"""
+逐步时间序列记录器 - 预分配的定型数组按列存储，支持降采样和 .npz / Parquet 导出
+
+每个时间步结束时（指标收集阶段）记录一行。可记录的序列见 SERIES，
+情景配置 "timeseries" 可指定要记录的序列名列表；rainfall 与 backlog 总是记录，
+模型的 rainfall_history 和 metrics["task_backlog"] 由它们生成。
+"""
+
+from typing import Callable, Dict, Iterable, Tuple
+
+import numpy as np
+
+from base_types import TaskStatus
+
+# 响应等级编码：0 表示尚未发布，1-4 依次为 Ⅳ 级到 Ⅰ 级
+RESPONSE_LEVELS = (None, "Ⅳ级", "Ⅲ级", "Ⅱ级", "Ⅰ级")
+_RESPONSE_LEVEL_CODES = {level: code for code, level in enumerate(RESPONSE_LEVELS)}
+
+
+def _rainfall(model) -> float:
+    return model.current_rainfall
+
+
+def _backlog(model) -> int:
+    return model.current_backlog
+
+
+def _queue_depth(model) -> int:
+    platform = model.registry.info_platform
+    return len(platform.task_queue) if platform else 0
+
+
+def _pending_emergency(model) -> int:
+    command_center = model.registry.command_center
+    if not command_center:
+        return 0
+    return sum(1 for task in command_center.emergency_tasks if task.status == TaskStatus.PENDING)
+
+
+def _available_teams(model) -> int:
+    return sum(1 for team in model.registry.rescue_teams if team.available)
+
+
+def _pumps_in_use(model) -> int:
+    bureau = model.registry.water_bureau
+    return bureau.mobile_pumps - bureau.available_pumps if bureau else 0
+
+
+def _response_level(model) -> int:
+    command_center = model.registry.command_center
+    return _RESPONSE_LEVEL_CODES[command_center.response_level] if command_center else 0
+
+
+def _incidents(model) -> int:
+    return model.metrics["total_incidents"]
+
+
+def _resolved(model) -> int:
+    return model.response_stats.count
+
+
+# 序列名 -> (dtype, 取值函数)
+SERIES: Dict[str, Tuple[str, Callable]] = {
+    "rainfall": ("float64", _rainfall),
+    "backlog": ("int32", _backlog),
+    "queue_depth": ("int32", _queue_depth),
+    "pending_emergency": ("int32", _pending_emergency),
+    "available_teams": ("int16", _available_teams),
+    "pumps_in_use": ("int16", _pumps_in_use),
+    "response_level": ("int8", _response_level),
+    "incidents": ("int32", _incidents),
+    "resolved": ("int32", _resolved),
+}
+
+REQUIRED_SERIES = ("rainfall", "backlog")
+DEFAULT_SERIES = tuple(SERIES)
+
+# 降采样聚合方式
+_REDUCERS = {
+    "sum": np.add.reduceat,
+    "max": np.maximum.reduceat,
+    "min": np.minimum.reduceat,
+}
+
+
+class TimeSeriesRecorder:
+    """列式逐步记录器"""
+
+    def __init__(self, series: Iterable[str] = DEFAULT_SERIES, capacity: int = 0):
+        names = list(REQUIRED_SERIES) + [name for name in series if name not in REQUIRED_SERIES]
+        unknown = [name for name in names if name not in SERIES]
+        if unknown:
+            raise ValueError(f"未知的时间序列: {', '.join(unknown)}")
+        self.names = tuple(names)
+        self._extractors = [(name, SERIES[name][1]) for name in self.names]
+        capacity = max(int(capacity), 1)
+        self.step = np.zeros(capacity, dtype=np.int32)
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.zeros(capacity, dtype=SERIES[name][0]) for name in self.names
+        }
+        self.length = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.step)
+
+    def _grow(self):
+        """容量不足时翻倍（预分配按情景步数，通常不会触发）"""
+        capacity = self.capacity * 2
+        self.step = np.resize(self.step, capacity)
+        self.columns = {name: np.resize(col, capacity) for name, col in self.columns.items()}
+
+    def record(self, model):
+        """记录模型当前时间步的一行"""
+        i = self.length
+        if i == self.capacity:
+            self._grow()
+        self.step[i] = model.time_step
+        columns = self.columns
+        for name, extract in self._extractors:
+            columns[name][i] = extract(model)
+        self.length = i + 1
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """已记录部分的视图"""
+        if name == "step":
+            return self.step[:self.length]
+        return self.columns[name][:self.length]
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def nbytes(self) -> int:
+        return self.step.nbytes + sum(col.nbytes for col in self.columns.values())
+
+    def downsample(self, factor: int, how: str = "mean") -> Dict[str, np.ndarray]:
+        """每 factor 步聚合为一行
+
+        how: mean / sum / max / min / last；step 列取每个窗口的最后一步
+        """
+        if factor < 1:
+            raise ValueError("降采样因子必须为正整数")
+        if how not in _REDUCERS and how not in ("mean", "last"):
+            raise ValueError(f"未知的聚合方式: {how}")
+        n = self.length
+        starts = np.arange(0, n, factor)
+        ends = np.minimum(starts + factor, n)
+        result = {"step": self.step[ends - 1] if n else self.step[:0]}
+        for name in self.names:
+            col = self[name]
+            if not n:
+                result[name] = col.copy()
+            elif how == "last":
+                result[name] = col[ends - 1]
+            elif how == "mean":
+                result[name] = np.add.reduceat(col, starts, dtype=np.float64) / (ends - starts)
+            else:
+                result[name] = _REDUCERS[how](col, starts)
+        return result
+
+    def to_dict(self, every: int = 1, how: str = "mean") -> Dict[str, np.ndarray]:
+        """各列数组（every > 1 时降采样）"""
+        if every > 1:
+            return self.downsample(every, how)
+        return {"step": self["step"].copy(), **{name: self[name].copy() for name in self.names}}
+
+    def save_npz(self, path: str, every: int = 1, how: str = "mean", compressed: bool = True):
+        """导出为 .npz（每列一个数组）"""
+        save = np.savez_compressed if compressed else np.savez
+        save(path, **self.to_dict(every, how))
+
+    def save_parquet(self, path: str, every: int = 1, how: str = "mean"):
+        """导出为 Parquet（需要 pyarrow）"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("导出 Parquet 需要安装 pyarrow") from None
+        pq.write_table(pa.table(self.to_dict(every, how)), path)
+
+
+def load_npz(path: str) -> Dict[str, np.ndarray]:
+    """读取 save_npz 导出的时间序列"""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}